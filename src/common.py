@@ -23,23 +23,45 @@ Created on 15.02.2022
 #
 #
 
+import asyncio
+import contextlib
+import csv
+import gzip
+import hashlib
+import io
+import itertools
 import json
 import logging
+import lzma
 import os
+import random
+import re
+import shutil
+import sqlite3
+import threading
+import time
 import xml.etree.ElementTree as et
 from abc import ABC, ABCMeta, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from smtplib import SMTP_SSL as SMTP
-from typing import Callable
+from typing import IO, Callable, Iterator
+from urllib.parse import quote
 
+import aiohttp
+import bs4
+import numpy as np
 import pandas as pd
 import pytz
 import requests
 import toml
 from atlassian import Confluence
+from atlassian.errors import ApiError, ApiNotFoundError
 from dateutil import parser
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
 
 
 class SingletonMeta(type):
@@ -78,21 +100,684 @@ class DataWriter(ABC, metaclass=SingletonABCMeta):
         pass
 
 
+class AtomicFileWriter:
+    """
+    Writes a file into a temporary file in the same directory, which replaces the target file
+    only after it was completely written. A crashed or killed run therefore never leaves a
+    partially written file behind.
+    """
+
+    @staticmethod
+    @contextlib.contextmanager
+    def open(filepath: str, encoding: str = None, newline: str = None, length_kept: int = 0) -> Iterator[IO]:
+        """
+        Yields the temporary file in text mode. To append to or truncate the target file, the
+        first 'length_kept' bytes of it are copied into the temporary file beforehand (None copies
+        the whole file)
+        """
+        path_tmp = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(path_tmp, 'xb') as file_tmp:
+                if length_kept != 0 and os.path.isfile(filepath):
+                    with open(filepath, 'rb') as file:
+                        if length_kept is None:
+                            shutil.copyfileobj(file, file_tmp)
+                        else:
+                            file_tmp.write(file.read(length_kept))
+            with open(path_tmp, 'a', encoding=encoding, newline=newline) as file_tmp:
+                yield file_tmp
+                file_tmp.flush()
+                os.fsync(file_tmp.fileno())
+            if os.path.isfile(filepath):
+                shutil.copymode(filepath, path_tmp)
+            os.replace(path_tmp, filepath)
+        finally:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+
+
+class FileArchiver:
+    """
+    Compresses files of closed years with a codec of the standard library (STORAGE.ARCHIVE_CODEC).
+    An archived file keeps its name and gets the suffix of the codec (<NAME>.csv.gz). If a file
+    does not exist, readers look for its archive instead.
+    """
+    __codecs: dict = {'gzip': ('.gz', gzip.open, 'application/gzip'), 'xz': ('.xz', lzma.open, 'application/x-xz')}
+    __pattern_csv_year = re.compile(r'_(\d{4})\.csv$')
+    __pattern_line_year = re.compile(r'(\d{4})-')
+
+    def __init__(self):
+        self.__suffix, self.__opener, _ = self.__codecs[os.getenv('STORAGE.ARCHIVE_CODEC') or 'gzip']
+        self.__timestamp = TimestampHandler()
+
+    @classmethod
+    def get_archive_suffixes(cls) -> list:
+        return [suffix for suffix, _, _ in cls.__codecs.values()]
+
+    @classmethod
+    def get_content_type(cls, filepath: str, default: str) -> str:
+        for suffix, _, content_type in cls.__codecs.values():
+            if filepath.endswith(suffix):
+                return content_type
+        return default
+
+    @classmethod
+    def find_existing_path(cls, filepath: str) -> str:
+        """
+        Returns the file itself or its archive, whichever exists first. None, if neither exists
+        """
+        for path in [filepath] + [filepath + suffix for suffix in cls.get_archive_suffixes()]:
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @classmethod
+    def open_text_file(cls, filepath: str, encoding: str) -> IO:
+        path = cls.find_existing_path(filepath) or filepath
+        for suffix, opener, _ in cls.__codecs.values():
+            if path.endswith(suffix):
+                return opener(path, 'rt', encoding=encoding)
+        return open(path, 'r', encoding=encoding)
+
+    def archive_closed_years(self, directory: str):
+        """
+        Compresses the yearly CSV files (<ID_NODE>_<CATEGORY>_<YEAR>.csv) of past years. Log files are not
+        rotated, so their lines of past years are moved into an archive per year (<NAME>_<YEAR>.log.gz).
+        """
+        current_year = self.__timestamp.get_current_year()
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            match = self.__pattern_csv_year.search(name)
+            if match and match.group(1) < current_year:
+                with open(path, 'rb') as file:
+                    self.__write_archive(path + self.__suffix, file.read())
+                os.remove(path)
+            elif name.endswith('.log'):
+                self.__archive_closed_years_of_log(path, current_year)
+
+    def __archive_closed_years_of_log(self, logpath: str, current_year: str):
+        """
+        Lines without a leading year belong to the year of the line before
+        """
+        lines_per_year = {}
+        year = current_year
+        with open(logpath, 'r', encoding='utf-8', newline='') as file:
+            for line in file:
+                match = self.__pattern_line_year.match(line)
+                year = match.group(1) if match else year
+                lines_per_year.setdefault(year, []).append(line)
+        closed_years = [year for year in lines_per_year if year < current_year]
+        if not closed_years:
+            return
+        for year in closed_years:
+            archive_path = ''.join([os.path.splitext(logpath)[0], '_', year, '.log', self.__suffix])
+            data = ''.join(lines_per_year[year]).encode('utf-8')
+            if os.path.isfile(archive_path):
+                with self.__opener(archive_path, 'rb') as file:
+                    data = file.read() + data
+            self.__write_archive(archive_path, data)
+        remaining = [line for year, lines in lines_per_year.items() if year >= current_year for line in lines]
+        if remaining:
+            with AtomicFileWriter.open(logpath, encoding='utf-8', newline='') as file:
+                file.write(''.join(remaining))
+        else:
+            os.remove(logpath)
+
+    def __write_archive(self, archive_path: str, data: bytes):
+        path_tmp = f'{archive_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with self.__opener(path_tmp, 'wb') as file:
+                file.write(data)
+            os.replace(path_tmp, archive_path)
+        finally:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+
+
+class CSVStorage(ABC):
+    """
+    Storage backend of CSVHandler. Each table is addressed by the path of its CSV file
+    (<DIR.WORKING>/<ID_NODE>/<ID_NODE>_<CATEGORY>_<YEAR>.csv)
+    """
+
+    def __init__(self, columns: list, separator: str, encoding: str):
+        self._columns = columns
+        self._separator = separator
+        self._encoding = encoding
+
+    @abstractmethod
+    def exists(self, csv_path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def read_df(self, csv_path: str) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def write_df(self, df: pd.DataFrame, csv_path: str):
+        pass
+
+    @abstractmethod
+    def read_last_rows_as_df(self, csv_path: str, number_rows: int) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def iter_rows_reversed(self, csv_path: str) -> Iterator[dict]:
+        pass
+
+    @abstractmethod
+    def append_row(self, row: dict, csv_path: str):
+        pass
+
+    @abstractmethod
+    def replace_last_row(self, row: dict, csv_path: str):
+        pass
+
+    @abstractmethod
+    def export_csv_files(self, node_id: str, node_dir: str):
+        pass
+
+    def _write_df_as_csv_file(self, df: pd.DataFrame, csv_path: str, header: bool = True, length_kept: int = 0):
+        """
+        The file is replaced atomically. 'length_kept' bytes of the existing file are kept in front
+        of the written rows (see AtomicFileWriter)
+        """
+        with AtomicFileWriter.open(csv_path, encoding=self._encoding, newline='', length_kept=length_kept) as file:
+            df.to_csv(file, header=header, sep=self._separator, index=False)
+
+
+class CSVFileStorage(CSVStorage):
+    """
+    Default backend. Stores each table as a CSV file at its path
+    """
+    __size_tail_chunk: int = 8192
+
+    def exists(self, csv_path: str) -> bool:
+        return FileArchiver.find_existing_path(csv_path) is not None
+
+    def read_df(self, csv_path: str) -> pd.DataFrame:
+        """
+        Archived CSV files of closed years are decompressed transparently
+        """
+        path = FileArchiver.find_existing_path(csv_path) or csv_path
+        return pd.read_csv(path, sep=self._separator, encoding=self._encoding, dtype=str, compression='infer')
+
+    def write_df(self, df: pd.DataFrame, csv_path: str):
+        self._write_df_as_csv_file(df, csv_path)
+
+    def read_last_rows_as_df(self, csv_path: str, number_rows: int) -> pd.DataFrame:
+        if self.__is_archived(csv_path):
+            return self.read_df(csv_path).tail(number_rows).reset_index(drop=True)
+        with open(csv_path, 'rb') as file:
+            header = file.readline()
+            lines = [line for _, line in itertools.islice(self.__iter_lines_reversed(file, len(header)), number_rows)]
+        tail = b'\n'.join(reversed(lines))
+        return pd.read_csv(io.BytesIO(header + tail), sep=self._separator, encoding=self._encoding, dtype=str)
+
+    def iter_rows_reversed(self, csv_path: str) -> Iterator[dict]:
+        if self.__is_archived(csv_path):
+            df = self.read_df(csv_path)
+            yield from df.iloc[::-1].astype(object).where(df.notna(), None).to_dict('records')
+            return
+        with open(csv_path, 'rb') as file:
+            header = file.readline()
+            columns = self.__parse_csv_line(header)
+            for _, line in self.__iter_lines_reversed(file, len(header)):
+                yield dict(zip(columns, self.__parse_csv_line(line)))
+
+    def __parse_csv_line(self, line: bytes) -> list:
+        values = next(csv.reader([line.decode(self._encoding).rstrip('\r\n')], delimiter=self._separator))
+        return [value if value != '' else None for value in values]
+
+    def append_row(self, row: dict, csv_path: str):
+        """
+        The row is appended to the file in place, so the existing rows are neither copied nor
+        parsed again. An interrupted run can only leave a partial last row
+        """
+        with open(csv_path, 'a', encoding=self._encoding, newline='') as file:
+            self.__create_row_df(row).to_csv(file, header=False, sep=self._separator, index=False)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def replace_last_row(self, row: dict, csv_path: str):
+        """
+        The rows in front of the last one are copied bytewise into a new file, which replaces the
+        existing one atomically
+        """
+        with open(csv_path, 'rb') as file:
+            header = file.readline()
+            offset, _ = next(self.__iter_lines_reversed(file, len(header)), (len(header), None))
+        self._write_df_as_csv_file(self.__create_row_df(row), csv_path, header=False, length_kept=offset)
+
+    def __create_row_df(self, row: dict) -> pd.DataFrame:
+        return pd.DataFrame([row], columns=self._columns)
+
+    def export_csv_files(self, node_id: str, node_dir: str):
+        """
+        The CSV files are already in place
+        """
+
+    @staticmethod
+    def __is_archived(csv_path: str) -> bool:
+        """
+        Compressed files can not be read from their end
+        """
+        return not os.path.isfile(csv_path) and FileArchiver.find_existing_path(csv_path) is not None
+
+    def __iter_lines_reversed(self, file: IO[bytes], start_data: int) -> Iterator[tuple]:
+        """
+        Yields the non-empty lines after the byte offset 'start_data' (the end of the header)
+        from the last to the first, together with the byte offset at which each line starts.
+        The file is read backwards in chunks, so the costs only depend on the number of lines
+        read and not on the size of the file
+        """
+        position = file.seek(0, os.SEEK_END)
+        rest = b''
+        while position > start_data:
+            size_chunk = min(self.__size_tail_chunk, position - start_data)
+            position -= size_chunk
+            file.seek(position)
+            buffer = file.read(size_chunk) + rest
+            lines = buffer.split(b'\n')
+            rest = lines[0]
+            end_line = position + len(buffer)
+            for line in reversed(lines[1:]):
+                start_line = end_line - len(line)
+                if line.strip(b'\r'):
+                    yield start_line, line
+                end_line = start_line - 1
+        if rest.strip(b'\r'):
+            yield start_data, rest
+
+
+class SQLiteStorage(CSVStorage):
+    """
+    Stores the tables of all nodes and years of one category in a single table of a SQLite
+    database, indexed on (node_id, year, position). The path of a CSV file is mapped to
+    node ID and year by its name. Rows keep the order of the CSV file by their position.
+    If the database does not know a table yet, but its CSV file exists, the CSV file is imported
+    on first access. CSV files are only written again by export_csv_files()
+    """
+    __batch_size_reversed: int = 100
+
+    def __init__(self, columns: list, separator: str, encoding: str, path_db: str, category: str):
+        super().__init__(columns, separator, encoding)
+        self.__category = category
+        self.__known_tables = set()
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path_db, check_same_thread=False, timeout=30)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__create_tables()
+
+    def __create_tables(self):
+        columns = ', '.join([f'"{column}" TEXT' for column in self._columns])
+        with self.__lock, self.__connection:
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS csv_tables (category TEXT, node_id TEXT, year TEXT, PRIMARY KEY (category, node_id, year))')
+            self.__connection.execute(f'CREATE TABLE IF NOT EXISTS "{self.__category}" (node_id TEXT, year TEXT, position INTEGER, {columns})')
+            self.__add_missing_columns()
+            self.__connection.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.__category}_position" ON "{self.__category}" (node_id, year, position)')
+            self.__drop_unused_indexes()
+
+    def __add_missing_columns(self):
+        """
+        Columns added to a category after the database was created are appended to its table
+        """
+        cursor = self.__connection.execute(f'PRAGMA table_info("{self.__category}")')
+        existing = {row[1] for row in cursor.fetchall()}
+        for column in self._columns:
+            if column not in existing:
+                self.__connection.execute(f'ALTER TABLE "{self.__category}" ADD COLUMN "{column}" TEXT')
+
+    def __drop_unused_indexes(self):
+        """
+        Rows are only looked up by their position. Indexes of older databases on other columns
+        would only add costs to each write
+        """
+        cursor = self.__connection.execute(f'PRAGMA index_list("{self.__category}")')
+        for name in [row[1] for row in cursor.fetchall()]:
+            if name.startswith(f'idx_{self.__category}_') and name != f'idx_{self.__category}_position':
+                self.__connection.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    def __get_table_key(self, csv_path: str) -> tuple:
+        """
+        <ID_NODE>_<CATEGORY>_<YEAR>.csv -> (ID_NODE, YEAR)
+        """
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        node_id, category, year = name.rsplit('_', 2)
+        if category != self.__category:
+            raise ValueError(f'{csv_path} is not a CSV file of category {self.__category}')
+        return node_id, year
+
+    def __import_csv_file_if_unknown(self, csv_path: str):
+        """
+        The storage is shared by the worker threads, so the set of known tables is only accessed under the lock
+        """
+        node_id, year = self.__get_table_key(csv_path)
+        with self.__lock:
+            if csv_path in self.__known_tables:
+                return
+            cursor = self.__connection.execute('SELECT 1 FROM csv_tables WHERE category = ? AND node_id = ? AND year = ?',
+                                               (self.__category, node_id, year))
+            if cursor.fetchone() is not None:
+                self.__known_tables.add(csv_path)
+                return
+        path_existing = FileArchiver.find_existing_path(csv_path)
+        if path_existing is not None:
+            df = pd.read_csv(path_existing, sep=self._separator, encoding=self._encoding, dtype=str, compression='infer')
+            self.write_df(df, csv_path)
+
+    def __is_known_table(self, csv_path: str) -> bool:
+        with self.__lock:
+            return csv_path in self.__known_tables
+
+    def exists(self, csv_path: str) -> bool:
+        self.__import_csv_file_if_unknown(csv_path)
+        return self.__is_known_table(csv_path)
+
+    def read_df(self, csv_path: str) -> pd.DataFrame:
+        rows = self.__select_rows(csv_path, 'ASC')
+        return self.__convert_rows_to_df(rows)
+
+    def write_df(self, df: pd.DataFrame, csv_path: str):
+        node_id, year = self.__get_table_key(csv_path)
+        records = df.reindex(columns=self._columns).to_dict('records')
+        rows = [self.__convert_record_to_db_row(node_id, year, position, record) for position, record in enumerate(records)]
+        with self.__lock, self.__connection:
+            self.__connection.execute('INSERT OR IGNORE INTO csv_tables VALUES (?, ?, ?)', (self.__category, node_id, year))
+            self.__connection.execute(f'DELETE FROM "{self.__category}" WHERE node_id = ? AND year = ?', (node_id, year))
+            self.__connection.executemany(self.__create_insert_statement(), rows)
+            self.__known_tables.add(csv_path)
+
+    def read_last_rows_as_df(self, csv_path: str, number_rows: int) -> pd.DataFrame:
+        rows = self.__select_rows(csv_path, 'DESC', number_rows)
+        return self.__convert_rows_to_df(rows[::-1])
+
+    def iter_rows_reversed(self, csv_path: str) -> Iterator[dict]:
+        """
+        Rows are fetched in batches, so only the part of the table up to the last requested row is read
+        """
+        offset = 0
+        while True:
+            rows = self.__select_rows(csv_path, 'DESC', self.__batch_size_reversed, offset)
+            for row in rows:
+                yield dict(zip(self._columns, row))
+            if len(rows) < self.__batch_size_reversed:
+                return
+            offset += len(rows)
+
+    def append_row(self, row: dict, csv_path: str):
+        self.__import_csv_file_if_unknown(csv_path)
+        node_id, year = self.__get_table_key(csv_path)
+        with self.__lock, self.__connection:
+            position = self.__select_last_position(node_id, year) + 1
+            self.__connection.execute(self.__create_insert_statement(), self.__convert_record_to_db_row(node_id, year, position, row))
+
+    def replace_last_row(self, row: dict, csv_path: str):
+        self.__import_csv_file_if_unknown(csv_path)
+        node_id, year = self.__get_table_key(csv_path)
+        with self.__lock, self.__connection:
+            position = self.__select_last_position(node_id, year)
+            self.__connection.execute(f'DELETE FROM "{self.__category}" WHERE node_id = ? AND year = ? AND position = ?', (node_id, year, position))
+            self.__connection.execute(self.__create_insert_statement(), self.__convert_record_to_db_row(node_id, year, max(position, 0), row))
+
+    def export_csv_files(self, node_id: str, node_dir: str):
+        """
+        Writes all tables of the node as CSV files into its directory. The files are identical
+        to the ones written by CSVFileStorage
+        """
+        with self.__lock:
+            cursor = self.__connection.execute('SELECT year FROM csv_tables WHERE category = ? AND node_id = ?', (self.__category, node_id))
+            years = [year for (year,) in cursor.fetchall()]
+        if years:
+            os.makedirs(node_dir, exist_ok=True)
+        for year in years:
+            csv_path = os.path.join(node_dir, f'{node_id}_{self.__category}_{year}.csv')
+            self._write_df_as_csv_file(self.read_df(csv_path), csv_path)
+
+    def __select_rows(self, csv_path: str, order: str, limit: int = -1, offset: int = 0) -> list:
+        self.__import_csv_file_if_unknown(csv_path)
+        if not self.__is_known_table(csv_path):
+            raise FileNotFoundError(f'no table for {csv_path}')
+        node_id, year = self.__get_table_key(csv_path)
+        columns = ', '.join([f'"{column}"' for column in self._columns])
+        with self.__lock:
+            cursor = self.__connection.execute(
+                f'SELECT {columns} FROM "{self.__category}" WHERE node_id = ? AND year = ? ORDER BY position {order} LIMIT ? OFFSET ?',
+                (node_id, year, limit, offset))
+            return cursor.fetchall()
+
+    def __select_last_position(self, node_id: str, year: str) -> int:
+        cursor = self.__connection.execute(f'SELECT MAX(position) FROM "{self.__category}" WHERE node_id = ? AND year = ?', (node_id, year))
+        position = cursor.fetchone()[0]
+        return position if position is not None else -1
+
+    def __create_insert_statement(self) -> str:
+        columns = ', '.join([f'"{column}"' for column in self._columns])
+        placeholders = ', '.join(['?'] * (len(self._columns) + 3))
+        return f'INSERT INTO "{self.__category}" (node_id, year, position, {columns}) VALUES ({placeholders})'
+
+    def __convert_record_to_db_row(self, node_id: str, year: str, position: int, record: dict) -> tuple:
+        """
+        Values are stored as they would be written into the CSV file. Missing values are stored as NULL
+        """
+        values = [None if pd.isna(record.get(column)) else str(record.get(column)) for column in self._columns]
+        return (node_id, year, position, *values)
+
+    def __convert_rows_to_df(self, rows: list) -> pd.DataFrame:
+        """
+        Missing values become NaN, like in a dataframe read from a CSV file with dtype=str
+        """
+        df = pd.DataFrame(rows, columns=self._columns, dtype=object)
+        return df.where(df.notna(), np.nan)
+
+
+class CSVSchema:
+    """
+    Types of the columns of a CSV file. The files store all values as strings, with '-' for missing
+    values. A typed dataframe maps '-' to NA, numeric columns to nullable numeric dtypes and date
+    columns to tz-aware datetimes in UTC, so each column is parsed once as a whole. Dates which are
+    not in ISO 8601 become NaT, so consumers of date columns have to expect NA values.
+    Columns without a type and columns missing in the dataframe are left as they are.
+    """
+
+    def __init__(self, integer_columns: list = None, float_columns: list = None, date_columns: list = None):
+        self.__integer_columns = integer_columns or []
+        self.__float_columns = float_columns or []
+        self.__date_columns = date_columns or []
+
+    def convert_to_typed_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        typed = df.copy()
+        for column in self.__integer_columns:
+            if column in typed:
+                typed[column] = pd.to_numeric(self.__mask_missing_values(typed[column])).astype('Int64')
+        for column in self.__float_columns:
+            if column in typed:
+                typed[column] = pd.to_numeric(self.__mask_missing_values(typed[column])).astype('Float64')
+        for column in self.__date_columns:
+            if column in typed:
+                typed[column] = pd.to_datetime(self.__mask_missing_values(typed[column]), utc=True, format='ISO8601', errors='coerce')
+        return typed
+
+    @staticmethod
+    def __mask_missing_values(series: pd.Series) -> pd.Series:
+        return series.astype(object).where(~series.isin(['-', '']) & series.notna(), None)
+
+
+class DataFrameCache(metaclass=SingletonMeta):
+    """
+    LRU cache of parsed CSV files, shared by all CSVHandlers of the process. An entry is only valid
+    for the modification time and size of the file it was parsed from, so a changed file is parsed
+    again. The cache is bounded by the memory of the cached dataframes (STORAGE.DATAFRAME_CACHE_MB).
+    """
+
+    def __init__(self):
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def get(self, path: str, signature: tuple) -> pd.DataFrame:
+        """
+        Returns None, if the file is not cached or was changed since
+        """
+        with self.__lock:
+            entry = self.__entries.get(path)
+            if entry is None or entry[0] != signature:
+                return None
+            self.__entries.move_to_end(path)
+            return entry[1]
+
+    def put(self, path: str, signature: tuple, df: pd.DataFrame):
+        """
+        Replaces older versions of the same file. Dataframes larger than the cache are not cached
+        """
+        size = int(df.memory_usage(deep=True).sum())
+        max_bytes = self.__get_max_bytes()
+        with self.__lock:
+            self.__remove(path)
+            if size > max_bytes:
+                return
+            self.__entries[path] = (signature, df, size)
+            self.__size += size
+            while self.__size > max_bytes:
+                self.__remove(next(iter(self.__entries)))
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def get_size_in_bytes(self) -> int:
+        return self.__size
+
+    @staticmethod
+    def __get_max_bytes() -> float:
+        """
+        Read on each call, as handlers may be created before the config is loaded
+        """
+        return float(os.getenv('STORAGE.DATAFRAME_CACHE_MB') or 64) * 1024 * 1024
+
+    def __remove(self, path: str):
+        entry = self.__entries.pop(path, None)
+        if entry is not None:
+            self.__size -= entry[2]
+
+
 class CSVHandler(DataWriter, ABC):
     """
-    Operations for reading a CSV file as a dataframe or writing a dataframe to CSV
+    Operations for reading a CSV file as a dataframe or writing a dataframe to CSV.
+    The data is stored by a CSVStorage backend (STORAGE.BACKEND), which is created on first use
     """
     _category: str
     _separator: str = ';'
+    _schema: CSVSchema = CSVSchema()
 
     def __init__(self):
         self.__timestamp = TimestampHandler()
+        self.__storage = None
+        self.__cache = DataFrameCache()
+
+    def __get_storage(self) -> CSVStorage:
+        if self.__storage is None:
+            if os.getenv('STORAGE.BACKEND', 'csv') == 'sqlite':
+                path_db = os.getenv('STORAGE.SQLITE_PATH') or os.path.join(os.getenv('DIR.WORKING'), 'broker-monitor.sqlite')
+                self.__storage = SQLiteStorage(self.get_csv_columns(), self._separator, self._encoding, path_db, self._category)
+            else:
+                self.__storage = CSVFileStorage(self.get_csv_columns(), self._separator, self._encoding)
+        return self.__storage
 
     def write_data_to_file(self, data: pd.DataFrame, filepath: str):
-        data.to_csv(filepath, sep=self._separator, encoding=self._encoding, index=False)
+        self.__get_storage().write_df(data, filepath)
 
     def read_csv_as_df(self, csv_path: str) -> pd.DataFrame:
-        return pd.read_csv(csv_path, sep=self._separator, encoding=self._encoding, dtype=str)
+        """
+        CSV files are parsed once per version and shared via DataFrameCache. Each caller gets its own copy
+        """
+        signature = self.__get_file_signature(csv_path)
+        if signature is None:
+            return self.__get_storage().read_df(csv_path)
+        df = self.__cache.get(csv_path, signature)
+        if df is None:
+            df = self.__get_storage().read_df(csv_path)
+            self.__cache.put(csv_path, signature, df)
+        return df.copy()
+
+    def __get_file_signature(self, csv_path: str) -> tuple:
+        """
+        (inode, mtime, size) of the CSV file or of its archive. None for missing files and for the SQLite
+        backend, whose tables are not files. The inode changes with each atomic write
+        """
+        if not isinstance(self.__get_storage(), CSVFileStorage):
+            return None
+        path = FileArchiver.find_existing_path(csv_path)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        return path, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def __get_cached_df(self, csv_path: str) -> pd.DataFrame:
+        signature = self.__get_file_signature(csv_path)
+        return self.__cache.get(csv_path, signature) if signature is not None else None
+
+    def read_csv_as_typed_df(self, csv_path: str) -> pd.DataFrame:
+        return self.convert_to_typed_df(self.read_csv_as_df(csv_path))
+
+    def convert_to_typed_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts a dataframe read from the CSV file to the types of the schema of this handler (see CSVSchema)
+        """
+        return self._schema.convert_to_typed_df(df)
+
+    def does_csv_file_exist(self, csv_path: str) -> bool:
+        return self.__get_storage().exists(csv_path)
+
+    def read_last_rows_as_df(self, csv_path: str, number_rows: int) -> pd.DataFrame:
+        """
+        Reads only the header and the last rows of the CSV file by seeking from its end.
+        Values must not contain line breaks, as each line is assumed to be one row.
+        If the file is already cached, the rows are taken from the cache instead
+        """
+        df = self.__get_cached_df(csv_path)
+        if df is not None:
+            return df.tail(number_rows).reset_index(drop=True)
+        return self.__get_storage().read_last_rows_as_df(csv_path, number_rows)
+
+    def read_last_rows_as_records(self, csv_path: str, number_rows: int) -> list:
+        """
+        Like read_last_rows_as_df(), but returns the rows as a list of dicts in file order
+        """
+        rows = list(itertools.islice(self.iter_rows_reversed(csv_path), number_rows))
+        return rows[::-1]
+
+    def iter_rows_reversed(self, csv_path: str) -> Iterator[dict]:
+        """
+        Yields the rows of the CSV file as dicts, starting with the last one. Only the part of
+        the file up to the last requested row is read. Empty values are returned as None
+        """
+        df = self.__get_cached_df(csv_path)
+        if df is not None:
+            return iter(df.iloc[::-1].astype(object).where(df.notna(), None).to_dict('records'))
+        return self.__get_storage().iter_rows_reversed(csv_path)
+
+    def append_row_to_file(self, row: dict, csv_path: str):
+        """
+        Appends a single row without touching the rest of the file. The row is formatted like
+        in write_data_to_file(), so the file stays identical to a completely rewritten one.
+        Unlike the other writes, the row is appended in place and not atomically
+        """
+        self.__get_storage().append_row(row, csv_path)
+
+    def replace_last_row_in_file(self, row: dict, csv_path: str):
+        """
+        Truncates the last row of the file (if there is one besides the header) and appends
+        the given row instead
+        """
+        self.__get_storage().replace_last_row(row, csv_path)
+
+    def export_csv_files_of_node(self, node_id: str, node_dir: str):
+        """
+        Makes sure the CSV files of the node exist in its directory, e.g. before a backup
+        """
+        self.__get_storage().export_csv_files(node_id, node_dir)
 
     def generate_node_csv_name(self, node_id: str, year: str = None) -> str:
         """
@@ -106,7 +791,7 @@ class CSVHandler(DataWriter, ABC):
     def init_csv_file(self, filepath: str, csv_name: str = None) -> str:
         if csv_name:
             filepath = os.path.join(filepath, csv_name)
-        if not os.path.isfile(filepath):
+        if not self.does_csv_file_exist(filepath):
             df = pd.DataFrame(columns=self.get_csv_columns())
             self.write_data_to_file(df, filepath)
         return filepath
@@ -122,6 +807,10 @@ class InfoCSVHandler(CSVHandler):
     of a single connected node
     """
     _category = 'stats'
+    _schema = CSVSchema(
+        integer_columns=['imported', 'updated', 'invalid', 'failed', 'daily_imported', 'daily_updated', 'daily_invalid', 'daily_failed'],
+        float_columns=['error_rate', 'daily_error_rate'],
+        date_columns=['date', 'last_contact', 'last_start', 'last_write', 'last_reject'])
 
     def get_csv_columns(self) -> list:
         return ['date', 'last_contact', 'last_start', 'last_write', 'last_reject',
@@ -135,25 +824,187 @@ class ErrorCSVHandler(CSVHandler):
     node
     """
     _category = 'errors'
+    _schema = CSVSchema(integer_columns=['repeats'], date_columns=['timestamp'])
 
     def get_csv_columns(self) -> list:
-        return ['timestamp', 'repeats', 'content']
+        return ['timestamp', 'repeats', 'content', 'fingerprint', 'variants']
+
+
+class ErrorFingerprinter:
+    """
+    Maps error messages to a fingerprint, so that near-duplicate errors which only differ in
+    variable parts (numbers, UUIDs, paths) are collapsed into a single row. The raw contents
+    of the collapsed errors are tracked as variants by a short hash and their repeats.
+    Only the latest variants are tracked, the repeats of older ones are summed up as 'other'.
+    """
+    __patterns: list = [
+        (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE), '<uuid>'),
+        (re.compile(r'(?:[a-z]:)?(?:[\\/][\w.\-]+){2,}[\\/]?', re.IGNORECASE), '<path>'),
+        (re.compile(r'\b(?:0x[0-9a-f]+|(?=[0-9a-f]*\d)[0-9a-f]{6,})\b', re.IGNORECASE), '<hex>'),
+        (re.compile(r'\d+(?:[.,]\d+)*'), '<num>'),
+        (re.compile(r'\s+'), ' ')]
+    __length_hash: int = 16
+    __max_variants: int = 10
+    __key_other: str = 'other'
+
+    def mask_content(self, content: str) -> str:
+        for pattern, replacement in self.__patterns:
+            content = pattern.sub(replacement, content)
+        return content.strip()
+
+    def create_fingerprint(self, content: str) -> str:
+        return self.__hash(self.mask_content(content))
+
+    def create_variant_hash(self, content: str) -> str:
+        return self.__hash(content)
+
+    def __hash(self, text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:self.__length_hash]
+
+    @staticmethod
+    def parse_variants(variants: str) -> dict:
+        """
+        Variants are stored as 'hash=repeats' pairs joined by '|'
+        """
+        if not isinstance(variants, str) or not variants:
+            return {}
+        return dict(pair.split('=', 1) for pair in variants.split('|'))
+
+    def join_variants(self, variants: dict) -> str:
+        """
+        Variants are ordered from oldest to latest. The oldest ones are dropped beyond
+        'max_variants' and their repeats are added to 'other', so the length of the
+        joined string is bounded. A dropped variant which is reported again is tracked anew
+        """
+        variants = dict(variants)
+        other = self.count_repeats(variants.pop(self.__key_other, 0))
+        while len(variants) > self.__max_variants:
+            other += self.count_repeats(variants.pop(next(iter(variants))))
+        pairs = [f'{variant}={repeats}' for variant, repeats in variants.items()]
+        if other:
+            pairs.append(f'{self.__key_other}={other}')
+        return '|'.join(pairs)
+
+    def has_dropped_variants(self, variants: dict) -> bool:
+        return self.__key_other in variants
+
+    @staticmethod
+    def count_repeats(repeats) -> int:
+        """
+        Errors without repeats count as one
+        """
+        return int(repeats) if str(repeats).isdigit() else 1
+
+
+class NodeHistory:
+    """
+    Exposes the yearly CSV files of a node as one logical time series. Only the years needed by
+    a query are read. Complete frames of closed years are cached with LRU eviction, as they do
+    not change anymore. The file of the current year is always read again.
+    """
+
+    def __init__(self, handler: CSVHandler, max_cached_years: int = 16):
+        self.__handler = handler
+        self.__max_cached_years = max_cached_years
+        self.__working_dir = os.getenv('DIR.WORKING')
+        self.__timestamp = TimestampHandler()
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_year(self, node_id: str, year: str) -> pd.DataFrame:
+        """
+        Returns None, if the node has no CSV file for this year
+        """
+        df = self.__get_cached_year(node_id, year)
+        if df is not None:
+            return df
+        csv_path = self.__generate_csv_path(node_id, year)
+        if not self.__handler.does_csv_file_exist(csv_path):
+            return None
+        df = self.__handler.read_csv_as_df(csv_path)
+        if year != self.__timestamp.get_current_year():
+            self.__put_cached_year(node_id, year, df)
+        return df
+
+    def get_last_rows(self, node_id: str, number_rows: int, year: str = None) -> pd.DataFrame:
+        """
+        Returns the last rows up to the given year (default: current year) across yearly files.
+        Previous years are only read while the rows of the later ones are not enough. Years which
+        are not cached are read from the end of their file. Stops at the first year without a file.
+        """
+        if year is None:
+            year = self.__timestamp.get_current_year()
+        frames = []
+        number_missing = number_rows
+        while number_missing > 0:
+            df = self.__read_last_rows_of_year(node_id, year, number_missing)
+            if df is None:
+                break
+            if not df.empty:
+                frames.insert(0, df)
+                number_missing -= len(df)
+            year = str(int(year) - 1)
+        if not frames:
+            return pd.DataFrame(columns=self.__handler.get_csv_columns())
+        return pd.concat(frames, ignore_index=True)
+
+    def clear(self):
+        with self.__lock:
+            self.__cache.clear()
+
+    def __read_last_rows_of_year(self, node_id: str, year: str, number_rows: int) -> pd.DataFrame:
+        df = self.__get_cached_year(node_id, year)
+        if df is not None:
+            return df.tail(number_rows).reset_index(drop=True)
+        csv_path = self.__generate_csv_path(node_id, year)
+        if not self.__handler.does_csv_file_exist(csv_path):
+            return None
+        return self.__handler.read_last_rows_as_df(csv_path, number_rows)
+
+    def __get_cached_year(self, node_id: str, year: str) -> pd.DataFrame:
+        with self.__lock:
+            df = self.__cache.get((node_id, year))
+            if df is not None:
+                self.__cache.move_to_end((node_id, year))
+            return df
+
+    def __put_cached_year(self, node_id: str, year: str, df: pd.DataFrame):
+        with self.__lock:
+            self.__cache[(node_id, year)] = df
+            self.__cache.move_to_end((node_id, year))
+            while len(self.__cache) > self.__max_cached_years:
+                self.__cache.popitem(last=False)
+
+    def __generate_csv_path(self, node_id: str, year: str) -> str:
+        csv_name = self.__handler.generate_node_csv_name(node_id, year)
+        return os.path.join(self.__working_dir, node_id, csv_name)
 
 
 class TextWriter(DataWriter):
 
     def write_data_to_file(self, data, filepath: str):
+        """
+        Appends to the file directly, as rewriting the whole log atomically for each appended line
+        gets slower with the size of the log. An interrupted run can only leave a partial last line
+        """
         with open(filepath, 'a', encoding=self._encoding) as file:
             file.write(data)
 
     def save_dict_as_txt_file(self, dictionary: dict, filepath: str):
-        with open(filepath, 'w', encoding=self._encoding) as file:
+        with AtomicFileWriter.open(filepath, encoding=self._encoding) as file:
             file.write(json.dumps(dictionary))
 
     def load_txt_file_as_dict(self, filepath: str) -> dict:
-        with open(filepath, 'r', encoding=self._encoding) as file:
+        with FileArchiver.open_text_file(filepath, self._encoding) as file:
             return json.load(file)
 
+    def read_data_from_file(self, filepath: str) -> str:
+        """
+        Archived files are decompressed transparently
+        """
+        with FileArchiver.open_text_file(filepath, self._encoding) as file:
+            return file.read()
+
     def init_new_file_if_nonexisting(self, filepath: str):
         if not os.path.isfile(filepath):
             self.save_dict_as_txt_file({}, filepath)
@@ -188,8 +1039,21 @@ class TimestampHandler(metaclass=SingletonMeta):
     def get_utc_ymd_hms_from_date_string(self, date: str) -> str:
         return self.__to_utc(date).strftime('%Y-%m-%d %H:%M:%S')
 
+    def get_current_datetime(self) -> datetime:
+        return datetime.utcnow().replace(tzinfo=self.__tzinfo)
+
     def get_timedelta_in_absolute_hours(self, date1: str, date2: str) -> float:
-        delta = abs(self.__to_utc(date2) - self.__to_utc(date1))
+        return self.get_absolute_hours_between_datetimes(self.__to_utc(date1), self.__to_utc(date2))
+
+    @staticmethod
+    def get_absolute_hours_between_datetimes(date1: datetime, date2: datetime) -> float:
+        """
+        For dates which are already parsed, like the date columns of a typed CSV dataframe.
+        Returns NaN if one of the dates is missing (NaT), so any comparison with the result is False
+        """
+        if pd.isna(date1) or pd.isna(date2):
+            return float('nan')
+        delta = abs(date2 - date1)
         return round(delta.total_seconds() / 3600)
 
     @staticmethod
@@ -205,103 +1069,640 @@ class TimestampHandler(metaclass=SingletonMeta):
         return str(berlin_time)
 
 
-class BrokerNodeConnection(metaclass=SingletonMeta):
+class BrokerNodeUnavailableError(requests.exceptions.RequestException):
+    """
+    Raised instead of sending a request to the broker, if the node failed too often
+    or the deadline of the run has passed
+    """
+
+
+class AdaptiveTimeout:
+    """
+    Timeout for broker requests based on the observed response times. Like the retransmission
+    timeout of TCP, it is computed from the smoothed mean and the mean deviation of the response
+    times and is kept between a lower and an upper limit. Until the first observation, the
+    upper limit is used. After a timeout, the timeout is doubled for each further attempt
+    """
+    __weight_mean = 1 / 8
+    __weight_deviation = 1 / 4
+
+    def __init__(self, minimum: float, maximum: float):
+        self.__minimum = minimum
+        self.__maximum = maximum
+        self.__mean = None
+        self.__deviation = None
+        self.__lock = threading.Lock()
+
+    def get_timeout(self, backoff: int = 0) -> float:
+        with self.__lock:
+            if self.__mean is None:
+                return self.__maximum
+            timeout = self.__mean + 4 * self.__deviation
+        return min(max(timeout, self.__minimum) * 2 ** backoff, self.__maximum)
+
+    def add_observation(self, seconds: float):
+        with self.__lock:
+            if self.__mean is None:
+                self.__mean = seconds
+                self.__deviation = seconds / 2
+            else:
+                self.__deviation += self.__weight_deviation * (abs(seconds - self.__mean) - self.__deviation)
+                self.__mean += self.__weight_mean * (seconds - self.__mean)
+
+
+class NodeCircuitBreaker:
+    """
+    Counts consecutive failed requests per broker node. After 'threshold' failures in a row,
+    the circuit of the node is open for the rest of the run and no more requests should be
+    sent to it
+    """
+
+    def __init__(self, threshold: int):
+        self.__threshold = threshold
+        self.__failures = {}
+        self.__lock = threading.Lock()
+
+    def is_open(self, node_id: str) -> bool:
+        with self.__lock:
+            return self.__failures.get(node_id, 0) >= self.__threshold
+
+    def record_success(self, node_id: str):
+        if node_id is not None:
+            with self.__lock:
+                self.__failures.pop(node_id, None)
+
+    def record_failure(self, node_id: str):
+        if node_id is not None:
+            with self.__lock:
+                self.__failures[node_id] = self.__failures.get(node_id, 0) + 1
+
+
+class BrokerRequestMetrics:
+    """
+    Collects status, time to first byte, total time, response size and XML parse time of
+    every request to the broker and aggregates them into a report per endpoint kind
+    (e.g. 'stats' or 'versions') and a list of the slowest nodes
+    """
+    __histogram_bounds = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    __number_slowest_nodes = 10
+
+    def __init__(self):
+        self.__samples = []
+        self.__parse_times = {}
+        self.__lock = threading.Lock()
+
+    def add_request(self, endpoint: str, node_id: str, status: int, ttfb: float, total: float, size: int):
+        """
+        'status' is None if no response was received at all
+        """
+        sample = {'endpoint': endpoint, 'node_id': node_id, 'status': status, 'ttfb': ttfb, 'total': total, 'size': size}
+        with self.__lock:
+            self.__samples.append(sample)
+
+    def add_parse_time(self, endpoint: str, seconds: float):
+        with self.__lock:
+            self.__parse_times.setdefault(endpoint, []).append(seconds)
+
+    def clear(self):
+        with self.__lock:
+            self.__samples = []
+            self.__parse_times = {}
+
+    def create_report(self) -> dict:
+        with self.__lock:
+            samples = list(self.__samples)
+            parse_times = {endpoint: list(times) for endpoint, times in self.__parse_times.items()}
+        endpoints = sorted({sample['endpoint'] for sample in samples})
+        return {'requests': len(samples),
+                'bytes': sum(sample['size'] for sample in samples),
+                'seconds': round(sum(sample['total'] for sample in samples), 3),
+                'endpoints': {endpoint: self.__aggregate_endpoint([sample for sample in samples if sample['endpoint'] == endpoint], parse_times.get(endpoint))
+                              for endpoint in endpoints},
+                'slowest_nodes': self.__find_slowest_nodes(samples)}
+
+    def __aggregate_endpoint(self, samples: list, parse_times: list) -> dict:
+        statuses = {}
+        for sample in samples:
+            status = str(sample['status']) if sample['status'] is not None else 'error'
+            statuses[status] = statuses.get(status, 0) + 1
+        return {'requests': len(samples),
+                'status': statuses,
+                'bytes': {'sum': sum(sample['size'] for sample in samples), 'max': max(sample['size'] for sample in samples)},
+                'ttfb': self.__summarize_times([sample['ttfb'] for sample in samples]),
+                'total': self.__summarize_times([sample['total'] for sample in samples]),
+                'parse': self.__summarize_times(parse_times) if parse_times else None,
+                'histogram_total': self.__create_histogram([sample['total'] for sample in samples])}
+
+    @staticmethod
+    def __summarize_times(times: list) -> dict:
+        times = sorted(times)
+        return {'p50': round(times[int(0.5 * (len(times) - 1))], 4),
+                'p95': round(times[int(0.95 * (len(times) - 1))], 4),
+                'max': round(times[-1], 4),
+                'sum': round(sum(times), 4)}
+
+    def __create_histogram(self, times: list) -> dict:
+        """
+        Counts the requests per bucket. Each bucket is named after its upper bound in seconds
+        """
+        histogram = {f'<={bound}': 0 for bound in self.__histogram_bounds}
+        histogram[f'>{self.__histogram_bounds[-1]}'] = 0
+        for seconds in times:
+            bound = next((bound for bound in self.__histogram_bounds if seconds <= bound), None)
+            key = f'<={bound}' if bound is not None else f'>{self.__histogram_bounds[-1]}'
+            histogram[key] += 1
+        return histogram
+
+    def __find_slowest_nodes(self, samples: list) -> list:
+        nodes = {}
+        for sample in samples:
+            if sample['node_id'] is not None:
+                node = nodes.setdefault(sample['node_id'], {'node_id': sample['node_id'], 'requests': 0, 'seconds': 0.0, 'bytes': 0})
+                node['requests'] += 1
+                node['seconds'] += sample['total']
+                node['bytes'] += sample['size']
+        slowest = sorted(nodes.values(), key=lambda node: node['seconds'], reverse=True)[:self.__number_slowest_nodes]
+        for node in slowest:
+            node['seconds'] = round(node['seconds'], 3)
+        return slowest
+
+
+class BrokerCassetteAdapter(HTTPAdapter):
+    """
+    Transport adapter to record the responses of the broker-server into a cassette directory
+    ('record') or to replay them from there without any network access ('replay').
+    Each request is stored as a JSON file named after its method and path, so a cassette can
+    be replayed regardless of the configured broker URL
+    """
+    __recorded_headers = ('Content-Type', 'ETag', 'Last-Modified')
+    __conditional_headers = ('If-None-Match', 'If-Modified-Since')
+
+    def __init__(self, mode: str, dir_cassette: str, **kwargs):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f'unknown cassette mode: {mode}')
+        super().__init__(**kwargs)
+        self.__mode = mode
+        self.__dir_cassette = dir_cassette
+        if mode == 'record':
+            os.makedirs(dir_cassette, exist_ok=True)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        path_record = os.path.join(self.__dir_cassette, self.__generate_record_name(request))
+        if self.__mode == 'replay':
+            record = self.__load_record(path_record, request)
+        else:
+            record = self.__record_response(path_record, request, **kwargs)
+        return self.__build_response_from_record(request, record)
+
+    @staticmethod
+    def __generate_record_name(request: requests.PreparedRequest) -> str:
+        return f"{request.method}_{quote(request.path_url, safe='')}.json"
+
+    @staticmethod
+    def __load_record(path: str, request: requests.PreparedRequest) -> dict:
+        if not os.path.isfile(path):
+            raise requests.exceptions.RequestException(f'no recorded response for {request.method} {request.path_url}', request=request)
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def __record_response(self, path: str, request: requests.PreparedRequest, **kwargs) -> dict:
+        """
+        Conditional headers are dropped, so the complete body is recorded instead of a 304
+        """
+        for header in self.__conditional_headers:
+            request.headers.pop(header, None)
+        response = super().send(request, **kwargs)
+        record = {'status': response.status_code,
+                  'headers': {key: response.headers[key] for key in self.__recorded_headers if key in response.headers},
+                  'body': response.content.decode('utf-8', errors='surrogateescape')}
+        response.close()
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(record, file, indent=2)
+        return record
+
+    def __build_response_from_record(self, request: requests.PreparedRequest, record: dict) -> requests.Response:
+        body = record['body'].encode('utf-8', errors='surrogateescape')
+        raw = HTTPResponse(body=io.BytesIO(body), headers=record['headers'], status=record['status'],
+                           preload_content=False, decode_content=False, request_method=request.method)
+        return self.build_response(request, raw)
+
+
+class BrokerEndpointHandler:
+    """
+    Creates URLs and headers for requests to the REST endpoint of broker-server
+    and parses its XML responses. Shared by the synchronous and asynchronous connection
+    """
+    _timeout = 10
+    _min_timeout = 2
+    _namespace = './/{http://aktin.org/ns/exchange}'
+
+    def __init__(self):
+        self._broker_url = os.getenv('BROKER.URL')
+        self._admin_api_key = os.getenv('BROKER.API_KEY')
+
+    def _append_to_broker_url(self, *items: str) -> str:
+        url = self._broker_url
+        for item in items:
+            url = f'{url}/{item}'
+        return url
+
+    def _create_basic_headers(self) -> dict:
+        """
+        HTTP header for requests to AKTIN Broker
+        """
+        headers = requests.utils.default_headers()
+        headers['Authorization'] = f'Bearer {self._admin_api_key}'
+        headers['User-Agent'] = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/56.0.2924.87 Safari/537.36'
+        headers['Accept'] = 'application/xml'
+        return headers
+
+    def _parse_broker_nodes(self, tree: et.Element) -> list:
+        """
+        The node list of the broker already contains clientDN and last-contact of each node
+        """
+        list_nodes = []
+        for node in tree.findall(f'{self._namespace}node'):
+            id_element = node.find(f'{self._namespace}id')
+            if id_element is not None:
+                list_nodes.append(BrokerNodeConnection.BrokerNode(
+                    id_element.text,
+                    node.findtext(f'{self._namespace}clientDN'),
+                    node.findtext(f'{self._namespace}last-contact')))
+        return list_nodes
+
+    def _parse_broker_node(self, node_id: str, tree: et.Element) -> 'BrokerNodeConnection.BrokerNode':
+        return BrokerNodeConnection.BrokerNode(
+            node_id,
+            tree.find(f'{self._namespace}clientDN').text,
+            tree.find(f'{self._namespace}last-contact').text)
+
+    @staticmethod
+    def _iterparse_broker_node_stats(source: IO[bytes]) -> Iterator:
+        """
+        Parses a /stats document element by element while it is read from 'source'.
+        Yields the import counters as (tag, text) tuples and the last errors as BrokerNodeError
+        objects as soon as they are complete. Processed errors are removed from the tree, so the
+        memory usage stays flat regardless of the number of errors
+        """
+        last_errors = None
+        for event, elem in et.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == 'last-errors':
+                    last_errors = elem
+            elif elem.tag == 'error':
+                yield BrokerNodeConnection.BrokerNodeError(
+                    elem.get('repeats'),
+                    elem.get('timestamp'),
+                    elem.text)
+                if last_errors is not None:
+                    last_errors.clear()
+            elif elem.tag in ('start', 'last-write', 'last-reject', 'imported', 'updated', 'invalid', 'failed'):
+                yield elem.tag, elem.text
+
+    def _parse_broker_node_stats_snapshot(self, source: IO[bytes]) -> 'BrokerNodeConnection.BrokerNodeStatsSnapshot':
+        counters = {}
+        errors = []
+        for item in self._iterparse_broker_node_stats(source):
+            if isinstance(item, BrokerNodeConnection.BrokerNodeError):
+                errors.append(item)
+            else:
+                tag, text = item
+                counters[tag] = text
+        return BrokerNodeConnection.BrokerNodeStatsSnapshot(self._create_broker_node_stats(counters), errors)
+
+    @staticmethod
+    def _create_broker_node_stats(counters: dict) -> 'BrokerNodeConnection.BrokerNodeStats':
+        return BrokerNodeConnection.BrokerNodeStats(
+            counters['start'],
+            counters.get('last-write'),
+            counters.get('last-reject'),
+            counters['imported'],
+            counters['updated'],
+            counters['invalid'],
+            counters['failed'])
+
+    @staticmethod
+    def _parse_broker_node_resource(tree: et.Element) -> dict:
+        return {elem.get('key'): elem.text for elem in tree.iterfind('entry')}
+
+
+class BrokerNodeConnection(BrokerEndpointHandler, metaclass=SingletonMeta):
     """
     Uses REST endpoint of broker-server to get information about
     connected nodes
     """
-    __timeout = 10
-    __namespace = './/{http://aktin.org/ns/exchange}'
+
+    __max_backoff_seconds = 30
+    __required_counters = {'start', 'imported', 'updated', 'invalid', 'failed'}
 
     def __init__(self):
-        self.__broker_url = os.getenv('BROKER.URL')
-        self.__admin_api_key = os.getenv('BROKER.API_KEY')
+        super().__init__()
+        self.__session = self.__create_session(int(os.getenv('BROKER.POOL_SIZE')))
+        self.__max_retries = int(os.getenv('BROKER.MAX_RETRIES'))
+        self.__backoff_seconds = float(os.getenv('BROKER.BACKOFF_SECONDS'))
+        self.__max_timeout = float(os.getenv('BROKER.MAX_TIMEOUT_SECONDS'))
+        self.__timeouts = {}
+        self.__lock_timeouts = threading.Lock()
+        self.__circuit_breaker = NodeCircuitBreaker(int(os.getenv('BROKER.CIRCUIT_BREAKER_THRESHOLD')))
+        self.__deadline = time.monotonic() + float(os.getenv('BROKER.RUN_DEADLINE_SECONDS'))
+        self.__metrics = BrokerRequestMetrics()
+        self.__node_index = None
+        self.__stats_cache = None
         self.__check_broker_server_availability()
 
+    def __create_session(self, pool_size: int) -> requests.Session:
+        """
+        All requests to the broker share one session, so TCP/TLS connections are kept alive
+        and reused instead of being opened anew for each request. The pool blocks once 'pool_size'
+        connections are in use, so parallel workers wait for a free connection instead of opening
+        connections which are discarded afterwards.
+        With BROKER.CASSETTE_MODE, the responses are recorded to or replayed from BROKER.CASSETTE_DIR
+        """
+        session = requests.Session()
+        session.headers.update(self._create_basic_headers())
+        mode_cassette = os.getenv('BROKER.CASSETTE_MODE')
+        if mode_cassette:
+            adapter = BrokerCassetteAdapter(mode_cassette, os.getenv('BROKER.CASSETTE_DIR'), pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        else:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def __check_broker_server_availability(self):
-        url = self.__append_to_broker_url('broker', 'status')
-        response = requests.head(url, timeout=self.__timeout)
+        url = self._append_to_broker_url('broker', 'status')
+        response = self.__session.head(url, timeout=self.__get_adaptive_timeout(url).get_timeout())
         response.raise_for_status()
 
-    def __append_to_broker_url(self, *items: str) -> str:
-        url = self.__broker_url
-        for item in items:
-            url = f'{url}/{item}'
-        return url
+    def get_connection_stats(self) -> dict:
+        """
+        Returns the number of opened and reused connections of the session. A request which
+        did not open a new connection was sent over a reused one
+        """
+        opened = 0
+        sent = 0
+        for adapter in set(self.__session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                opened += pool.num_connections
+                sent += pool.num_requests
+        return {'opened': opened, 'reused': sent - opened}
+
+    def get_request_metrics(self) -> BrokerRequestMetrics:
+        return self.__metrics
 
     def get_broker_nodes(self) -> list:
-        url = self.__append_to_broker_url('broker', 'node')
+        """
+        Returns all connected nodes as BrokerNode objects. With enabled run cache, the nodes
+        are indexed by their ID, so get_broker_node() needs no further request
+        """
+        url = self._append_to_broker_url('broker', 'node')
         tree = self.__get_processed_response(url)
-        list_ids = []
-        for node in tree.findall(f'{self.__namespace}node'):
-            id_element = node.find(f'{self.__namespace}id')
-            if id_element is not None:
-                list_ids.append(id_element.text)
-        return list_ids
+        nodes = self._parse_broker_nodes(tree)
+        if self.__node_index is not None:
+            self.__node_index = {node.id: node for node in nodes}
+        return nodes
 
     def get_broker_node(self, node_id: str) -> 'BrokerNodeConnection.BrokerNode':
-        url = self.__append_to_broker_url('broker', 'node', node_id)
-        tree = self.__get_processed_response(url)
-        return self.BrokerNode(
-            node_id,
-            tree.find(f'{self.__namespace}clientDN').text,
-            tree.find(f'{self.__namespace}last-contact').text)
+        if self.__node_index is not None and node_id in self.__node_index:
+            return self.__node_index[node_id]
+        url = self._append_to_broker_url('broker', 'node', node_id)
+        tree = self.__get_processed_response(url, node_id)
+        return self._parse_broker_node(node_id, tree)
+
+    def enable_run_cache(self):
+        """
+        Keeps parsed responses which are needed by multiple retrievers (like the /stats document
+        of a node) until the cache is cleared, so each of them is requested only once per run
+        """
+        self.__node_index = {}
+        self.__stats_cache = {}
+
+    def clear_run_cache(self):
+        self.__node_index = None
+        self.__stats_cache = None
+
+    def evict_node_from_run_cache(self, node_id: str):
+        if self.__stats_cache is not None:
+            self.__stats_cache.pop(node_id, None)
+
+    def get_broker_node_stats_snapshot(self, node_id: str) -> 'BrokerNodeConnection.BrokerNodeStatsSnapshot':
+        """
+        Import statistics and last errors of a node are part of the same /stats document.
+        Both are parsed from a single response
+        """
+        cached = self.__get_cached_snapshot(node_id)
+        if cached is not None and cached.errors is not None:
+            return cached
+        url = self._append_to_broker_url('broker', 'node', node_id, 'stats')
+        start = time.perf_counter()
+        with self.__get_streamed_response(url, node_id) as response:
+            start_parse = time.perf_counter()
+            snapshot = self._parse_broker_node_stats_snapshot(response.raw)
+            self.__metrics.add_parse_time('stats', time.perf_counter() - start_parse)
+            self.__add_request_to_metrics(url, node_id, response, start, response.raw.tell())
+        if self.__stats_cache is not None:
+            self.__stats_cache[node_id] = snapshot
+        return snapshot
 
     def get_broker_node_stats(self, node_id: str) -> 'BrokerNodeConnection.BrokerNodeStats':
-        url = self.__append_to_broker_url('broker', 'node', node_id, 'stats')
-        tree = self.__get_processed_response(url)
-        return self.BrokerNodeStats(
-            tree.find('start').text,
-            tree.find('last-write').text if tree.find('last-write') is not None else None,
-            tree.find('last-reject').text if tree.find('last-reject') is not None else None,
-            tree.find('imported').text,
-            tree.find('updated').text,
-            tree.find('invalid').text,
-            tree.find('failed').text)
+        cached = self.__get_cached_snapshot(node_id)
+        if cached is not None:
+            return cached.stats
+        return self.get_broker_node_stats_snapshot(node_id).stats
 
     def get_broker_node_errors(self, node_id: str) -> list:
-        url = self.__append_to_broker_url('broker', 'node', node_id, 'stats')
-        tree = self.__get_processed_response(url)
-        errors = []
-        for elem in tree.find('last-errors'):
-            error = self.BrokerNodeError(
-                elem.get('repeats'),
-                elem.get('timestamp'),
-                elem.text)
-            errors.append(error)
-        return errors
+        return self.get_broker_node_stats_snapshot(node_id).errors
+
+    def iter_broker_node_errors(self, node_id: str) -> Iterator['BrokerNodeConnection.BrokerNodeError']:
+        """
+        Streaming variant of get_broker_node_errors(). Errors are yielded while the response is
+        still being received, without keeping the whole document in memory. With enabled run cache,
+        the errors of an already cached snapshot are yielded instead, and otherwise only the import
+        statistics of the streamed document are cached (without errors), so a following
+        get_broker_node_stats() needs no further request
+        """
+        cached = self.__get_cached_snapshot(node_id)
+        if cached is not None and cached.errors is not None:
+            yield from cached.errors
+            return
+        url = self._append_to_broker_url('broker', 'node', node_id, 'stats')
+        start = time.perf_counter()
+        counters = {}
+        with self.__get_streamed_response(url, node_id) as response:
+            for item in self._iterparse_broker_node_stats(response.raw):
+                if isinstance(item, self.BrokerNodeError):
+                    yield item
+                else:
+                    tag, text = item
+                    counters[tag] = text
+            self.__add_request_to_metrics(url, node_id, response, start, response.raw.tell())
+        if self.__stats_cache is not None and self.__required_counters.issubset(counters):
+            self.__stats_cache[node_id] = self.BrokerNodeStatsSnapshot(self._create_broker_node_stats(counters), None)
+
+    def __get_cached_snapshot(self, node_id: str) -> 'BrokerNodeConnection.BrokerNodeStatsSnapshot':
+        """
+        A cached snapshot without errors was created by iter_broker_node_errors() and only holds the import statistics
+        """
+        if self.__stats_cache is None:
+            return None
+        return self.__stats_cache.get(node_id)
 
     def get_broker_node_resource(self, node_id: str, resource: str) -> dict:
         """
         Possible resources are 'versions', 'rscript', 'python', 'import-scripts'.
         URL to mentioned resources can also be non-existing.
         """
-        url = self.__append_to_broker_url('broker', 'node', node_id, resource)
+        url = self._append_to_broker_url('broker', 'node', node_id, resource)
         try:
-            tree = self.__get_processed_response(url)
-            resources = {elem.get('key'): elem.text for elem in tree.iterfind('entry')}
+            tree = self.__get_processed_response(url, node_id)
+            resources = self._parse_broker_node_resource(tree)
         except requests.exceptions.HTTPError:
             resources = {}
         return resources
 
-    def __get_processed_response(self, url: str) -> et.Element:
+    def get_broker_node_resource_if_modified(self, node_id: str, resource: str, validators: dict) -> 'BrokerNodeConnection.BrokerNodeResource':
+        """
+        Conditional GET of a node resource. 'validators' are the ones of the last request for this resource.
+        The resource counts as unmodified if the broker answers with 304 or if the content hash is
+        unchanged (the broker does not necessarily send ETag or Last-Modified). Unmodified resources
+        are not parsed. Non-existing resources are returned as an empty dict, like in get_broker_node_resource()
+        """
+        url = self._append_to_broker_url('broker', 'node', node_id, resource)
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        response = self.__get_response(url, node_id, headers)
+        if response.status_code == 304:
+            return self.BrokerNodeResource(None, validators)
+        new_validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'status': response.status_code,
+            'hash': hashlib.sha256(response.content).hexdigest()}
+        if new_validators['status'] == validators.get('status') and new_validators['hash'] == validators.get('hash'):
+            return self.BrokerNodeResource(None, new_validators)
+        try:
+            response.raise_for_status()
+            start = time.perf_counter()
+            resources = self._parse_broker_node_resource(et.fromstring(response.content))
+            self.__metrics.add_parse_time(resource, time.perf_counter() - start)
+        except requests.exceptions.HTTPError:
+            resources = {}
+        return self.BrokerNodeResource(resources, new_validators)
+
+    def __get_processed_response(self, url: str, node_id: str = None) -> et.Element:
         """
         Returns XML tree object from GET request
         """
-        response = requests.get(url, headers=self.__create_basic_headers(), timeout=self.__timeout)
+        response = self.__get_response(url, node_id)
         response.raise_for_status()
+        start = time.perf_counter()
         tree = et.fromstring(response.content)
+        self.__metrics.add_parse_time(self.__get_endpoint_kind(url), time.perf_counter() - start)
         return tree
 
-    def __create_basic_headers(self) -> dict:
+    def __get_streamed_response(self, url: str, node_id: str = None) -> requests.Response:
         """
-        HTTP header for requests to AKTIN Broker
+        The body of the returned response is not loaded yet and can be read from response.raw.
+        Should be used as a context manager to release the connection afterwards
         """
-        headers = requests.utils.default_headers()
-        headers['Authorization'] = f'Bearer {self.__admin_api_key}'
-        headers['User-Agent'] = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/56.0.2924.87 Safari/537.36'
-        headers['Accept'] = 'application/xml'
-        return headers
+        response = self.__get_response(url, node_id, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return response
+
+    def __get_response(self, url: str, node_id: str = None, headers: dict = None, stream: bool = False) -> requests.Response:
+        """
+        Sends a GET request and retries it on connection errors, timeouts and 5xx responses with
+        jittered exponential backoff. A timed out attempt counts as a response time of the timeout
+        and the next attempt gets twice the timeout. Once the circuit breaker of the node is open or
+        the deadline of the run has passed, no more requests are sent.
+        The response of the last attempt is returned, even if it is a 5xx response.
+        """
+        if node_id is not None and self.__circuit_breaker.is_open(node_id):
+            raise BrokerNodeUnavailableError(f'too many failed requests for node {node_id}, skipping {url}')
+        attempt = 0
+        backoff = 0
+        adaptive_timeout = self.__get_adaptive_timeout(url)
+        start = time.perf_counter()
+        while True:
+            self.__check_run_deadline(url)
+            timeout = adaptive_timeout.get_timeout(backoff)
+            try:
+                response = self.__session.get(url, headers=headers, timeout=timeout, stream=stream)
+                adaptive_timeout.add_observation(response.elapsed.total_seconds())
+                if response.status_code < 500:
+                    self.__circuit_breaker.record_success(node_id)
+                    if not stream or not response.ok:
+                        self.__add_request_to_metrics(url, node_id, response, start)
+                    return response
+                error = None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exception:
+                response = None
+                error = exception
+                if isinstance(exception, requests.exceptions.Timeout):
+                    adaptive_timeout.add_observation(timeout)
+                    backoff += 1
+            if attempt >= self.__max_retries:
+                self.__circuit_breaker.record_failure(node_id)
+                self.__add_request_to_metrics(url, node_id, response, start)
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+            self.__sleep_before_retry(attempt)
+            attempt += 1
+
+    def __add_request_to_metrics(self, url: str, node_id: str, response: requests.Response, start: float, size: int = None):
+        """
+        The total time includes retries and, for streamed responses, the reading of the body.
+        Without a response (e.g. after a timeout), status and time to first byte are unknown
+        """
+        total = time.perf_counter() - start
+        if response is None:
+            self.__metrics.add_request(self.__get_endpoint_kind(url), node_id, None, total, total, 0)
+            return
+        if size is None:
+            size = len(response.content)
+        self.__metrics.add_request(self.__get_endpoint_kind(url), node_id, response.status_code, response.elapsed.total_seconds(), total, size)
+
+    def __get_adaptive_timeout(self, url: str) -> AdaptiveTimeout:
+        """
+        Response times differ a lot between the endpoints (e.g. /stats is much slower than
+        /versions), so each endpoint kind has its own timeout
+        """
+        kind = self.__get_endpoint_kind(url)
+        with self.__lock_timeouts:
+            if kind not in self.__timeouts:
+                self.__timeouts[kind] = AdaptiveTimeout(self._min_timeout, self.__max_timeout)
+            return self.__timeouts[kind]
+
+    def __get_endpoint_kind(self, url: str) -> str:
+        """
+        /broker/node -> 'nodes', /broker/node/{id} -> 'node', /broker/node/{id}/{resource} -> resource
+        """
+        segments = url[len(self._broker_url):].strip('/').split('/')
+        if segments[:2] != ['broker', 'node']:
+            return segments[-1]
+        return {2: 'nodes', 3: 'node'}.get(len(segments), segments[-1])
+
+    def __sleep_before_retry(self, attempt: int):
+        """
+        Full jitter: sleeps a random time between zero and the exponential backoff, but not
+        beyond the deadline of the run
+        """
+        backoff = min(self.__backoff_seconds * 2 ** attempt, self.__max_backoff_seconds)
+        remaining = self.__deadline - time.monotonic()
+        time.sleep(max(0.0, min(random.uniform(0, backoff), remaining)))
+
+    def __check_run_deadline(self, url: str):
+        if time.monotonic() > self.__deadline:
+            raise BrokerNodeUnavailableError(f'deadline of run exceeded, skipping {url}')
 
     @dataclass()
     class BrokerNode:
@@ -361,6 +1762,41 @@ class BrokerNodeConnection(metaclass=SingletonMeta):
         def failed(self) -> str:
             return self.__failed
 
+    @dataclass()
+    class BrokerNodeStatsSnapshot:
+
+        __stats: 'BrokerNodeConnection.BrokerNodeStats'
+        __errors: list
+
+        @property
+        def stats(self) -> 'BrokerNodeConnection.BrokerNodeStats':
+            return self.__stats
+
+        @property
+        def errors(self) -> list:
+            return self.__errors
+
+    @dataclass()
+    class BrokerNodeResource:
+
+        __resources: dict
+        __validators: dict
+
+        @property
+        def resources(self) -> dict:
+            """
+            Is None if the resource was not modified since the last request
+            """
+            return self.__resources
+
+        @property
+        def validators(self) -> dict:
+            return self.__validators
+
+        @property
+        def modified(self) -> bool:
+            return self.__resources is not None
+
     @dataclass()
     class BrokerNodeError:
 
@@ -381,6 +1817,142 @@ class BrokerNodeConnection(metaclass=SingletonMeta):
             return self.__content
 
 
+class AsyncBrokerNodeConnection(BrokerEndpointHandler):
+    """
+    Asynchronous counterpart of BrokerNodeConnection. All calls are coroutines, so requests for
+    many nodes can be issued concurrently. At most BROKER.MAX_CONCURRENT_REQUESTS requests are
+    in flight at the same time. Must be used as an async context manager:
+
+    async with AsyncBrokerNodeConnection() as connection:
+        stats = await connection.get_broker_node_stats('1')
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__max_concurrent_requests = int(os.getenv('BROKER.MAX_CONCURRENT_REQUESTS'))
+        self.__session = None
+        self.__semaphore = None
+
+    async def __aenter__(self):
+        self.__semaphore = asyncio.Semaphore(self.__max_concurrent_requests)
+        connector = aiohttp.TCPConnector(limit=self.__max_concurrent_requests)
+        timeout = aiohttp.ClientTimeout(total=self._timeout)
+        self.__session = aiohttp.ClientSession(headers=self._create_basic_headers(), connector=connector, timeout=timeout)
+        url = self._append_to_broker_url('broker', 'status')
+        async with self.__session.head(url) as response:
+            response.raise_for_status()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.__session.close()
+
+    async def get_broker_nodes(self) -> list:
+        url = self._append_to_broker_url('broker', 'node')
+        tree = await self.__get_processed_response(url)
+        return self._parse_broker_nodes(tree)
+
+    async def get_broker_node(self, node_id: str) -> 'BrokerNodeConnection.BrokerNode':
+        url = self._append_to_broker_url('broker', 'node', node_id)
+        tree = await self.__get_processed_response(url)
+        return self._parse_broker_node(node_id, tree)
+
+    async def get_broker_node_stats_snapshot(self, node_id: str) -> 'BrokerNodeConnection.BrokerNodeStatsSnapshot':
+        url = self._append_to_broker_url('broker', 'node', node_id, 'stats')
+        content = await self.__get_response_content(url)
+        return self._parse_broker_node_stats_snapshot(io.BytesIO(content))
+
+    async def get_broker_node_stats(self, node_id: str) -> 'BrokerNodeConnection.BrokerNodeStats':
+        snapshot = await self.get_broker_node_stats_snapshot(node_id)
+        return snapshot.stats
+
+    async def get_broker_node_errors(self, node_id: str) -> list:
+        snapshot = await self.get_broker_node_stats_snapshot(node_id)
+        return snapshot.errors
+
+    async def get_broker_node_resource(self, node_id: str, resource: str) -> dict:
+        """
+        Like in BrokerNodeConnection, non-existing resources are returned as an empty dict
+        """
+        url = self._append_to_broker_url('broker', 'node', node_id, resource)
+        try:
+            tree = await self.__get_processed_response(url)
+            resources = self._parse_broker_node_resource(tree)
+        except aiohttp.ClientResponseError:
+            resources = {}
+        return resources
+
+    async def __get_processed_response(self, url: str) -> et.Element:
+        """
+        Returns XML tree object from GET request
+        """
+        content = await self.__get_response_content(url)
+        return et.fromstring(content)
+
+    async def __get_response_content(self, url: str) -> bytes:
+        """
+        Waits for a free slot of the semaphore before the request is sent
+        """
+        async with self.__semaphore:
+            async with self.__session.get(url) as response:
+                response.raise_for_status()
+                return await response.read()
+
+
+class HTMLSoupFactory(metaclass=SingletonMeta):
+    """
+    Parses Confluence pages and templates with the BeautifulSoup backend set in CONFLUENCE.HTML_PARSER.
+    Falls back to 'html.parser' if the backend is not installed. lxml wraps page fragments into
+    <html><body>, which is removed again, so pages are serialized like with 'html.parser'. lxml turns CDATA
+    sections (e.g. the body of code macros) into comments, so markup with CDATA is always parsed with
+    'html.parser'. html5lib is not supported, as it restructures the Confluence macros of the page
+    """
+    __default_parser: str = 'html.parser'
+    __supported_parsers: tuple = ('html.parser', 'lxml')
+    __pattern_html_tag = re.compile(r'<html[\s>]', re.IGNORECASE)
+    __marker_cdata: str = '<![CDATA['
+
+    def __init__(self):
+        self.__resolved_parsers = {}
+
+    def get_parser(self) -> str:
+        """
+        The configured backend is checked for availability only once
+        """
+        parser = os.getenv('CONFLUENCE.HTML_PARSER') or self.__default_parser
+        if parser not in self.__resolved_parsers:
+            self.__resolved_parsers[parser] = self.__resolve_parser(parser)
+        return self.__resolved_parsers[parser]
+
+    def __resolve_parser(self, parser: str) -> str:
+        if parser not in self.__supported_parsers:
+            raise ValueError(f'unknown html parser: {parser}')
+        try:
+            bs4.BeautifulSoup('', parser)
+        except bs4.FeatureNotFound:
+            logging.warning(f'html parser {parser} is not installed. Using {self.__default_parser} instead')
+            return self.__default_parser
+        return parser
+
+    def parse(self, markup: str, parser: str = None) -> bs4.BeautifulSoup:
+        parser = parser or self.get_parser()
+        if self.__marker_cdata in markup:
+            parser = self.__default_parser
+        soup = bs4.BeautifulSoup(markup, parser)
+        if parser != self.__default_parser and not self.__pattern_html_tag.search(markup):
+            self.__unwrap_fragment(soup)
+        return soup
+
+    @staticmethod
+    def __unwrap_fragment(soup: bs4.BeautifulSoup):
+        html = soup.html
+        if html is None:
+            return
+        for tag in (html.head, html.body):
+            if tag is not None:
+                tag.unwrap()
+        html.unwrap()
+
+
 class ResourceLoader(ABC, metaclass=SingletonABCMeta):
     """
     To load resources from the resources folder
@@ -398,8 +1970,12 @@ class ResourceLoader(ABC, metaclass=SingletonABCMeta):
 
 class ConfluenceConnection(metaclass=SingletonMeta):
     """
-    Uses Atlassian Python API to execute CRUD operations on Confluence
+    Uses Atlassian Python API to execute CRUD operations on Confluence. The IDs of pages are cached by
+    their title and saved in the working directory for the next run, so most operations on a page need
+    no additional request to look up its ID
     """
+    __filename_page_ids: str = 'confluence_page_ids.json'
+    __limit_child_pages: int = 200
 
     def __init__(self):
         """
@@ -409,12 +1985,105 @@ class ConfluenceConnection(metaclass=SingletonMeta):
         confluence_token = os.getenv('CONFLUENCE.TOKEN')
         self.__space = os.getenv('CONFLUENCE.SPACE')
         self.__confluence = Confluence(url=confluence_url, token=confluence_token)
+        self.__writer = TextWriter()
+        working_dir = os.getenv('DIR.WORKING')
+        self.__path_page_ids = os.path.join(working_dir, self.__filename_page_ids) if working_dir else None
+        self.__page_ids = self.__load_page_ids_of_space()
+
+    def __load_page_ids_of_space(self) -> dict:
+        """
+        Page titles are only unique within a space, so the IDs are saved per space
+        """
+        if self.__path_page_ids is None or not os.path.isfile(self.__path_page_ids):
+            return {}
+        return self.__writer.load_txt_file_as_dict(self.__path_page_ids).get(self.__space, {})
+
+    def __save_page_ids_of_space(self):
+        if self.__path_page_ids is None:
+            return
+        page_ids = {}
+        if os.path.isfile(self.__path_page_ids):
+            page_ids = self.__writer.load_txt_file_as_dict(self.__path_page_ids)
+        page_ids[self.__space] = self.__page_ids
+        self.__writer.save_dict_as_txt_file(page_ids, self.__path_page_ids)
+
+    def load_page_ids_of_children(self, parentname: str):
+        """
+        Replaces the cached IDs with the IDs of all child pages of the given page, which are listed in bulk.
+        Cached IDs of other pages are dropped, as these pages may have been deleted since the last run
+        """
+        if self.get_page_id(parentname) is None:
+            return
+        children = self.__call_with_page_id(parentname, self.__get_child_pages)
+        self.__page_ids = {parentname: self.__page_ids[parentname]}
+        self.__page_ids.update({child['title']: child['id'] for child in children})
+        self.__save_page_ids_of_space()
+
+    def __get_child_pages(self, page_id: str) -> list:
+        """
+        Confluence may return fewer pages than requested per chunk (its own limit can be lower),
+        so chunks are requested until an empty one is returned
+        """
+        children = []
+        while True:
+            chunk = self.__confluence.get_page_child_by_type(page_id, type='page', start=len(children), limit=self.__limit_child_pages)
+            if not chunk:
+                return children
+            children.extend(chunk)
+
+    def get_page_id(self, pagename: str) -> str:
+        """
+        Only the IDs of existing pages are cached. Returns None, if the page does not exist
+        """
+        page_id = self.__page_ids.get(pagename)
+        if page_id is None:
+            page_id = self.__confluence.get_page_id(self.__space, pagename)
+            if page_id is not None:
+                self.__page_ids[pagename] = page_id
+                self.__save_page_ids_of_space()
+        return page_id
+
+    def __remove_page_id(self, pagename: str):
+        if self.__page_ids.pop(pagename, None) is not None:
+            self.__save_page_ids_of_space()
+
+    def __call_with_page_id(self, pagename: str, function: Callable):
+        """
+        A cached ID whose page was deleted in the meantime (404) is removed, and the ID is looked up once again.
+        Raises ApiNotFoundError, if the page does not exist (anymore)
+        """
+        is_cached = pagename in self.__page_ids
+        page_id = self.__get_existing_page_id(pagename)
+        try:
+            return function(page_id)
+        except (ApiError, requests.exceptions.HTTPError) as error:
+            if not is_cached or not self.__is_not_found_error(error):
+                raise
+            self.__remove_page_id(pagename)
+            return function(self.__get_existing_page_id(pagename))
+
+    def __get_existing_page_id(self, pagename: str) -> str:
+        page_id = self.get_page_id(pagename)
+        if page_id is None:
+            raise ApiNotFoundError(f'page {pagename} does not exist in space {self.__space}')
+        return page_id
+
+    @staticmethod
+    def __is_not_found_error(error: Exception) -> bool:
+        if isinstance(error, ApiNotFoundError):
+            return True
+        if isinstance(error, ApiError):
+            error = error.reason
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code == 404
 
     def does_page_exists(self, pagename: str) -> bool:
-        return self.__confluence.page_exists(self.__space, pagename)
+        return self.get_page_id(pagename) is not None
 
     def get_page_content(self, pagename: str) -> str:
-        page_id = self.__confluence.get_page_id(self.__space, pagename)
+        return self.__call_with_page_id(pagename, self.get_page_content_by_id)
+
+    def get_page_content_by_id(self, page_id: str) -> str:
         page = self.__confluence.get_page_by_id(page_id, expand='body.storage')
         content = page['body']['storage']['value']
         return content
@@ -424,16 +2093,26 @@ class ConfluenceConnection(metaclass=SingletonMeta):
         Identical named files are automatically replaced on confluence
         filetype can be: ''text/csv', 'image/png'
         """
-        page_id = self.__confluence.get_page_id(self.__space, pagename)
+        return self.__call_with_page_id(pagename, lambda page_id: self.upload_file_as_attachement_to_page_id(page_id, filepath, filetype))
+
+    def upload_file_as_attachement_to_page_id(self, page_id: str, filepath: str, filetype: str) -> str:
         self.__confluence.attach_file(filepath, content_type=filetype, page_id=page_id)
         return page_id
 
-    def create_confluence_page(self, pagename: str, parentname: str, content: str):
-        parent_id = self.__confluence.get_page_id(self.__space, parentname)
-        self.__confluence.create_page(self.__space, pagename, content, parent_id=parent_id)
+    def create_confluence_page(self, pagename: str, parentname: str, content: str) -> str:
+        """
+        Returns the ID of the created page
+        """
+        parent_id = self.get_page_id(parentname)
+        page = self.__confluence.create_page(self.__space, pagename, content, parent_id=parent_id)
+        self.__page_ids[pagename] = page['id']
+        self.__save_page_ids_of_space()
+        return page['id']
 
     def update_confluence_page(self, pagename: str, content: str):
-        page_id = self.__confluence.get_page_id(self.__space, pagename)
+        self.__call_with_page_id(pagename, lambda page_id: self.update_confluence_page_by_id(page_id, pagename, content))
+
+    def update_confluence_page_by_id(self, page_id: str, pagename: str, content: str):
         self.__confluence.update_page(page_id, pagename, content)
 
 
@@ -533,6 +2212,23 @@ class ConfigReader(metaclass=SingletonMeta):
         'AKTIN.DWH_VERSION',
         'AKTIN.I2B2_VERSION'
     }
+    __optional_keys = {
+        'BROKER.POOL_SIZE': 10,
+        'BROKER.WORKERS': 1,
+        'BROKER.MAX_CONCURRENT_REQUESTS': 20,
+        'BROKER.MAX_RETRIES': 3,
+        'BROKER.BACKOFF_SECONDS': 0.5,
+        'BROKER.MAX_TIMEOUT_SECONDS': 10,
+        'BROKER.CIRCUIT_BREAKER_THRESHOLD': 3,
+        'BROKER.RUN_DEADLINE_SECONDS': 7200,
+        'BROKER.CASSETTE_MODE': '',
+        'BROKER.CASSETTE_DIR': '',
+        'STORAGE.BACKEND': 'csv',
+        'STORAGE.SQLITE_PATH': '',
+        'STORAGE.ARCHIVE_CODEC': 'gzip',
+        'STORAGE.DATAFRAME_CACHE_MB': 64,
+        'CONFLUENCE.HTML_PARSER': 'html.parser'
+    }
 
     def load_config_as_env_vars(self, path: str):
         properties = self.__load_config_file(path)
@@ -543,6 +2239,8 @@ class ConfigReader(metaclass=SingletonMeta):
                 os.environ[key] = ','.join(flattened_props.get(key))
             else:
                 os.environ[key] = flattened_props.get(key)
+        for key, default in self.__optional_keys.items():
+            os.environ[key] = str(flattened_props.get(key, default))
 
     @staticmethod
     def __load_config_file(path: str) -> dict:
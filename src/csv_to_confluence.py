@@ -22,20 +22,23 @@ Created on 22.03.2022
 #
 #
 
+import hashlib
 import json
 import logging
 import os
+import re
 
 from abc import ABC, abstractmethod
+from datetime import datetime
 
 import bs4
 import pandas as pd
 from bs4.element import Tag
 from packaging import version
 
-from common import Main, CSVHandler, ConfluenceConnection, ConfluenceNodeMapper, ErrorCSVHandler, InfoCSVHandler, \
-    ResourceLoader, SingletonABCMeta, \
-    SingletonMeta, TimestampHandler
+from common import Main, CSVHandler, ConfluenceConnection, ConfluenceNodeMapper, ErrorCSVHandler, HTMLSoupFactory, \
+    InfoCSVHandler, NodeHistory, ResourceLoader, SingletonABCMeta, \
+    SingletonMeta, TextWriter, TimestampHandler
 from src.error_histogram_service import ChartManager
 
 
@@ -59,16 +62,18 @@ class TemplatePageElementCreator(metaclass=SingletonMeta):
     Creates commonly used html and confluence elements. Is also used to convert string
     template of confluence page to a searchable html soup
     """
-    __parser: str = 'html.parser'
+
+    def __init__(self):
+        self.__soup_factory = HTMLSoupFactory()
 
     def create_ac_parameter_element(self, name: str, content: str) -> Tag:
-        parameter = bs4.BeautifulSoup(features=self.__parser).new_tag('ac:parameter', attrs={'ac:name': name})
+        parameter = bs4.BeautifulSoup(features=self.get_parser()).new_tag('ac:parameter', attrs={'ac:name': name})
         parameter.append(content)
         return parameter
 
     def create_ac_macro_element(self, name: str) -> Tag:
         attributes = {'ac:name': name, 'ac:schema-version': '1'}
-        macro = bs4.BeautifulSoup(features=self.__parser).new_tag('ac:structured-macro', attrs=attributes)
+        macro = bs4.BeautifulSoup(features=self.get_parser()).new_tag('ac:structured-macro', attrs=attributes)
         return macro
 
     def create_ac_link_element(self, pagename: str) -> bs4.BeautifulSoup:
@@ -80,25 +85,60 @@ class TemplatePageElementCreator(metaclass=SingletonMeta):
         return link
 
     def create_th_html_element(self, name: str) -> Tag:
-        header = bs4.BeautifulSoup(features=self.__parser).new_tag('th', attrs={'style': 'text-align: center;'})
+        header = bs4.BeautifulSoup(features=self.get_parser()).new_tag('th', attrs={'style': 'text-align: center;'})
         header.append(name)
         return header
 
     def create_td_html_element(self, content: str, centered=False) -> Tag:
         attributes = {'style': 'text-align: center;'} if centered else {}
-        data = bs4.BeautifulSoup(features=self.__parser).new_tag('td', attrs=attributes)
+        data = bs4.BeautifulSoup(features=self.get_parser()).new_tag('td', attrs=attributes)
         data.append(content)
         return data
 
     def create_html_element(self, elem_type: str, attributes=None) -> Tag:
         attributes = attributes or {}
-        return bs4.BeautifulSoup(features=self.__parser).new_tag(elem_type, attrs=attributes)
+        return bs4.BeautifulSoup(features=self.get_parser()).new_tag(elem_type, attrs=attributes)
 
     def convert_element_to_soup(self, elem) -> bs4.BeautifulSoup:
-        return bs4.BeautifulSoup(str(elem), self.__parser)
+        return self.__soup_factory.parse(str(elem))
+
+    def convert_page_to_soup(self, page: str) -> bs4.BeautifulSoup:
+        return self.__soup_factory.parse(page)
 
     def get_parser(self) -> str:
-        return self.__parser
+        return self.__soup_factory.get_parser()
+
+
+class TemplatePageSlotIndex:
+    """
+    Index of the elements of a page soup by their class names, built with a single walk over the page.
+    Replaces the search of find(class_=...) for each placeholder. An element that was replaced in the
+    meantime, or a class name that is not indexed, is searched in the page again
+    """
+
+    def __init__(self, template_soup: bs4.BeautifulSoup):
+        self.__soup = template_soup
+        self.__slots = {}
+        for tag in template_soup.find_all(class_=True):
+            for name in tag.get('class'):
+                self.__slots.setdefault(name, tag)
+
+    def get(self, name: str) -> Tag:
+        """
+        Returns the first element with the given class name, like find(class_=name)
+        """
+        slot = self.__slots.get(name)
+        if slot is None or not self.__is_in_page(slot):
+            slot = self.__soup.find(class_=name)
+            if slot is not None:
+                self.__slots[name] = slot
+        return slot
+
+    def __is_in_page(self, tag: Tag) -> bool:
+        for parent in tag.parents:
+            if parent is self.__soup:
+                return True
+        return False
 
 
 class TemplatePageContentWriter(ABC, metaclass=SingletonABCMeta):
@@ -113,13 +153,27 @@ class TemplatePageContentWriter(ABC, metaclass=SingletonABCMeta):
         self._node_id = None
         self._node_working_dir = None
         self._page_template = None
+        self._slots = None
 
     def add_content_to_template_page(self, template_page: str, node_id: str) -> str:
+        """
+        Wrapper of add_content_to_template_soup() for a single writer. Parses the page
+        and returns it serialized again
+        """
+        template_soup = self._creator.convert_page_to_soup(template_page)
+        self.add_content_to_template_soup(template_soup, node_id)
+        return str(template_soup)
+
+    def add_content_to_template_soup(self, template_soup: bs4.BeautifulSoup, node_id: str, slots: TemplatePageSlotIndex = None):
+        """
+        Adds the content in place, so several writers can share a page that is parsed only once.
+        Writers sharing a page should also share its slot index, so the page is indexed only once
+        """
         self._node_id = node_id
         self._node_working_dir = os.path.join(self._working_dir, node_id)
-        self._page_template = bs4.BeautifulSoup(template_page, self._creator.get_parser())
+        self._page_template = template_soup
+        self._slots = slots if slots is not None else TemplatePageSlotIndex(template_soup)
         self._add_content_to_template_soup()
-        return str(self._page_template)
 
     @abstractmethod
     def _add_content_to_template_soup(self):
@@ -144,30 +198,30 @@ class TemplatePageNodeResourceWriter(TemplatePageContentWriter):
 
     def __add_versions_to_template_soup(self):
         versions = self.__load_node_resource_as_dict('versions')
-        self._page_template.find(class_='os').string.replace_with(self.__get_value_of_dict(versions, 'os'))
-        self._page_template.find(class_='kernel').string.replace_with(self.__get_value_of_dict(versions, 'kernel'))
-        self._page_template.find(class_='java').string.replace_with(self.__get_value_of_dict(versions, 'java'))
-        self._page_template.find(class_='j2ee-impl').string.replace_with(
+        self._slots.get('os').string.replace_with(self.__get_value_of_dict(versions, 'os'))
+        self._slots.get('kernel').string.replace_with(self.__get_value_of_dict(versions, 'kernel'))
+        self._slots.get('java').string.replace_with(self.__get_value_of_dict(versions, 'java'))
+        self._slots.get('j2ee-impl').string.replace_with(
             self.__get_value_of_dict(versions, 'j2ee-impl'))
-        self._page_template.find(class_='apache2').string.replace_with(self.__get_value_of_dict(versions, 'apache2'))
-        self._page_template.find(class_='postgres').string.replace_with(self.__get_value_of_dict(versions, 'postgres'))
-        self._page_template.find(class_='dwh-api').string.replace_with(self.__get_value_of_dict(versions, 'dwh-api'))
-        self._page_template.find(class_='dwh-j2ee').string.replace_with(self.__get_value_of_dict(versions, 'dwh-j2ee'))
+        self._slots.get('apache2').string.replace_with(self.__get_value_of_dict(versions, 'apache2'))
+        self._slots.get('postgres').string.replace_with(self.__get_value_of_dict(versions, 'postgres'))
+        self._slots.get('dwh-api').string.replace_with(self.__get_value_of_dict(versions, 'dwh-api'))
+        self._slots.get('dwh-j2ee').string.replace_with(self.__get_value_of_dict(versions, 'dwh-j2ee'))
 
     def __add_rscript_to_template_soup(self):
         rscript_resource = self.__load_node_resource_as_dict('rscript')
         rscript = self.__concat_dict_items_as_string(rscript_resource)
-        self._page_template.find(class_='rscript').string.replace_with(rscript)
+        self._slots.get('rscript').string.replace_with(rscript)
 
     def __add_python_to_template_soup(self):
         python_resource = self.__load_node_resource_as_dict('python')
         python = self.__concat_dict_items_as_string(python_resource)
-        self._page_template.find(class_='python').string.replace_with(python)
+        self._slots.get('python').string.replace_with(python)
 
     def __add_import_scripts_to_template_soup(self):
         import_scripts_resource = self.__load_node_resource_as_dict('import-scripts')
         import_scripts = self.__concat_dict_items_as_string(import_scripts_resource)
-        self._page_template.find(class_='import-scripts').string.replace_with(import_scripts)
+        self._slots.get('import-scripts').string.replace_with(import_scripts)
 
     def __load_node_resource_as_dict(self, resource_name: str) -> dict:
         filename = ''.join([self._node_id, '_', resource_name, '.txt'])
@@ -221,7 +275,7 @@ class TemplatePageJiraTableWriter(TemplatePageContentWriter):
         else:
             query = 'project=AKTIN AND Labels="empty"'
         table = self.__generate_jira_table_with_query(query)
-        self._page_template.find(class_='table_jira').replace_with(table)
+        self._slots.get('table_jira').replace_with(table)
 
     @staticmethod
     def __generate_jira_query_from_labels(labels_jira: str) -> str:
@@ -277,9 +331,9 @@ class ConfluenceClinicContactGrabber(TemplatePageContentWriter):
         the corresponding placeholders in the template with these tables.
         """
         it_table = self.__generate_contact_table_for_contact_type('IT')
-        self._page_template.find(class_='contact_it').replace_with(it_table)
+        self._slots.get('contact_it').replace_with(it_table)
         ed_table = self.__generate_contact_table_for_contact_type('Notaufnahme')
-        self._page_template.find(class_='contact_ed').replace_with(ed_table)
+        self._slots.get('contact_ed').replace_with(ed_table)
 
     def __generate_contact_table_for_contact_type(self, contact_type: str) -> Tag:
         contacts = self.__get_contacts_for_contact_type(contact_type)
@@ -355,7 +409,7 @@ class TemplatePageClinicInfoWriter(TemplatePageContentWriter):
         value = self.__mapper.get_node_value_from_mapping_dict(self._node_id, mapping_key)
         if not value or value is None:
             value = 'changeme'
-        self._page_template.find(class_=page_key).string.replace_with(value)
+        self._slots.get(page_key).string.replace_with(value)
 
     def __add_clinic_ids(self, type_ids: str):
         ids_dict = self.__mapper.get_node_value_from_mapping_dict(self._node_id, type_ids)
@@ -363,31 +417,32 @@ class TemplatePageClinicInfoWriter(TemplatePageContentWriter):
             value = 'changeme'
             if ids_dict is not None and key in ids_dict:
                 value = ids_dict[key]
-            self._page_template.find(class_='_'.join([type_ids.lower(), key.lower()])).string.replace_with(value)
+            self._slots.get('_'.join([type_ids.lower(), key.lower()])).string.replace_with(value)
 
 
 class TemplatePageCSVContentWriter(TemplatePageContentWriter, ABC):
     """
-    Used to write content from csv file to confluence page
+    Used to write content from csv file to confluence page.
+    If '_number_of_rows' is set, only the last rows of the CSV file are loaded
     """
     _handler: CSVHandler
+    _number_of_rows: int = None
 
     def __init__(self):
         super().__init__()
         self._timestamp_handler = TimestampHandler()
         self._df = None
 
-    def add_content_to_template_page(self, template_page: str, node_id: str) -> str:
-        self._node_id = node_id
-        self._page_template = bs4.BeautifulSoup(template_page, self._creator.get_parser())
+    def add_content_to_template_soup(self, template_soup: bs4.BeautifulSoup, node_id: str, slots: TemplatePageSlotIndex = None):
         dir_working = os.path.join(self._working_dir, node_id)
         self._df = self.__load_csv_as_df(node_id, dir_working)
-        self._add_content_to_template_soup()
-        return str(self._page_template)
+        super().add_content_to_template_soup(template_soup, node_id, slots)
 
     def __load_csv_as_df(self, node_id: str, working_dir: str) -> pd.DataFrame:
         name_csv = self._handler.generate_node_csv_name(node_id)
         path_csv = os.path.join(working_dir, name_csv)
+        if self._number_of_rows is not None:
+            return self._handler.read_last_rows_as_df(path_csv, self._number_of_rows)
         return self._handler.read_csv_as_df(path_csv)
 
 
@@ -395,7 +450,9 @@ class TemplatePageCSVContentWriter(TemplatePageContentWriter, ABC):
 class TemplatePageCSVInfoWriter(TemplatePageCSVContentWriter):
     """
     Writes the content of an info CSV (of a single node) into predefined elements of the template.
+    Only the rows of the last week are needed.
     """
+    _number_of_rows: int = 7
 
     def __init__(self):
         super().__init__()
@@ -422,7 +479,7 @@ class TemplatePageCSVInfoWriter(TemplatePageCSVContentWriter):
                 time = time[:19]
             else:
                 time = '-'
-            self._page_template.find(class_=template_class).string.replace_with(time)
+            self._slots.get(template_class).string.replace_with(time)
 
     def __add_weekly_imports_to_template_soup(self):
         fields = {
@@ -432,30 +489,34 @@ class TemplatePageCSVInfoWriter(TemplatePageCSVContentWriter):
             'daily_failed': 'failed',
             'daily_error_rate': 'error_rate',
         }
-        last_week = self._df.tail(7)
+        last_week = self._handler.convert_to_typed_df(self._df.tail(7))
         for field, template_class in fields.items():
             mean = self.__get_mean_of_series(last_week[field])
-            self._page_template.find(class_=template_class).string.replace_with(mean)
+            self._slots.get(template_class).string.replace_with(mean)
 
     @staticmethod
     def __get_mean_of_series(series: pd.Series) -> str:
+        """
+        Missing values are dropped, but still count for the length of the series
+        """
         length = len(series)
-        series = series[series != '-']  # drop the rows
+        series = series.dropna()
         if series.empty:
             return '-'
-        mean = series.astype(float).sum() / length
+        mean = series.sum() / length
         return f'{mean:.2f}'
 
     def __add_daily_imports_to_template_soup(self):
         last_row = self._df.iloc[-1].to_dict()
         fields = ['daily_imported', 'daily_updated', 'daily_invalid', 'daily_failed', 'daily_error_rate']
         for field in fields:
-            self._page_template.find(class_=field).string.replace_with(last_row.get(field))
+            self._slots.get(field).string.replace_with(last_row.get(field))
 
 
 class TemplatePageCSVErrorWriter(TemplatePageCSVContentWriter):
     """
     Writes content of error CSV (of a single node) into predefined elements of the template.
+    Each row of the error CSV is a fingerprint of collapsed near-duplicate errors.
     """
     __num_errors: int = 20
 
@@ -468,10 +529,15 @@ class TemplatePageCSVErrorWriter(TemplatePageCSVContentWriter):
         Adds error content to the template soup by creating a confluence error table.
         """
         error_table = self.__create_confluence_error_table()
-        self._page_template.find(class_='table_errors_body').replace_with(error_table)
+        self._slots.get('table_errors_body').replace_with(error_table)
 
     def __create_confluence_error_table(self) -> Tag:
-        errors_list = self._df.head(self.__num_errors).to_dict('records')
+        """
+        Shows the top fingerprints by their summed repeats. Rows with equal repeats keep their
+        order in the CSV file (newest first).
+        """
+        repeats = self._handler.convert_to_typed_df(self._df)['repeats'].fillna(0)
+        errors_list = self._df.loc[repeats.sort_values(ascending=False, kind='stable').index].head(self.__num_errors).to_dict('records')
         errors_rows = []
         for error in errors_list:
             row = self.__create_error_table_row(error['timestamp'], error['repeats'], error['content'])
@@ -518,9 +584,12 @@ class TemplatePageStatusChecker(TemplatePageCSVContentWriter):
         super().__init__()
         self._handler = InfoCSVHandler()
         self._mapper = ConfluenceNodeMapper()
+        self.__history = NodeHistory(self._handler)
+        self.__typed_df = None
 
     def _add_content_to_template_soup(self):
         self.__append_last_year_rows_to_df_if_necessary()
+        self.__typed_df = self._handler.convert_to_typed_df(self._df)
         if self.__has_csv_a_gap_in_broker_connection():
             status = self.__create_status_element('GAP IN MONITORING', 'Red')
         elif self.__is_template_soup_still_testing():
@@ -537,7 +606,7 @@ class TemplatePageStatusChecker(TemplatePageCSVContentWriter):
             status = self.__create_status_element('LOW ERROR RATE', 'Yellow')
         else:
             status = self.__create_status_element('ONLINE', 'Green')
-        self._page_template.find(class_='status').replace_with(status)
+        self._slots.get('status').replace_with(status)
 
     # TODO test missing
     def __append_last_year_rows_to_df_if_necessary(self):
@@ -548,27 +617,25 @@ class TemplatePageStatusChecker(TemplatePageCSVContentWriter):
         if len(self._df) < self.__default_days_of_consecutive_imports:
             current_year = self._timestamp_handler.get_current_year()
             last_year = str(int(current_year) - 1)
-            last_years_csv_name = self._handler.generate_node_csv_name(self._node_id, last_year)
-            last_years_csv_path = os.path.join(self._working_dir, self._node_id, last_years_csv_name)
-            if os.path.isfile(last_years_csv_path):
-                last_years_df = self._handler.read_csv_as_df(last_years_csv_path)
+            last_years_df = self.__history.get_year(self._node_id, last_year)
+            if last_years_df is not None:
                 self._df = pd.concat([last_years_df, self._df], ignore_index=True)
 
     def __has_csv_a_gap_in_broker_connection(self) -> bool:
         """
         Checks if the CSV has a gap in the broker connection by comparing the timestamps.
         """
-        series = self._df['date']
+        series = self.__typed_df['date']
         if series.empty:
             return False
         todays_csv = series.iloc[-1]
-        current_date = self._timestamp_handler.get_current_date()
-        delta = self._timestamp_handler.get_timedelta_in_absolute_hours(current_date, todays_csv)
+        current_date = self._timestamp_handler.get_current_datetime()
+        delta = self._timestamp_handler.get_absolute_hours_between_datetimes(current_date, todays_csv)
         if delta > 24:
             return True
         if len(series) >= 2:
             yesterdays_csv = series.iloc[-2]
-            delta2 = self._timestamp_handler.get_timedelta_in_absolute_hours(yesterdays_csv, todays_csv)
+            delta2 = self._timestamp_handler.get_absolute_hours_between_datetimes(yesterdays_csv, todays_csv)
             if delta2 > 24:
                 return True
         return False
@@ -582,11 +649,10 @@ class TemplatePageStatusChecker(TemplatePageCSVContentWriter):
         consecutive_imports = self._mapper.get_node_value_from_mapping_dict(self._node_id, 'CONSECUTIVE_IMPORT_DAYS')
         if not consecutive_imports or consecutive_imports is None:
             consecutive_imports = self.__default_days_of_consecutive_imports
-        series = self._df['daily_imported']
+        series = self.__typed_df['daily_imported']
         if len(series) < consecutive_imports:
             return False
-        series = series.str.replace('-', '0')
-        series = pd.to_numeric(series)
+        series = series.fillna(0)
         count = 0
         for value in series:
             if value > 0:
@@ -598,35 +664,34 @@ class TemplatePageStatusChecker(TemplatePageCSVContentWriter):
         return True
 
     def __is_template_soup_offline(self) -> bool:
-        last_contact = self._df['last_contact'].iloc[-1]
+        last_contact = self.__typed_df['last_contact'].iloc[-1]
         return self.__is_date_longer_ago_than_set_hours(last_contact)
 
     def __is_template_soup_not_importing(self) -> bool:
-        last_write = self._df['last_write'].iloc[-1]
-        if last_write == '-':
-            series = self._df['last_write']
-            filtered_series = series[series != '-']
+        last_write = self.__typed_df['last_write'].iloc[-1]
+        if pd.isna(last_write):
+            filtered_series = self.__typed_df['last_write'].dropna()
             if filtered_series.empty:
                 return False
             last_write = filtered_series.iloc[-1]
         return self.__is_date_longer_ago_than_set_hours(last_write)
 
-    def __is_date_longer_ago_than_set_hours(self, input_date: str) -> bool:
+    def __is_date_longer_ago_than_set_hours(self, input_date: datetime) -> bool:
         """
         Checks if the date is longer ago than the set threshold hours.
         """
         threshold_hours = self._mapper.get_node_value_from_mapping_dict(self._node_id, 'THRESHOLD_HOURS_FAILURE')
         if not threshold_hours or threshold_hours is None:
             threshold_hours = self.__default_threshold_hours_failure
-        current_date = self._timestamp_handler.get_current_date()
-        delta = self._timestamp_handler.get_timedelta_in_absolute_hours(input_date, current_date)
+        current_date = self._timestamp_handler.get_current_datetime()
+        delta = self._timestamp_handler.get_absolute_hours_between_datetimes(input_date, current_date)
         return delta > threshold_hours
 
     def __is_template_soup_daily_error_rate_above_threshold(self, threshold: float) -> bool:
-        error_rate = self._df['daily_error_rate'].iloc[-1]
-        if error_rate == '-':
+        error_rate = self.__typed_df['daily_error_rate'].iloc[-1]
+        if pd.isna(error_rate):
             return False
-        return float(error_rate) >= threshold
+        return error_rate >= threshold
 
     def __create_status_element(self, title: str, color: str) -> Tag:
         title_param = self._creator.create_ac_parameter_element('title', title)
@@ -654,7 +719,7 @@ class TemplatePageMonitoringStartDateWriter(TemplatePageCSVContentWriter):
         time_element = self._creator.create_html_element('time', {'datetime': start_monitoring})
         td = self._creator.create_html_element('td', {'class': 'online_since'})
         td.append(time_element)
-        self._page_template.find(class_='online_since').replace_with(td)
+        self._slots.get('online_since').replace_with(td)
 
 
 class TemplatePageSummaryTableWriter:
@@ -665,7 +730,7 @@ class TemplatePageSummaryTableWriter:
         self._creator = TemplatePageElementCreator()
 
     def add_content_to_template(self, template_page, table, image):
-        page_template = bs4.BeautifulSoup(template_page, self._creator.get_parser())
+        page_template = self._creator.convert_page_to_soup(template_page)
         page_template.find(class_='table_summary_body').replace_with(table)
         page_template.find(class_='heatmap_img').replace_with(image)
         return str(page_template)
@@ -680,22 +745,29 @@ class TemplatePageMigrator:
     def __init__(self):
         self.__loader = TemplatePageLoader()
         self.__creator = TemplatePageElementCreator()
+        self.__current_version = None
 
     def is_template_page_outdated(self, template_page: str) -> bool:
         """
         Checks if the provided page_template is outdated compared to the current template.
         """
-        current_template = self.__loader.get_template_page()
-        new_template = self.__creator.convert_element_to_soup(current_template)
-        new_version = new_template.find(class_='version_template').string
-        old_template = bs4.BeautifulSoup(template_page, 'html.parser')
+        old_template = self.__creator.convert_page_to_soup(template_page)
         old_version = old_template.find(class_='version_template').string
-        return version.parse(new_version) > version.parse(old_version)
+        return self.__get_current_version() > version.parse(old_version)
+
+    def __get_current_version(self) -> version.Version:
+        """
+        The current template does not change while running, so its version is only read once
+        """
+        if self.__current_version is None:
+            current_template = self.__creator.convert_page_to_soup(self.__loader.get_template_page())
+            self.__current_version = version.parse(current_template.find(class_='version_template').string)
+        return self.__current_version
 
     def migrate_page_template_to_newer_version(self, template_page: str) -> str:
         current_template = self.__loader.get_template_page()
         new_template = self.__creator.convert_element_to_soup(current_template)
-        old_template = bs4.BeautifulSoup(template_page, 'html.parser')
+        old_template = self.__creator.convert_page_to_soup(template_page)
         new_template = self.__migrate_key_from_old_to_new_template('online_since', old_template, new_template)
         return str(new_template)
 
@@ -706,6 +778,53 @@ class TemplatePageMigrator:
         return new_soup
 
 
+class ConfluencePageManifest(metaclass=SingletonMeta):
+    """
+    Hashes of the content of each Confluence page as it was last uploaded. Every update creates a new
+    page version in Confluence, so pages whose rendered content did not change are not updated again.
+    Whitespace between elements is ignored for the comparison
+    """
+    __filename: str = 'confluence_page_manifest.json'
+    __pattern_whitespace = re.compile(r'\s+')
+    __pattern_whitespace_between_tags = re.compile(r'>\s<')
+
+    def __init__(self):
+        self.__filepath = os.path.join(os.getenv('DIR.WORKING'), self.__filename)
+        self.__writer = TextWriter()
+        self.__hashes = self.__writer.load_txt_file_as_dict(self.__filepath) if os.path.isfile(self.__filepath) else {}
+        self.__count_updated = 0
+        self.__count_skipped = 0
+
+    def is_page_unchanged(self, pagename: str, content: str) -> bool:
+        is_unchanged = self.__hashes.get(pagename) == self.__create_hash(content)
+        if is_unchanged:
+            self.__count_skipped += 1
+        return is_unchanged
+
+    def mark_page_uploaded(self, pagename: str, content: str):
+        self.__count_updated += 1
+        self.__hashes[pagename] = self.__create_hash(content)
+        self.__writer.save_dict_as_txt_file(self.__hashes, self.__filepath)
+
+    def remove_page(self, pagename: str):
+        """
+        Used for newly created pages, as a page of the same name may have been deleted in Confluence
+        """
+        if self.__hashes.pop(pagename, None) is not None:
+            self.__writer.save_dict_as_txt_file(self.__hashes, self.__filepath)
+
+    def get_number_of_updated_pages(self) -> int:
+        return self.__count_updated
+
+    def get_number_of_skipped_pages(self) -> int:
+        return self.__count_skipped
+
+    def __create_hash(self, content: str) -> str:
+        normalized = self.__pattern_whitespace.sub(' ', content).strip()
+        normalized = self.__pattern_whitespace_between_tags.sub('><', normalized)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
 class ConfluenceHandler(ABC, metaclass=SingletonABCMeta):
     _confluence_root_page: str = 'Support'
     _confluence_parent_page: str = 'Support Log Broker-Monitor'
@@ -713,6 +832,14 @@ class ConfluenceHandler(ABC, metaclass=SingletonABCMeta):
     def __init__(self):
         self._mapper = ConfluenceNodeMapper()
         self._confluence = ConfluenceConnection()
+        self._manifest = ConfluencePageManifest()
+
+    def _update_page_if_changed(self, pagename: str, content: str):
+        if self._manifest.is_page_unchanged(pagename, content):
+            logging.info('Content of page %s is unchanged. Skipping update', pagename)
+            return
+        self._confluence.update_confluence_page(pagename, content)
+        self._manifest.mark_page_uploaded(pagename, content)
 
 
 class ConfluencePageHandler(ConfluenceHandler):
@@ -724,6 +851,7 @@ class ConfluencePageHandler(ConfluenceHandler):
     def __init__(self):
         super().__init__()
         self.__loader = TemplatePageLoader()
+        self.__creator = TemplatePageElementCreator()
         self.__start_date_writer = TemplatePageMonitoringStartDateWriter()
         self.__migrator = TemplatePageMigrator()
         self.__content_writers = [
@@ -742,16 +870,22 @@ class ConfluencePageHandler(ConfluenceHandler):
             page = self.__loader.get_template_page()
             page = self.__start_date_writer.add_content_to_template_page(page, node_id)
             self._confluence.create_confluence_page(common_name, self._confluence_parent_page, page)
+            self._manifest.remove_page(common_name)
         page = self._confluence.get_page_content(common_name)
         if self.__migrator.is_template_page_outdated(page):
             page = self.__migrator.migrate_page_template_to_newer_version(page)
         page = self.__write_content_to_page_template(page, node_id)
-        self._confluence.update_confluence_page(common_name, page)
+        self._update_page_if_changed(common_name, page)
 
     def __write_content_to_page_template(self, template: str, node_id: str) -> str:
+        """
+        The page is parsed and indexed once, passed through all content writers and serialized once at the end
+        """
+        template_soup = self.__creator.convert_page_to_soup(template)
+        slots = TemplatePageSlotIndex(template_soup)
         for content_writer in self.__content_writers:
-            template = content_writer.add_content_to_template_page(template, node_id)
-        return template
+            content_writer.add_content_to_template_soup(template_soup, node_id, slots)
+        return str(template_soup)
 
 
 class SummaryTableCreator:
@@ -791,11 +925,11 @@ class SummaryTableCreator:
         return header
 
     def create_summary_table_row_from_confluence_page(self, commonname: str, confluence_page: str) -> Tag:
-        template = self.__creator.convert_element_to_soup(confluence_page)
+        template = TemplatePageSlotIndex(self.__creator.convert_page_to_soup(confluence_page))
         node_link = self.__creator.create_ac_link_element(commonname)
         node = self.__creator.create_html_element('td', {'style': 'text-align: left;'})
         node.append(node_link)
-        status_element = template.find(class_='status')
+        status_element = template.get('status')
         interface = self.__create_table_data_from_page_template_key(template, 'interface_import')
         status = self.__creator.create_td_html_element(status_element.contents[0], centered=True)
         last_check = self.__create_table_data_from_page_template_key(template, 'last_check')
@@ -807,14 +941,14 @@ class SummaryTableCreator:
         row.extend([node, interface, last_check, status, todays_imports, todays_errors, todays_error_rate, last_weeks_error_rate])
         return row
 
-    def __create_table_data_from_page_template_key(self, template_page: bs4.BeautifulSoup, key: str) -> Tag:
-        value = template_page.find(class_=key).string
+    def __create_table_data_from_page_template_key(self, template_page: TemplatePageSlotIndex, key: str) -> Tag:
+        value = template_page.get(key).string
         td = self.__creator.create_td_html_element(value, centered=True)
         return td
 
-    def __get_sum_of_two_table_data_elements(self, template_page: bs4.BeautifulSoup, key1: str, key2: str) -> Tag:
-        value1 = template_page.find(class_=key1).string
-        value2 = template_page.find(class_=key2).string
+    def __get_sum_of_two_table_data_elements(self, template_page: TemplatePageSlotIndex, key1: str, key2: str) -> Tag:
+        value1 = template_page.get(key1).string
+        value2 = template_page.get(key2).string
         if value1 == '-' and value2 == '-':
             sum_values = '-'
         else:
@@ -843,7 +977,7 @@ class SummaryPageHandler(ConfluenceHandler):
         """
         page_template = self.__loader.get_template_summary()
         page = self.__content_writer.add_content_to_template(page_template, table, image)
-        self._confluence.update_confluence_page(self._confluence_parent_page, page)
+        self._update_page_if_changed(self._confluence_parent_page, page)
 
 
 class ConfluencePageHandlerManager(ConfluenceHandler):
@@ -864,8 +998,12 @@ class ConfluencePageHandlerManager(ConfluenceHandler):
         self.__init_parent_page()
 
     def __init_parent_page(self):
+        """
+        The IDs of all node pages are loaded at once with the children of the parent page
+        """
         if not self._confluence.does_page_exists(self._confluence_parent_page):
             self._confluence.create_confluence_page(self._confluence_parent_page, self._confluence_root_page, "")
+        self._confluence.load_page_ids_of_children(self._confluence_parent_page)
 
     def upload_node_information_as_confluence_pages(self):
         node_ids = self._mapper.get_all_keys()
@@ -875,6 +1013,9 @@ class ConfluencePageHandlerManager(ConfluenceHandler):
                 self.__handler.upload_node_information_as_confluence_page(node_id)
             else:
                 logging.info('Directory for id %s not found. Skipping...', node_id)
+        updated, skipped = self._manifest.get_number_of_updated_pages(), self._manifest.get_number_of_skipped_pages()
+        if updated + skipped:
+            logging.info('Confluence pages updated: %d, skipped as unchanged: %d (%.1f%%)', updated, skipped, 100 * skipped / (updated + skipped))
 
     def upload_summary_for_confluence_pages(self):
         node_ids = self._mapper.get_all_keys()
@@ -915,11 +1056,11 @@ class ConfluencePageHandlerManager(ConfluenceHandler):
         for node_id in node_ids:
             name_csv = self.__csv_handler.generate_node_csv_name(node_id)
             path_csv = os.path.join(self.__working_dir, node_id, name_csv)
-            if os.path.exists(path_csv):
+            if self.__csv_handler.does_csv_file_exist(path_csv):
                 valid_paths.append(path_csv)
 
         save_path = os.path.join(self.__resources_dir, 'error_rates_hist.png')
-        cman = ChartManager(csv_paths=valid_paths, save_path=save_path, mapper=self._mapper)
+        cman = ChartManager(csv_paths=valid_paths, save_path=save_path, mapper=self._mapper, csv_handler=self.__csv_handler)
         cman.heat_map()
         return save_path
 
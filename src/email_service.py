@@ -28,14 +28,13 @@ import sys
 from abc import ABC, abstractmethod
 from email.mime.text import MIMEText
 
-import bs4
 import pandas as pd
 from dateutil import parser
 from packaging import version
 
 from common import MailSender, TextWriter
-from common import Main, ConfluenceConnection, ConfluenceNodeMapper, InfoCSVHandler, ResourceLoader, SingletonABCMeta, \
-    SingletonMeta, TimestampHandler
+from common import Main, ConfluenceConnection, ConfluenceNodeMapper, HTMLSoupFactory, InfoCSVHandler, ResourceLoader, \
+    SingletonABCMeta, SingletonMeta, TimestampHandler
 
 
 # TODO: send mail on high error rate
@@ -45,7 +44,6 @@ class MailTemplateHandler(ResourceLoader, ABC):
     """
     _template_name: str = None
     _text_subtype: str = 'html'
-    _parser: str = 'html.parser'
     _encoding: str = 'iso-8859-1'
 
     @abstractmethod
@@ -65,7 +63,7 @@ class OfflineMailTemplateHandler(MailTemplateHandler):
     _template_name: str = 'template_mail_offline.html'
 
     def get_mail_template_filled_with_information_from_template_page(self, template_page: str) -> MIMEText:
-        soup = bs4.BeautifulSoup(template_page, self._parser)
+        soup = HTMLSoupFactory().parse(template_page)
         clinic_name = soup.find(class_='clinic_name').text
         last_contact = soup.find(class_='last_contact').text
         formatted_last_contact = self._format_date_string_to_german_format(last_contact)
@@ -95,7 +93,7 @@ class NoImportsMailTemplateHandler(MailTemplateHandler):
         return path_csv
 
     def get_mail_template_filled_with_information_from_template_page(self, template_page: str) -> MIMEText:
-        soup = bs4.BeautifulSoup(template_page, self._parser)
+        soup = HTMLSoupFactory().parse(template_page)
         clinic_name = soup.find(class_='clinic_name').text
         last_write = soup.find(class_='last_write').text
         last_write = self.__get_last_import_date_from_csv() if last_write == '-' else last_write
@@ -108,12 +106,13 @@ class NoImportsMailTemplateHandler(MailTemplateHandler):
         return mail
 
     def __get_last_import_date_from_csv(self) -> str:
-        df = self.__handler.read_csv_as_df(self.__csv_path)
-        series = df['last_write']
-        filtered_series = series[series != '-']
-        if filtered_series.empty:
-            return '???'
-        return filtered_series.iloc[-1]
+        """
+        The CSV is read backwards until the latest row with a last write is found
+        """
+        for row in self.__handler.iter_rows_reversed(self.__csv_path):
+            if row['last_write'] != '-':
+                return row['last_write']
+        return '???'
 
 
 class OutdatedVersionMailTemplateHandler(MailTemplateHandler):
@@ -128,7 +127,7 @@ class OutdatedVersionMailTemplateHandler(MailTemplateHandler):
         self.__current_version_i2b2 = os.getenv('AKTIN.I2B2_VERSION')
 
     def get_mail_template_filled_with_information_from_template_page(self, template_page: str) -> MIMEText:
-        soup = bs4.BeautifulSoup(template_page, self._parser)
+        soup = HTMLSoupFactory().parse(template_page)
         clinic_name = soup.find(class_='clinic_name').text
         version_dwh = soup.find(class_='dwh-j2ee').text
         content = self._get_resource_as_string(self._template_name, self._encoding)
@@ -142,7 +141,6 @@ class OutdatedVersionMailTemplateHandler(MailTemplateHandler):
 
 
 class NotificationHandler(metaclass=SingletonABCMeta):
-    _parser: str = 'html.parser'
     _my_status: str
     _handler: MailTemplateHandler
 
@@ -182,7 +180,7 @@ class OfflineNotificationHandler(NotificationHandler):
         self._handler = OfflineMailTemplateHandler()
 
     def did_my_status_occur(self, template_page: str) -> bool:
-        soup = bs4.BeautifulSoup(template_page, self._parser)
+        soup = HTMLSoupFactory().parse(template_page)
         element_status = soup.find(class_='status')
         status = element_status.find('ac:parameter', attrs={'ac:name': 'title'})
         return status.text == self._my_status
@@ -198,7 +196,7 @@ class NoImportsNotificationHandler(NotificationHandler):
     _my_status: str = 'NO IMPORTS'
 
     def did_my_status_occur(self, template_page: str) -> bool:
-        soup = bs4.BeautifulSoup(template_page, self._parser)
+        soup = HTMLSoupFactory().parse(template_page)
         element_status = soup.find(class_='status')
         status = element_status.find('ac:parameter', attrs={'ac:name': 'title'})
         return status.text == self._my_status
@@ -221,7 +219,7 @@ class OutdatedVersionNotificationHandler(NotificationHandler):
         self.__current_version_dwh = os.getenv('AKTIN.DWH_VERSION')
 
     def did_my_status_occur(self, template_page: str) -> bool:
-        soup = bs4.BeautifulSoup(template_page, self._parser)
+        soup = HTMLSoupFactory().parse(template_page)
         dwh_version = soup.find(class_='dwh-j2ee').text
         formatted_version = dwh_version.replace('dwh-j2ee-', '')
         if formatted_version and formatted_version != '-':
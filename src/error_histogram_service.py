@@ -12,7 +12,7 @@ import pandas as pd
 import matplotlib.colors as mc
 import matplotlib.pyplot as plt
 import numpy as np
-from src.common import ConfluenceNodeMapper
+from src.common import ConfluenceNodeMapper, CSVHandler, InfoCSVHandler
 
 
 class HeatMapFactory:
@@ -70,11 +70,16 @@ class HeatMapFactory:
 
 class ChartManager:
     def __init__(self, mapper: ConfluenceNodeMapper, csv_paths: list = None,
-                 save_path: str = "error_rates_histogram.png", max_days: int = 42):
+                 save_path: str = "error_rates_histogram.png", max_days: int = 42, csv_handler: CSVHandler = None):
+        """
+        The CSV files are read by csv_handler, so the heatmap shares the parsed files with the other
+        readers of the process
+        """
         self.mapper = mapper
         self.csv_paths = csv_paths if csv_paths is not None else []
         self.save_path = save_path
         self.max_days = max_days
+        self.csv_handler = csv_handler if csv_handler is not None else InfoCSVHandler()
 
     def heat_map(self):
         """
@@ -123,7 +128,7 @@ class ChartManager:
         """
         error_rates_df = []
 
-        _df = pd.read_csv(csv_file, sep=';')
+        _df = self.csv_handler.read_csv_as_df(csv_file)
         try:
             _df['date'] = pd.to_datetime(_df['date'], format='%Y-%m-%d %H:%M:%S.%f%z')
         except Exception as e:
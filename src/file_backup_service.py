@@ -26,7 +26,7 @@ Created on 14.02.2024
 import os
 import sys
 from abc import ABC
-from common import SingletonABCMeta, ConfluenceNodeMapper, ConfluenceConnection, Main
+from common import SingletonABCMeta, ConfluenceNodeMapper, ConfluenceConnection, ErrorCSVHandler, FileArchiver, InfoCSVHandler, Main
 
 
 # Implementation of classes needed from the original "csv_to_confluence.py"
@@ -48,16 +48,34 @@ class FileBackupManager(ConfluenceHandler):
     def __init__(self):
         super().__init__()
         self.__working_dir = os.getenv('DIR.WORKING')
+        self.__archiver = FileArchiver()
 
     def backup_files(self):
         """
         Backs up files of all configured broker nodes by uploading them as attachments to the corresponding Confluence page.
+        CSV files and log lines of closed years are compressed before, so they are uploaded as archives.
         """
         node_ids = self._mapper.get_all_keys()
         for node_id in node_ids:
-            self.__backup_files_with_line_ending(node_id, 'csv')
-            self.__backup_files_with_line_ending(node_id, 'txt')
-            self.__backup_files_with_line_ending(node_id, 'log')
+            self.__export_csv_files(node_id)
+            self.__archive_closed_years(node_id)
+            for line_ending in ['csv', 'txt', 'log']:
+                self.__backup_files_with_line_ending(node_id, line_ending)
+                for suffix in FileArchiver.get_archive_suffixes():
+                    self.__backup_files_with_line_ending(node_id, ''.join([line_ending, suffix]))
+
+    def __export_csv_files(self, node_id: str):
+        """
+        With the SQLite storage backend, the CSV files of the node are only written on demand
+        """
+        node_dir = os.path.join(self.__working_dir, node_id)
+        InfoCSVHandler().export_csv_files_of_node(node_id, node_dir)
+        ErrorCSVHandler().export_csv_files_of_node(node_id, node_dir)
+
+    def __archive_closed_years(self, node_id: str):
+        node_dir = os.path.join(self.__working_dir, node_id)
+        if os.path.isdir(node_dir):
+            self.__archiver.archive_closed_years(node_dir)
 
     def __backup_files_with_line_ending(self, node_id: str, line_ending: str):
         node_dir = os.path.join(self.__working_dir, node_id)
@@ -65,7 +83,8 @@ class FileBackupManager(ConfluenceHandler):
         name = self._mapper.get_node_value_from_mapping_dict(node_id, 'COMMON_NAME')
         for filename in files_list:
             filepath = os.path.join(node_dir, filename)
-            self._confluence.upload_file_as_attachement_to_page(name, filepath, 'text/csv')
+            content_type = FileArchiver.get_content_type(filepath, 'text/csv')
+            self._confluence.upload_file_as_attachement_to_page(name, filepath, content_type)
 
     @staticmethod
     def __get_all_files_in_directory_with_line_ending(directory: str, line_ending: str) -> list:
@@ -23,13 +23,17 @@ Created on 19.01.2022
 #
 #
 
+import heapq
+import logging
 import os
 import sys
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
 
-from common import Main, BrokerNodeConnection, ErrorCSVHandler, InfoCSVHandler, SingletonABCMeta, TimestampHandler, TextWriter, DataWriter
+from common import Main, BrokerNodeConnection, BrokerNodeUnavailableError, ErrorCSVHandler, ErrorFingerprinter, InfoCSVHandler, NodeHistory, SingletonABCMeta, TimestampHandler, TextWriter, DataWriter
 
 
 class BrokerNodeRetriever(ABC, metaclass=SingletonABCMeta):
@@ -45,8 +49,7 @@ class BrokerNodeRetriever(ABC, metaclass=SingletonABCMeta):
 
     def _init_node_directory_if_nonexisting(self, foldername: str) -> str:
         my_dir = os.path.join(self._working_dir, foldername)
-        if not os.path.isdir(my_dir):
-            os.makedirs(my_dir)
+        os.makedirs(my_dir, exist_ok=True)
         return my_dir
 
     @abstractmethod
@@ -60,6 +63,10 @@ class NodeInfoRetriever(BrokerNodeRetriever):
     """
     _handler = InfoCSVHandler()
 
+    def __init__(self):
+        super().__init__()
+        self.__history = NodeHistory(self._handler)
+
     def download_broker_data_to_file(self, node_id: str):
         """
         Calls AKTIN Broker Endpoints to get import statistics of the connected node and writes the response to a CSV file.
@@ -67,23 +74,26 @@ class NodeInfoRetriever(BrokerNodeRetriever):
         - Computes differences to the last row in the CSV file (assuming it contains the import statistics of yesterday).
         - Import stats are resetted on DWH restart, so no daily differences are calculated then.
         - Running the method multiple times will overwrite the row of the current day each time.
+        - Only the last two rows are read (from last year's CSV file, if the current one has less rows),
+          and only the last row is replaced or a new row is appended.
         - All date information from the broker server is converted into a local, human-readable format.
         - The variables 'last-reject' and 'last-write' from the broker server can be None if no data was imported or no error occurred.
-        - Missing or not computable values are added as '-'.
-        - The CSV file is rotated each year to limit its file size.
-        - If the CSV file is empty or newly created, the existence of the last year's CSV file is checked.
+        - Missing or not computable values are added as '-'. The rows are read with the types of the CSV schema.
+        - The CSV file is rotated each year to limit its file size. At the turn of the year, the last row of
+          the previous year is used to compute daily differences if yesterday's date was New Year's Eve.
         """
         csv_name = self._handler.generate_node_csv_name(node_id)
         working_dir = self._init_node_directory_if_nonexisting(node_id)
         csv_path = self._handler.init_csv_file(working_dir, csv_name)
         node = self._broker_node_connection.get_broker_node(node_id)
         stats = self._broker_node_connection.get_broker_node_stats(node_id)
-        df = self._handler.read_csv_as_df(csv_path)
-        df = self.__delete_todays_row_if_exists(df)
-        if df.empty:
-            csv_row = self.__get_last_row_of_last_years_csv_if_exists(node_id, working_dir)
-        else:
-            csv_row = df.iloc[-1]
+        df = self._handler.convert_to_typed_df(self.__history.get_last_rows(node_id, 2))
+        is_todays_row_written = self.__is_last_row_of_today(df)
+        if is_todays_row_written:
+            df = df.head(-1)
+            if self.__is_last_row_of_today(df):
+                raise SystemExit('date of today was found in multiple rows!!')
+        csv_row = df.iloc[-1] if not df.empty else None
         if csv_row is not None:
             if self.__was_last_check_yesterday(csv_row) and self.__are_dwh_start_date_equal(csv_row, stats):
                 daily_map = self.__compute_daily_stats(csv_row, stats)
@@ -93,52 +103,42 @@ class NodeInfoRetriever(BrokerNodeRetriever):
             daily_map = self.__generate_empty_daily_stats()
         stats_map = self.__generate_row_stats(node, stats)
         stats_map.update(daily_map)
-        stats_dict = pd.DataFrame(stats_map, index=[0])
-        df = pd.concat([df, stats_dict])
-        self._handler.write_data_to_file(df, csv_path)
-
-    def __delete_todays_row_if_exists(self, csv: pd.DataFrame) -> pd.DataFrame:
-        """
-        Each row should represent one day, and no duplicates are allowed.
-        """
-        if not csv.empty:
-            current_date = self._timestamp_handler.get_current_date()
-            current_ymd = self._timestamp_handler.get_utc_ymd_from_date_string(current_date)
-            last_ymd_of_csv = self._timestamp_handler.get_utc_ymd_from_date_string(csv.iloc[-1].date)
-            if last_ymd_of_csv == current_ymd:
-                csv = csv.head(-1)
-            if any(csv['date'] == current_ymd):
-                raise SystemExit('date of today was found in multiple rows!!')
-        return csv
+        if is_todays_row_written:
+            self._handler.replace_last_row_in_file(stats_map, csv_path)
+        else:
+            self._handler.append_row_to_file(stats_map, csv_path)
 
-    def __get_last_row_of_last_years_csv_if_exists(self, node_id: str, working_dir: str) -> pd.DataFrame:
+    def __is_last_row_of_today(self, csv: pd.DataFrame) -> bool:
         """
-        Retrieves the last row of the CSV file from the last year if it exists.
-        This is important at the turn of the year to compute daily differences if yesterday's date was New Year's Eve.
+        Each row should represent one day, and no duplicates are allowed. As rows are
+        ordered by date, only the last row can be the one of today.
         """
-        current_year = self._timestamp_handler.get_current_year()
-        last_year = str(int(current_year) - 1)
-        last_year_csv_name = self._handler.generate_node_csv_name(node_id, last_year)
-        last_year_csv_path = os.path.join(working_dir, last_year_csv_name)
-        if os.path.isfile(last_year_csv_path):
-            last_years_df = self._handler.read_csv_as_df(last_year_csv_path)
-            return last_years_df.iloc[-1]
-        return None
+        if csv.empty or pd.isna(csv.iloc[-1].date):
+            return False
+        current_date = self._timestamp_handler.get_current_date()
+        current_ymd = self._timestamp_handler.get_utc_ymd_from_date_string(current_date)
+        last_ymd_of_csv = csv.iloc[-1].date.strftime('%Y-%m-%d')
+        return last_ymd_of_csv == current_ymd
 
     def __was_last_check_yesterday(self, csv_row: pd.DataFrame) -> bool:
         """
         This is a consistency check. Today's stats cannot be computed without yesterday's stats.
+        A row without a valid date is never the one of yesterday.
         """
+        if pd.isna(csv_row.date):
+            return False
         yesterdays_date = self._timestamp_handler.get_yesterdays_date()
         yesterdays_ymd = self._timestamp_handler.get_utc_ymd_from_date_string(yesterdays_date)
-        last_ymd_of_csv = csv_row.date[:10]
+        last_ymd_of_csv = csv_row.date.strftime('%Y-%m-%d')
         return last_ymd_of_csv == yesterdays_ymd
 
     def __are_dwh_start_date_equal(self, csv_row: pd.DataFrame, stats: BrokerNodeConnection.BrokerNodeStats) -> bool:
         """
         This is a consistency check. Import stats of AKTIN DWH are reset on each restart.
         """
-        last_start = self._timestamp_handler.get_utc_ymd_hms_from_date_string(csv_row.last_start)
+        if pd.isna(csv_row.last_start):
+            return False
+        last_start = csv_row.last_start.strftime('%Y-%m-%d %H:%M:%S')
         dwh_start = self._timestamp_handler.get_utc_ymd_hms_from_date_string(stats.dwh_start)
         return last_start == dwh_start
 
@@ -208,33 +208,128 @@ class NodeErrorRetriever(BrokerNodeRetriever):
     Retrieves import errors from a broker node and saves them to a CSV file.
     """
     _handler = ErrorCSVHandler()
+    __fingerprinter = ErrorFingerprinter()
 
     def download_broker_data_to_file(self, node_id: str):
         """
         Downloads import errors from the connected broker node and writes them to a CSV file.
-        - Each row in the CSV file represents one occurred error.
+        - Each row in the CSV file represents one fingerprint of occurred errors. Errors which only differ
+          in numbers, UUIDs or paths share a fingerprint and are collapsed into a single row.
+        - The raw contents of a fingerprint are tracked as variants with their own 'repeats'. The row
+          holds the sum of all variant repeats and the content of the last reported variant as sample.
+          Only the latest variants are tracked, the repeats of older ones are summed up as 'other'.
         - Logged errors can be updated on the broker side, where the 'timestamp' is updated
           and 'repeats' is incremented.
         - Updates in the CSV file are done by deleting and re-appending the corresponding row.
+        - Rows are ordered by their timestamp (newest first). As the logged rows are already ordered,
+          new rows are merged into them instead of sorting the whole file again.
+        - The CSV file is only rewritten if an error was added or updated or if logged rows without
+          a fingerprint were collapsed.
         - Only errors of the current year are tracked in the CSV file to limit its size.
         - Similar to NodeInfoFetcher, the CSV file is rotated each year.
         """
         csv_name = self._handler.generate_node_csv_name(node_id)
         working_dir = self._init_node_directory_if_nonexisting(node_id)
         csv_path = self._handler.init_csv_file(working_dir, csv_name)
-        errors = self._broker_node_connection.get_broker_node_errors(node_id)
-        df = self._handler.read_csv_as_df(csv_path)
+        errors = self._broker_node_connection.iter_broker_node_errors(node_id)
+        df = self._handler.read_csv_as_df(csv_path).reindex(columns=self._handler.get_csv_columns())
+        index, is_collapsed = self.__create_fingerprint_index(df.to_dict('records'))
+        new_rows = self.__merge_errors_into_index(index, errors)
+        if new_rows or is_collapsed:
+            kept_rows = [row for fingerprint, row in index.items() if fingerprint not in new_rows]
+            new_rows = list(new_rows.values())
+            if not self.__are_rows_ordered_by_timestamp(kept_rows):
+                kept_rows.sort(key=self.__get_timestamp_of_row, reverse=True)
+            new_rows.sort(key=self.__get_timestamp_of_row, reverse=True)
+            rows = heapq.merge(kept_rows, new_rows, key=self.__get_timestamp_of_row, reverse=True)
+            df = pd.DataFrame(list(rows), columns=self._handler.get_csv_columns())
+            self._handler.write_data_to_file(df, csv_path)
+
+    def __create_fingerprint_index(self, logged_rows: list) -> tuple:
+        """
+        Indexes the logged rows by their fingerprint. Rows written before fingerprinting are
+        fingerprinted here and collapsed, if they share a fingerprint. Returns the index and
+        whether any row was changed by this.
+        """
+        index = {}
+        is_changed = False
+        for row in logged_rows:
+            if pd.isna(row['fingerprint']):
+                row = self.__create_error_row(row['timestamp'], row['repeats'], row['content'])
+                is_changed = True
+            fingerprint = row['fingerprint']
+            if fingerprint in index:
+                index[fingerprint] = self.__combine_rows(index[fingerprint], row)
+                is_changed = True
+            else:
+                index[fingerprint] = row
+        return index, is_changed
+
+    def __combine_rows(self, newer_row: dict, older_row: dict) -> dict:
+        variants = self.__fingerprinter.parse_variants(older_row['variants'])
+        variants.update(self.__fingerprinter.parse_variants(newer_row['variants']))
+        return {
+            'timestamp': max(newer_row['timestamp'], older_row['timestamp']),
+            'repeats': self.__sum_repeats_of_variants(variants),
+            'content': newer_row['content'],
+            'fingerprint': newer_row['fingerprint'],
+            'variants': self.__fingerprinter.join_variants(variants)}
+
+    def __merge_errors_into_index(self, index: dict, errors: list) -> tuple:
+        """
+        Merges all errors of the broker at once into the index of the logged rows by their fingerprint.
+        - An error with unchanged repeats of an already tracked variant is skipped.
+        - An unknown variant which is not newer than the logged row is skipped, if variants of the row were
+          dropped. It was most likely dropped before and its repeats are already counted in 'other'.
+        - An update of the only variant of a fingerprint takes over its timestamp, like a single error would.
+        - Otherwise, the row keeps the latest timestamp of all its variants.
+        Returns the rows to insert by their fingerprint. They replace the logged rows of the same fingerprint.
+        """
+        new_rows = {}
+        logged_timestamps = {fingerprint: row['timestamp'] for fingerprint, row in index.items()}
         for error in errors:
             if self.__did_error_appear_this_year(error):
-                error_row = self.__convert_error_to_row(error)
-                if self.__is_error_already_logged(df, error_row):
-                    if self.__did_error_row_repeats_change(df, error_row):
-                        df = self.__delete_old_error_row(df, error_row)
-                        df = pd.concat([df, error_row])
-                else:
-                    df = pd.concat([df, error_row])
-        df = df.sort_values(by='timestamp', ascending=False)
-        self._handler.write_data_to_file(df, csv_path)
+                repeats = self.__get_repeats_of_error(error)
+                error_row = self.__create_error_row(error.timestamp, repeats, error.content)
+                fingerprint = error_row['fingerprint']
+                logged_row = index.get(fingerprint)
+                if logged_row is not None:
+                    variants = self.__fingerprinter.parse_variants(logged_row['variants'])
+                    variant = self.__fingerprinter.create_variant_hash(error.content)
+                    if variants.get(variant) == repeats:
+                        continue
+                    if variant not in variants and self.__fingerprinter.has_dropped_variants(variants) and error.timestamp <= logged_timestamps.get(fingerprint, ''):
+                        continue
+                    timestamp = error.timestamp if set(variants) == {variant} else max(error.timestamp, logged_row['timestamp'])
+                    variants.pop(variant, None)
+                    variants[variant] = repeats
+                    error_row.update({
+                        'timestamp': timestamp,
+                        'repeats': self.__sum_repeats_of_variants(variants),
+                        'variants': self.__fingerprinter.join_variants(variants)})
+                new_rows[fingerprint] = error_row
+                index[fingerprint] = error_row
+        return new_rows
+
+    def __create_error_row(self, timestamp: str, repeats: str, content: str) -> dict:
+        variant = self.__fingerprinter.create_variant_hash(content)
+        return {
+            'timestamp': timestamp,
+            'repeats': repeats,
+            'content': content,
+            'fingerprint': self.__fingerprinter.create_fingerprint(content),
+            'variants': self.__fingerprinter.join_variants({variant: repeats})}
+
+    def __sum_repeats_of_variants(self, variants: dict) -> str:
+        return str(sum([self.__fingerprinter.count_repeats(repeats) for repeats in variants.values()]))
+
+    @staticmethod
+    def __get_timestamp_of_row(row: dict) -> str:
+        return row['timestamp']
+
+    @staticmethod
+    def __are_rows_ordered_by_timestamp(rows: list) -> bool:
+        return all(previous['timestamp'] >= current['timestamp'] for previous, current in zip(rows, rows[1:]))
 
     def __did_error_appear_this_year(self, error: BrokerNodeConnection.BrokerNodeError) -> bool:
         current_year = self._timestamp_handler.get_current_year()
@@ -242,34 +337,12 @@ class NodeErrorRetriever(BrokerNodeRetriever):
         return current_year == year_of_error
 
     @staticmethod
-    def __convert_error_to_row(error: BrokerNodeConnection.BrokerNodeError) -> pd.DataFrame:
+    def __get_repeats_of_error(error: BrokerNodeConnection.BrokerNodeError) -> str:
         """
         The var 'repeats' from broker-server can be None, if the error occured just once.
         Var 'timestamp' is in local timezone.
         """
-        new_row = {
-            'timestamp': error.timestamp,
-            'repeats': error.repeats if error.repeats is not None else '1',
-            'content': error.content}
-        return pd.DataFrame(new_row, index=[0])
-
-    @staticmethod
-    def __is_error_already_logged(csv: pd.DataFrame, error_row: pd.DataFrame) -> bool:
-        set_csv = set(csv['content'])
-        set_error = set(error_row['content'])
-        return any(set_csv.intersection(set_error))
-
-    @staticmethod
-    def __did_error_row_repeats_change(csv: pd.DataFrame, error_row: pd.DataFrame) -> bool:
-        df_intersection = pd.merge(csv, error_row, on='content', how='inner')
-        repeats_csv = df_intersection['repeats_x'].values
-        repeats_row_error = df_intersection['repeats_y'].values
-        return repeats_csv != repeats_row_error
-
-    @staticmethod
-    def __delete_old_error_row(csv: pd.DataFrame, error_row: pd.DataFrame) -> pd.DataFrame:
-        idx = csv.index[csv['content'] == error_row['content'][0]]
-        return csv.drop(index=idx)
+        return error.repeats if error.repeats is not None else '1'
 
 
 class NodeResourceRetriever(BrokerNodeRetriever):
@@ -278,57 +351,84 @@ class NodeResourceRetriever(BrokerNodeRetriever):
     """
     _handler = TextWriter()
 
+    def __init__(self):
+        super().__init__()
+        self.__lock = threading.Lock()
+        self.__count_skipped = 0
+
     def download_broker_data_to_file(self, node_id: str):
+        """
+        The validators of the last response of each resource are kept in a cache file in the node directory.
+        """
         dir_working = self._init_node_directory_if_nonexisting(node_id)
-        self.__fetch_broker_node_resource_to_text_file('versions', node_id, dir_working)
-        self.__fetch_broker_node_resource_to_text_file('rscript', node_id, dir_working)
-        self.__fetch_broker_node_resource_to_text_file('python', node_id, dir_working)
-        self.__fetch_broker_node_resource_to_text_file('import-scripts', node_id, dir_working)
+        cachepath = self.__generate_validators_cache_path(node_id, dir_working)
+        cache = self._handler.load_txt_file_as_dict(cachepath) if os.path.exists(cachepath) else {}
+        self.__fetch_broker_node_resource_to_text_file('versions', node_id, dir_working, cache)
+        self.__fetch_broker_node_resource_to_text_file('rscript', node_id, dir_working, cache)
+        self.__fetch_broker_node_resource_to_text_file('python', node_id, dir_working, cache)
+        self.__fetch_broker_node_resource_to_text_file('import-scripts', node_id, dir_working, cache)
+        self._handler.save_dict_as_txt_file(cache, cachepath)
+
+    def get_number_of_skipped_resources(self) -> int:
+        return self.__count_skipped
+
+    def reset_number_of_skipped_resources(self):
+        with self.__lock:
+            self.__count_skipped = 0
 
-    def __fetch_broker_node_resource_to_text_file(self, resource_type: str, node_id: str, working_dir: str):
+    def __fetch_broker_node_resource_to_text_file(self, resource_type: str, node_id: str, working_dir: str, cache: dict):
         """
         Fetches a specific broker node resource and saves it to a text file.
+        - The resource is requested conditionally. If it did not change since the last run, the text file is kept
+        as it is and nothing is logged.
         - Changes in resource items are logged by comparing the existing information in the file
         (from the previous day) with the current information from the broker.
         - Older information is overwritten with newer information after logging.
         """
-        response = self._broker_node_connection.get_broker_node_resource(node_id, resource_type)
-        response = self.__clean_dictionary(response)
         resourcepath = self.__generate_resource_file_path(resource_type, node_id, working_dir)
+        validators = cache.get(resource_type, {}) if os.path.exists(resourcepath) else {}
+        response = self._broker_node_connection.get_broker_node_resource_if_modified(node_id, resource_type, validators)
+        cache[resource_type] = response.validators
+        if not response.modified:
+            with self.__lock:
+                self.__count_skipped += 1
+            return
+        resources = self.__clean_dictionary(response.resources)
         if os.path.exists(resourcepath):
             resource = self._handler.load_txt_file_as_dict(resourcepath)
             logpath = self.__generate_resource_log_path(resource_type, node_id, working_dir)
-            self.__log_new_and_updated_items(logpath, response, resource)
-            self.__log_deleted_items(logpath, response, resource)
-        self._handler.save_dict_as_txt_file(response, resourcepath)
+            lines = self.__log_new_and_updated_items(resources, resource) + self.__log_deleted_items(resources, resource)
+            if lines:
+                self._handler.write_data_to_file(''.join(lines), logpath)
+        self._handler.save_dict_as_txt_file(resources, resourcepath)
 
-    def __log_new_and_updated_items(self, logpath: str, broker: dict, resource: dict):
+    def __log_new_and_updated_items(self, broker: dict, resource: dict) -> list:
         """
         The log includes the timestamp, resource name, previous version (if exists), and new version.
         """
         broker_set = set(broker.items())
         resource_set = set(resource.items())
         difference = broker_set.difference(resource_set)
-        if difference:
-            for resource_name, new_version in difference:
-                current = self._timestamp_handler.get_current_date()
-                old_version = resource.get(resource_name, 'NEW')
-                data = f'{current} : [{resource_name}] {old_version} --> {new_version}\n'
-                self._handler.write_data_to_file(data, logpath)
+        lines = []
+        for resource_name, new_version in difference:
+            current = self._timestamp_handler.get_current_date()
+            old_version = resource.get(resource_name, 'NEW')
+            lines.append(f'{current} : [{resource_name}] {old_version} --> {new_version}\n')
+        return lines
 
-    def __log_deleted_items(self, logpath: str, broker: dict, resource: dict):
+    def __log_deleted_items(self, broker: dict, resource: dict) -> list:
         """
         The log includes the timestamp, resource name, and the fact that it has been deleted.
         """
         broker_set = set(broker.keys())
         resource_set = set(resource.keys())
         difference = resource_set.difference(broker_set)
-        if difference:
-            for resource_name in difference:
-                current = self._timestamp_handler.get_current_date()
-                old_version = resource.get(resource_name)
-                data = f'{current} : [{resource_name}] {old_version} --> DELETED\n'
-                self._handler.write_data_to_file(data, logpath)
+        lines = []
+        for resource_name in difference:
+            current = self._timestamp_handler.get_current_date()
+            old_version = resource.get(resource_name)
+            lines.append(f'{current} : [{resource_name}] {old_version} --> DELETED\n')
+        return lines
 
     @staticmethod
     def __clean_dictionary(dictionary: dict) -> dict:
@@ -358,23 +458,162 @@ class NodeResourceRetriever(BrokerNodeRetriever):
         name_file = ''.join([node_id, '_log_', resource_type, '.log'])
         return os.path.join(working_dir, name_file)
 
+    @staticmethod
+    def __generate_validators_cache_path(node_id: str, working_dir: str) -> str:
+        """
+        Generates the file path for the cache file with HTTP validators (ETag, Last-Modified, content hash)
+        of all resources of a node
+        """
+        name_file = ''.join([node_id, '_resources_cache.json'])
+        return os.path.join(working_dir, name_file)
+
+
+class RunJournal:
+    """
+    Records the retrievers that completed for each node during the run of the current date.
+    A run that was interrupted (crash, kill) leaves the journal behind, so a restarted run on
+    the same date can skip the work that was already done. A journal of another date is discarded.
+    """
+
+    def __init__(self, filepath: str):
+        self.__filepath = filepath
+        self.__timestamp = TimestampHandler()
+        self.__writer = TextWriter()
+        self.__lock = threading.Lock()
+        self.__date = self.__get_current_ymd()
+        self.__completed = self.__load_completed_of_current_date()
+
+    def __get_current_ymd(self) -> str:
+        return self.__timestamp.get_utc_ymd_from_date_string(self.__timestamp.get_current_date())
+
+    def __load_completed_of_current_date(self) -> dict:
+        if not os.path.isfile(self.__filepath):
+            return {}
+        journal = self.__writer.load_txt_file_as_dict(self.__filepath)
+        if journal.get('date') != self.__date:
+            return {}
+        return journal.get('completed', {})
+
+    def is_completed(self, node_id: str, retriever: str) -> bool:
+        with self.__lock:
+            return retriever in self.__completed.get(node_id, [])
+
+    def mark_completed(self, node_id: str, retriever: str):
+        """
+        The journal is written after each completed retriever, so an interruption loses at most
+        the retriever that was running
+        """
+        with self.__lock:
+            self.__completed.setdefault(node_id, []).append(retriever)
+            journal = {'date': self.__date, 'completed': self.__completed}
+            self.__writer.save_dict_as_txt_file(journal, self.__filepath)
+
+    def get_number_of_completed(self) -> int:
+        with self.__lock:
+            return sum([len(retrievers) for retrievers in self.__completed.values()])
+
+    def close(self):
+        """
+        Removes the journal after a finished run. Otherwise, another run on the same date would skip all nodes
+        """
+        with self.__lock:
+            self.__completed = {}
+            if os.path.isfile(self.__filepath):
+                os.remove(self.__filepath)
+
 
 class NodeRetrieverManager:
     """
     Manages the fetching of broker node information.
+    Nodes are processed in parallel by a bounded pool of workers (BROKER.WORKERS). The retrievers
+    of a single node run one after another, and each node only writes files in its own directory,
+    so no file is written by two workers at the same time.
     """
 
     def __init__(self):
-        self.__list_node_ids = BrokerNodeConnection().get_broker_nodes()
+        self.__broker_node_connection = BrokerNodeConnection()
+        self.__list_node_ids = []
         self.__info_fetcher = NodeInfoRetriever()
         self.__error_fetcher = NodeErrorRetriever()
         self.__resources_fetcher = NodeResourceRetriever()
+        self.__retrievers = {'errors': self.__error_fetcher, 'info': self.__info_fetcher, 'resources': self.__resources_fetcher}
+        self.__workers = int(os.getenv('BROKER.WORKERS'))
+        self.__failed_node_ids = []
+        self.__path_run_report = os.path.join(os.getenv('DIR.WORKING'), 'broker_run_report.json')
+        self.__path_run_journal = os.path.join(os.getenv('DIR.WORKING'), 'broker_run_journal.json')
+        self.__journal = None
+        self.__count_resumed = 0
 
     def fetch_broker_node_information(self):
-        for id_node in self.__list_node_ids:
-            self.__info_fetcher.download_broker_data_to_file(id_node)
-            self.__error_fetcher.download_broker_data_to_file(id_node)
-            self.__resources_fetcher.download_broker_data_to_file(id_node)
+        """
+        With enabled run cache of the broker connection, the node list is fetched once and
+        NodeInfoRetriever and NodeErrorRetriever share the /stats document of a node instead of
+        requesting it twice. NodeErrorRetriever runs first and streams the errors of the document,
+        so only its import statistics are kept for NodeInfoRetriever and the memory usage does not
+        grow with the number of errors.
+        A failure while fetching a node is logged and does not abort the fetching of other nodes.
+        Nodes with an open circuit breaker or nodes left after the deadline of the run are skipped.
+        At the end, a report about the requests of the run is written to broker_run_report.json.
+        Completed retrievers of each node are recorded in broker_run_journal.json. If a previous run of
+        the same date was interrupted, its completed retrievers are skipped. The journal is removed
+        once all nodes were processed.
+        """
+        self.__failed_node_ids = []
+        self.__resources_fetcher.reset_number_of_skipped_resources()
+        self.__journal = RunJournal(self.__path_run_journal)
+        self.__count_resumed = self.__journal.get_number_of_completed()
+        self.__broker_node_connection.enable_run_cache()
+        self.__broker_node_connection.get_request_metrics().clear()
+        started = TimestampHandler().get_current_date()
+        try:
+            self.__list_node_ids = [node.id for node in self.__broker_node_connection.get_broker_nodes()]
+            with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+                futures = {executor.submit(self.__fetch_node_information, id_node): id_node for id_node in self.__list_node_ids}
+                for future in as_completed(futures):
+                    id_node = futures[future]
+                    try:
+                        future.result()
+                    except BrokerNodeUnavailableError as error:
+                        logging.error('Fetching information of node %s skipped: %s', id_node, error)
+                        self.__failed_node_ids.append(id_node)
+                    except (Exception, SystemExit):
+                        logging.exception('Fetching information of node %s failed', id_node)
+                        self.__failed_node_ids.append(id_node)
+        finally:
+            self.__broker_node_connection.clear_run_cache()
+        self.__journal.close()
+        self.__log_run_summary()
+        self.__write_run_report(started)
+
+    def __fetch_node_information(self, id_node: str):
+        try:
+            for name, retriever in self.__retrievers.items():
+                if not self.__journal.is_completed(id_node, name):
+                    retriever.download_broker_data_to_file(id_node)
+                    self.__journal.mark_completed(id_node, name)
+        finally:
+            self.__broker_node_connection.evict_node_from_run_cache(id_node)
+
+    def __log_run_summary(self):
+        connections = self.__broker_node_connection.get_connection_stats()
+        logging.info('Fetched %d of %d broker nodes', len(self.__list_node_ids) - len(self.__failed_node_ids), len(self.__list_node_ids))
+        logging.info('Broker connections opened: %d, reused: %d', connections['opened'], connections['reused'])
+        logging.info('Unchanged node resources skipped: %d', self.__resources_fetcher.get_number_of_skipped_resources())
+        if self.__count_resumed:
+            logging.info('Retrievals skipped from interrupted run: %d', self.__count_resumed)
+        if self.__failed_node_ids:
+            logging.error('Fetching failed for nodes %s', ', '.join(sorted(self.__failed_node_ids)))
+
+    def __write_run_report(self, started: str):
+        """
+        Writes latency, status and payload size of the broker requests of this run per endpoint
+        and the nodes with the longest total request time to a JSON file in the working directory
+        """
+        report = {'started': started,
+                  'finished': TimestampHandler().get_current_date(),
+                  'failed_nodes': sorted(self.__failed_node_ids)}
+        report.update(self.__broker_node_connection.get_request_metrics().create_report())
+        TextWriter().save_dict_as_txt_file(report, self.__path_run_report)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,68 @@
+"""
+Measures the time to parse and serialize the Confluence page template with each
+supported BeautifulSoup backend. Backends that are not installed are skipped. The
+template is measured once more with a code macro, whose body is a CDATA section.
+
+    python test/benchmark/benchmark_html_parser.py [iterations]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import bs4
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import HTMLSoupFactory
+
+PARSERS = ['html.parser', 'lxml']
+CODE_MACRO = '<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[if a < b && c > d:\n    pass]]></ac:plain-text-body></ac:structured-macro>'
+
+
+def load_template_page() -> str:
+    path_template = os.path.join(path_src, 'resources', 'template_page.html')
+    with open(path_template, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def is_parser_installed(parser: str) -> bool:
+    try:
+        bs4.BeautifulSoup('', parser)
+        return True
+    except bs4.FeatureNotFound:
+        return False
+
+
+def measure_parser(page: str, parser: str, iterations: int) -> tuple:
+    factory = HTMLSoupFactory()
+    time_parse, time_serialize = 0.0, 0.0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        soup = factory.parse(page, parser)
+        time_parse += time.perf_counter() - start
+        start = time.perf_counter()
+        str(soup)
+        time_serialize += time.perf_counter() - start
+    return time_parse / iterations, time_serialize / iterations
+
+
+def main(iterations: int):
+    template = load_template_page()
+    pages = {'template': template, 'with CDATA': template + CODE_MACRO}
+    print(f'{"page":<12} {"parser":<12} {"parse [ms]":>12} {"serialize [ms]":>16} {"same output":>12}')
+    for name, page in pages.items():
+        reference = str(HTMLSoupFactory().parse(page, 'html.parser'))
+        for parser in PARSERS:
+            if not is_parser_installed(parser):
+                print(f'{name:<12} {parser:<12} not installed')
+                continue
+            time_parse, time_serialize = measure_parser(page, parser, iterations)
+            is_same = str(HTMLSoupFactory().parse(page, parser)) == reference
+            print(f'{name:<12} {parser:<12} {time_parse * 1000:>12.3f} {time_serialize * 1000:>16.3f} {str(is_same):>12}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
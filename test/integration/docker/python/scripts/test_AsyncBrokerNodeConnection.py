@@ -0,0 +1,185 @@
+import asyncio
+import os
+import unittest
+import xml.etree.ElementTree as et
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from common import AsyncBrokerNodeConnection, ConfigReader
+
+from BrokerNodeDummy import BrokerNodeError, BrokerNodeImports, BrokerNodePython, BrokerNodeVersions, Payload
+
+
+class FakeBroker:
+    """
+    Minimal local stand-in for the broker-server. Serves the XML of the payload classes
+    of BrokerNodeDummy and counts the maximum of simultaneously handled requests
+    """
+    __namespace = 'http://aktin.org/ns/exchange'
+
+    def __init__(self, delay: float = 0.0):
+        self.__delay = delay
+        self.__payloads = {}
+        self.__in_flight = 0
+        self.max_in_flight = 0
+
+    def put_payload(self, node_id: str, endpoint: str, payload: Payload):
+        self.__payloads[(node_id, endpoint)] = payload.to_xml_string()
+
+    def put_error(self, node_id: str, stats: BrokerNodeImports, error: BrokerNodeError):
+        """
+        Like the broker-server, errors are merged into the last-errors of the import statistics
+        """
+        tree_stats = et.fromstring(stats.to_xml_string().encode('utf-8'))
+        tree_error = et.fromstring(error.to_xml_string().encode('utf-8'))
+        tree_stats.find('last-errors').extend(tree_error.find('last-errors'))
+        self.__payloads[(node_id, 'stats')] = et.tostring(tree_stats, encoding='unicode')
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('HEAD', '/broker/status', self.__handle_status)
+        app.router.add_get('/broker/node', self.__handle_node_list)
+        app.router.add_get('/broker/node/{node_id}', self.__handle_node)
+        app.router.add_get('/broker/node/{node_id}/{endpoint}', self.__handle_endpoint)
+        return app
+
+    async def __handle_status(self, _):
+        return web.Response()
+
+    async def __handle_node_list(self, _):
+        node_ids = sorted({node_id for node_id, _ in self.__payloads})
+        nodes = ''.join([self.__create_node_element(node_id) for node_id in node_ids])
+        return await self.__respond(f'<nodes xmlns="{self.__namespace}">{nodes}</nodes>')
+
+    async def __handle_node(self, request):
+        node_id = request.match_info['node_id']
+        content = self.__create_node_element(node_id).replace('<node>', f'<node xmlns="{self.__namespace}">')
+        return await self.__respond(content)
+
+    @staticmethod
+    def __create_node_element(node_id: str) -> str:
+        return f'<node><id>{node_id}</id><clientDN>CN=Node {node_id}</clientDN><last-contact>2020-01-01T00:00:00Z</last-contact></node>'
+
+    async def __handle_endpoint(self, request):
+        key = (request.match_info['node_id'], request.match_info['endpoint'])
+        if key not in self.__payloads:
+            raise web.HTTPNotFound()
+        return await self.__respond(self.__payloads[key])
+
+    async def __respond(self, content: str) -> web.Response:
+        self.__in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.__in_flight)
+        try:
+            await asyncio.sleep(self.__delay)
+            return web.Response(text=content, content_type='application/xml')
+        finally:
+            self.__in_flight -= 1
+
+
+class TestAsyncBrokerNodeConnection(unittest.IsolatedAsyncioTestCase):
+    __DEFAULT_NODE_ID: str = '0'
+    __MAX_CONCURRENT_REQUESTS: int = 3
+
+    @classmethod
+    def setUpClass(cls):
+        ConfigReader().load_config_as_env_vars('settings.toml')
+
+    async def asyncSetUp(self):
+        self.__broker = FakeBroker(delay=0.05)
+        self.__server = TestServer(self.__broker.create_app())
+        await self.__server.start_server()
+        os.environ['BROKER.URL'] = str(self.__server.make_url('')).rstrip('/')
+        os.environ['BROKER.MAX_CONCURRENT_REQUESTS'] = str(self.__MAX_CONCURRENT_REQUESTS)
+
+    async def asyncTearDown(self):
+        await self.__server.close()
+
+    async def test_get_broker_nodes_list(self):
+        for node_id in ['0', '1', '2']:
+            self.__broker.put_payload(node_id, 'stats', self.__create_default_broker_import_stats())
+        async with AsyncBrokerNodeConnection() as connection:
+            list_nodes = await connection.get_broker_nodes()
+        self.assertEqual(['0', '1', '2'], [node.id for node in list_nodes])
+        self.assertEqual('CN=Node 1', list_nodes[1].domain_name)
+        self.assertEqual('2020-01-01T00:00:00Z', list_nodes[1].last_contact)
+
+    async def test_get_broker_node(self):
+        async with AsyncBrokerNodeConnection() as connection:
+            node = await connection.get_broker_node(self.__DEFAULT_NODE_ID)
+        self.assertEqual(self.__DEFAULT_NODE_ID, node.id)
+        self.assertEqual('CN=Node 0', node.domain_name)
+        self.assertEqual('2020-01-01T00:00:00Z', node.last_contact)
+
+    async def test_get_broker_node_stats(self):
+        self.__broker.put_payload(self.__DEFAULT_NODE_ID, 'stats', self.__create_default_broker_import_stats())
+        async with AsyncBrokerNodeConnection() as connection:
+            stats = await connection.get_broker_node_stats(self.__DEFAULT_NODE_ID)
+        self.assertEqual('2020-01-01T00:00:00+01:00', stats.dwh_start)
+        self.assertEqual('2020-01-02T12:00:00+01:00', stats.last_write)
+        self.assertIsNone(stats.last_reject)
+        self.assertEqual('400', stats.imported)
+        self.assertEqual('300', stats.updated)
+        self.assertEqual('200', stats.invalid)
+        self.assertEqual('100', stats.failed)
+
+    async def test_get_broker_nonexisting_node_stats(self):
+        async with AsyncBrokerNodeConnection() as connection:
+            with self.assertRaises(aiohttp.ClientResponseError):
+                _ = await connection.get_broker_node_stats('nonexisting_id')
+
+    async def test_get_broker_node_errors(self):
+        error = BrokerNodeError('2020-01-01T00:00:00+01:00', '5', 'TestError')
+        self.__broker.put_error(self.__DEFAULT_NODE_ID, self.__create_default_broker_import_stats(), error)
+        async with AsyncBrokerNodeConnection() as connection:
+            list_errors = await connection.get_broker_node_errors(self.__DEFAULT_NODE_ID)
+        self.assertEqual(1, len(list_errors))
+        self.assertEqual('2020-01-01T00:00:00+01:00', list_errors[0].timestamp)
+        self.assertEqual('5', list_errors[0].repeats)
+        self.assertEqual('TestError', list_errors[0].content)
+
+    async def test_get_broker_node_resources(self):
+        self.__broker.put_payload(self.__DEFAULT_NODE_ID, 'versions', BrokerNodeVersions('Ubuntu/11.0.13', 'Ubuntu 20.04.1 LTS'))
+        self.__broker.put_payload(self.__DEFAULT_NODE_ID, 'python', BrokerNodePython('3.8.2-0ubuntu2', '1:1.17.4-5ubuntu3', ''))
+        async with AsyncBrokerNodeConnection() as connection:
+            versions = await connection.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'versions')
+            python = await connection.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'python')
+        self.assertEqual('Ubuntu/11.0.13', versions.get('java'))
+        self.assertEqual('Ubuntu 20.04.1 LTS', versions.get('os'))
+        self.assertEqual('3.8.2-0ubuntu2', python.get('python3'))
+        self.assertIsNone(python.get('python3-pandas'))
+
+    async def test_get_broker_node_nonexisting_resource(self):
+        async with AsyncBrokerNodeConnection() as connection:
+            resource = await connection.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'nonexisting')
+        self.assertFalse(resource)
+
+    async def test_requests_in_flight_are_bounded(self):
+        node_ids = [str(i) for i in range(10)]
+        for node_id in node_ids:
+            self.__broker.put_payload(node_id, 'stats', self.__create_default_broker_import_stats())
+            self.__broker.put_payload(node_id, 'versions', BrokerNodeVersions('Ubuntu/11.0.13', 'Ubuntu 20.04.1 LTS'))
+        async with AsyncBrokerNodeConnection() as connection:
+            coroutines = []
+            for node_id in node_ids:
+                coroutines.append(connection.get_broker_node(node_id))
+                coroutines.append(connection.get_broker_node_stats_snapshot(node_id))
+                coroutines.append(connection.get_broker_node_resource(node_id, 'versions'))
+            results = await asyncio.gather(*coroutines)
+        self.assertEqual(30, len(results))
+        self.assertEqual(self.__MAX_CONCURRENT_REQUESTS, self.__broker.max_in_flight)
+
+    @staticmethod
+    def __create_default_broker_import_stats():
+        return BrokerNodeImports(
+            '2020-01-01T00:00:00+01:00',
+            '2020-01-02T12:00:00+01:00',
+            '',
+            '400',
+            '300',
+            '200',
+            '100')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,6 +24,9 @@ class TestBrokerNodeConnection(unittest.TestCase):
         self.__init_new_dummy_and_put_stats_on_node('xxxApiKey890', stats)
         list_nodes = self.__BROKER_NODE_CONNECTION.get_broker_nodes()
         self.assertEqual(3, len(list_nodes))
+        for node in list_nodes:
+            node2 = self.__BROKER_NODE_CONNECTION.get_broker_node(node.id)
+            self.assertEqual(node2.domain_name, node.domain_name)
 
     def test_get_broker_node_stats(self):
         stats = self.__create_default_broker_import_stats()
@@ -73,6 +76,14 @@ class TestBrokerNodeConnection(unittest.TestCase):
         self.assertIsNone(error2.repeats)
         self.assertEqual('TestError', error2.content)
 
+    def test_iter_broker_node_errors(self):
+        error = self.__create_default_broker_error()
+        self.__DUMMY.put_import_info_on_broker(error)
+        list_errors = list(self.__BROKER_NODE_CONNECTION.iter_broker_node_errors(self.__DEFAULT_NODE_ID))
+        self.assertEqual(self.__BROKER_NODE_CONNECTION.get_broker_node_errors(self.__DEFAULT_NODE_ID), list_errors)
+        self.assertEqual(1, len(list_errors))
+        self.assertEqual('TestError', list_errors[0].content)
+
     def test_get_broker_node_empty_errors(self):
         dummy = BrokerNodeDummy(self.__DEFAULT_API_KEY)
         dummy.reset_stats_on_broker()
@@ -64,7 +64,7 @@ class TestNodeErrorRetriever(unittest.TestCase):
     def test_csv_columns(self):
         df = self.__CSV_HANDLER.read_csv_as_df(self.__DEFAULT_CSV_PATH)
         header = list(df.columns)
-        expected_columns = ['timestamp', 'repeats', 'content']
+        expected_columns = ['timestamp', 'repeats', 'content', 'fingerprint', 'variants']
         self.assertTrue(len(expected_columns), len(header))
         self.assertCountEqual(expected_columns, header)
 
@@ -90,6 +90,31 @@ class TestNodeErrorRetriever(unittest.TestCase):
         ts_expected2 = ''.join([str(datetime.now().year), '-05-05 04:00:00+0200'])
         self.__check_error_row_from_csv(df.iloc[1], ts_expected2, '5', 'TestError2')
 
+    def test_update_error_keeps_other_errors(self):
+        self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error2())
+        df = self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error1_update())
+        self.assertEqual(2, df.shape[0])
+        ts_expected = ''.join([str(datetime.now().year), '-10-10 03:00:00+0200'])
+        self.__check_error_row_from_csv(df.iloc[0], ts_expected, '10', 'TestError')
+        ts_expected2 = ''.join([str(datetime.now().year), '-05-05 04:00:00+0200'])
+        self.__check_error_row_from_csv(df.iloc[1], ts_expected2, '5', 'TestError2')
+
+    def test_collapse_near_duplicate_errors(self):
+        self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error3_variant(12, '2'))
+        df = self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error3_variant(13, '3'))
+        self.assertEqual(2, df.shape[0])
+        ts_expected = ''.join([str(datetime.now().year), '-11-11 02:00:00+0100'])
+        self.__check_error_row_from_csv(df.iloc[0], ts_expected, '5', 'Invalid value in line 13')
+        self.assertEqual(2, len(df.iloc[0]['variants'].split('|')))
+
+    def test_update_variant_of_collapsed_error(self):
+        self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error3_variant(12, '2'))
+        self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error3_variant(13, '3'))
+        df = self.__put_import_error_on_broker_and_get_fetched_csv_as_df(self.__create_error3_variant(12, '4'))
+        self.assertEqual(2, df.shape[0])
+        ts_expected = ''.join([str(datetime.now().year), '-11-11 02:00:00+0100'])
+        self.__check_error_row_from_csv(df.iloc[0], ts_expected, '7', 'Invalid value in line 12')
+
     def test_fetch_default_error_to_csv_with_missing_repeats(self):
         error = self.__create_error_without_repeats()
         df = self.__put_import_error_on_broker_and_get_fetched_csv_as_df(error)
@@ -122,6 +147,10 @@ class TestNodeErrorRetriever(unittest.TestCase):
         ts_error = self.__create_local_timestamp_for_broker(datetime.now().year, 5, 5, 2, 0)
         return BrokerNodeError(ts_error, '5', 'TestError2')
 
+    def __create_error3_variant(self, line: int, repeats: str):
+        ts_error = self.__create_local_timestamp_for_broker(datetime.now().year, 11, 11, 1, 0)
+        return BrokerNodeError(ts_error, repeats, f'Invalid value in line {line}')
+
     def __create_error_last_year(self):
         ts_error = self.__create_local_timestamp_for_broker(datetime.now().year - 1, 1, 1, 1, 0)
         return BrokerNodeError(ts_error, '1', 'TestError')
@@ -55,6 +55,18 @@ class TestNodeResourceRetriever(unittest.TestCase):
         content = self.__get_content_of_file_in_working_dir('0_import-scripts.txt')
         self.assertEqual('{"p21": "1.5"}', content)
 
+    def test_skip_unchanged_resources(self):
+        self.__DUMMY.put_resource_on_broker(BrokerNodeVersions('1', '2'), 'versions')
+        self.__RETRIEVER.download_broker_data_to_file(self.__DEFAULT_NODE_ID)
+        count_skipped = self.__RETRIEVER.get_number_of_skipped_resources()
+        self.__RETRIEVER.download_broker_data_to_file(self.__DEFAULT_NODE_ID)
+        self.assertEqual(count_skipped + 4, self.__RETRIEVER.get_number_of_skipped_resources())
+        self.__DUMMY.put_resource_on_broker(BrokerNodeVersions('1', '3'), 'versions')
+        self.__RETRIEVER.download_broker_data_to_file(self.__DEFAULT_NODE_ID)
+        self.assertEqual(count_skipped + 7, self.__RETRIEVER.get_number_of_skipped_resources())
+        content = self.__get_content_of_file_in_working_dir('0_versions.txt')
+        self.assertEqual('{"java": "1", "os": "3"}', content)
+
     def __get_content_of_file_in_working_dir(self, filename: str) -> str:
         path_file = os.path.join(self.__DIR_ROOT, self.__DEFAULT_NODE_ID, filename)
         with open(path_file, 'r') as file:
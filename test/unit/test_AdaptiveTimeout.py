@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import AdaptiveTimeout
+
+
+class TestAdaptiveTimeout(unittest.TestCase):
+
+    def setUp(self):
+        self.__timeout = AdaptiveTimeout(2, 10)
+
+    def test_maximum_without_observations(self):
+        self.assertEqual(10, self.__timeout.get_timeout())
+
+    def test_first_observation(self):
+        self.__timeout.add_observation(1.0)
+        self.assertEqual(3.0, self.__timeout.get_timeout())
+
+    def test_lower_limit(self):
+        for _ in range(50):
+            self.__timeout.add_observation(0.01)
+        self.assertEqual(2, self.__timeout.get_timeout())
+
+    def test_upper_limit(self):
+        for _ in range(50):
+            self.__timeout.add_observation(30.0)
+        self.assertEqual(10, self.__timeout.get_timeout())
+
+    def test_follows_observed_latency(self):
+        for _ in range(50):
+            self.__timeout.add_observation(3.0)
+        timeout_fast = self.__timeout.get_timeout()
+        for _ in range(50):
+            self.__timeout.add_observation(5.0)
+        timeout_slow = self.__timeout.get_timeout()
+        self.assertLess(timeout_fast, timeout_slow)
+        self.assertAlmostEqual(5.0, timeout_slow, places=1)
+
+    def test_variance_increases_timeout(self):
+        for latency in [1.0, 1.0, 1.0, 1.0]:
+            self.__timeout.add_observation(latency)
+        timeout_stable = self.__timeout.get_timeout()
+        for latency in [0.2, 1.8, 0.2, 1.8]:
+            self.__timeout.add_observation(latency)
+        self.assertLess(timeout_stable, self.__timeout.get_timeout())
+
+    def test_backoff_doubles_timeout(self):
+        self.__timeout.add_observation(1.0)
+        self.assertEqual(6.0, self.__timeout.get_timeout(1))
+        self.assertEqual(10, self.__timeout.get_timeout(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
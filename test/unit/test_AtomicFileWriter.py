@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from shutil import rmtree
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import AtomicFileWriter
+
+
+class TestAtomicFileWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__path = os.path.join(self.__dir, 'file.txt')
+
+    def tearDown(self):
+        rmtree(self.__dir)
+
+    def __write_existing_file(self, content: str):
+        with open(self.__path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    def __read_file(self) -> str:
+        with open(self.__path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def test_write_new_file(self):
+        with AtomicFileWriter.open(self.__path, encoding='utf-8') as file:
+            file.write('abc')
+        self.assertEqual('abc', self.__read_file())
+        self.assertEqual(['file.txt'], os.listdir(self.__dir))
+
+    def test_overwrite_file(self):
+        self.__write_existing_file('old')
+        with AtomicFileWriter.open(self.__path, encoding='utf-8') as file:
+            file.write('new')
+        self.assertEqual('new', self.__read_file())
+
+    def test_append_to_file(self):
+        self.__write_existing_file('old')
+        with AtomicFileWriter.open(self.__path, encoding='utf-8', length_kept=None) as file:
+            file.write('new')
+        self.assertEqual('oldnew', self.__read_file())
+
+    def test_truncate_file(self):
+        self.__write_existing_file('old\nrow\n')
+        with AtomicFileWriter.open(self.__path, encoding='utf-8', length_kept=4) as file:
+            file.write('new\n')
+        self.assertEqual('old\nnew\n', self.__read_file())
+
+    def test_keep_file_on_error(self):
+        self.__write_existing_file('old')
+        with self.assertRaises(ValueError):
+            with AtomicFileWriter.open(self.__path, encoding='utf-8') as file:
+                file.write('partial')
+                raise ValueError('interrupted')
+        self.assertEqual('old', self.__read_file())
+        self.assertEqual(['file.txt'], os.listdir(self.__dir))
+
+    def test_keep_file_mode(self):
+        self.__write_existing_file('old')
+        os.chmod(self.__path, 0o640)
+        with AtomicFileWriter.open(self.__path, encoding='utf-8') as file:
+            file.write('new')
+        self.assertEqual(0o640, os.stat(self.__path).st_mode & 0o777)
+
+
+if __name__ == '__main__':
+    unittest.main()
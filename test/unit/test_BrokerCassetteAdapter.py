@@ -0,0 +1,106 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerCassetteAdapter
+
+
+class BrokerStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    responses = {
+        '/broker/node/0/stats': (200, '<import-statistics><imported>400</imported></import-statistics>'),
+        '/broker/node/0/versions': (200, '<properties><entry key="os">Ubuntu 20.04.1 LTS</entry></properties>'),
+    }
+
+    def do_GET(self):
+        status, body = self.responses.get(self.path, (404, ''))
+        if status == 200 and self.headers.get('If-None-Match') == '"v1"':
+            status, body = 304, ''
+        content = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBrokerCassetteAdapter(unittest.TestCase):
+
+    def setUp(self):
+        self.__dir_cassette = tempfile.mkdtemp()
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), BrokerStubHandler)
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        self.__url = f'http://127.0.0.1:{self.__server.server_port}'
+
+    def tearDown(self):
+        self.__stop_server()
+        shutil.rmtree(self.__dir_cassette)
+
+    def __stop_server(self):
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+    def __create_session(self, mode: str) -> requests.Session:
+        session = requests.Session()
+        session.mount('http://', BrokerCassetteAdapter(mode, self.__dir_cassette))
+        return session
+
+    def test_replay_without_server(self):
+        recorded = self.__create_session('record').get(f'{self.__url}/broker/node/0/stats')
+        self.__stop_server()
+        replayed = self.__create_session('replay').get(f'{self.__url}/broker/node/0/stats')
+        self.assertEqual(200, replayed.status_code)
+        self.assertEqual(recorded.content, replayed.content)
+        self.assertEqual('"v1"', replayed.headers.get('ETag'))
+
+    def test_replay_independent_of_broker_url(self):
+        self.__create_session('record').get(f'{self.__url}/broker/node/0/versions')
+        replayed = self.__create_session('replay').get('http://other-broker:8080/broker/node/0/versions')
+        self.assertIn(b'Ubuntu 20.04.1 LTS', replayed.content)
+
+    def test_replay_streamed_response(self):
+        self.__create_session('record').get(f'{self.__url}/broker/node/0/stats')
+        with self.__create_session('replay').get(f'{self.__url}/broker/node/0/stats', stream=True) as response:
+            response.raw.decode_content = True
+            content = response.raw.read()
+        self.assertEqual(b'<import-statistics><imported>400</imported></import-statistics>', content)
+
+    def test_replay_error_status(self):
+        self.__create_session('record').get(f'{self.__url}/broker/node/0/nonexisting')
+        replayed = self.__create_session('replay').get(f'{self.__url}/broker/node/0/nonexisting')
+        self.assertEqual(404, replayed.status_code)
+
+    def test_record_without_conditional_headers(self):
+        headers = {'If-None-Match': '"v1"'}
+        recorded = self.__create_session('record').get(f'{self.__url}/broker/node/0/stats', headers=headers)
+        self.assertEqual(200, recorded.status_code)
+        self.assertIn(b'400', recorded.content)
+
+    def test_replay_missing_record(self):
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.__create_session('replay').get(f'{self.__url}/broker/node/0/stats')
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            BrokerCassetteAdapter('invalid', self.__dir_cassette)
+
+
+if __name__ == '__main__':
+    unittest.main()
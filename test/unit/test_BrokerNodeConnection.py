@@ -0,0 +1,295 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import xml.etree.ElementTree as et
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerNodeConnection, SingletonABCMeta, SingletonMeta
+from node_to_csv import NodeErrorRetriever, NodeInfoRetriever
+
+
+class BrokerStubHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests from 'responses' after the delay in 'delays' and counts the requests per path.
+    Connections are kept alive
+    """
+    protocol_version = 'HTTP/1.1'
+    responses = {}
+    delays = {}
+    requests = Counter()
+    lock = threading.Lock()
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests[self.path] += 1
+        time.sleep(self.delays.get(self.path, 0))
+        body = self.responses.get(self.path)
+        content = body.encode('utf-8') if body is not None else b''
+        self.send_response(200 if body is not None else 404)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBrokerNodeConnection(unittest.TestCase):
+    __NODE: str = '<node xmlns="http://aktin.org/ns/exchange"><id>0</id><clientDN>CN=0</clientDN><last-contact>2023-01-01T00:00:00Z</last-contact></node>'
+    __STATS: str = '<import-statistics><start>2023-01-01T00:00:00+01:00</start><last-write>2023-01-02T00:00:00+01:00</last-write>' \
+                   '<imported>4</imported><updated>3</updated><invalid>2</invalid><failed>1</failed>' \
+                   '<last-errors><error timestamp="2023-01-01T00:00:00+01:00" repeats="2">Error 1</error></last-errors></import-statistics>'
+    __DEFAULT_ENV: dict = {
+        'BROKER.API_KEY': 'xxxAdmin1234',
+        'BROKER.POOL_SIZE': '10',
+        'BROKER.MAX_RETRIES': '3',
+        'BROKER.BACKOFF_SECONDS': '0.01',
+        'BROKER.MAX_TIMEOUT_SECONDS': '10',
+        'BROKER.CIRCUIT_BREAKER_THRESHOLD': '3',
+        'BROKER.RUN_DEADLINE_SECONDS': '600',
+        'BROKER.CASSETTE_MODE': ''
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        cls.__server = ThreadingHTTPServer(('127.0.0.1', 0), BrokerStubHandler)
+        cls.__server.daemon_threads = True
+        threading.Thread(target=cls.__server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.__server.shutdown()
+        cls.__server.server_close()
+
+    def setUp(self):
+        os.environ.update(self.__DEFAULT_ENV)
+        os.environ['BROKER.URL'] = f'http://127.0.0.1:{self.__server.server_port}'
+        BrokerStubHandler.responses = {'/broker/node/0': '<node><id>0</id></node>'}
+        BrokerStubHandler.delays = {}
+        BrokerStubHandler.requests = Counter()
+
+    def tearDown(self):
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        for retriever in (NodeInfoRetriever, NodeErrorRetriever):
+            SingletonABCMeta._instances.pop(retriever, None)
+
+    @staticmethod
+    def __create_connection() -> BrokerNodeConnection:
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        return BrokerNodeConnection()
+
+    def __create_connection_with_min_timeout(self, seconds: float) -> BrokerNodeConnection:
+        """
+        The default lower limit of the timeout is too long to let requests time out in a unit test
+        """
+        BrokerNodeConnection._min_timeout = seconds
+        self.addCleanup(delattr, BrokerNodeConnection, '_min_timeout')
+        return self.__create_connection()
+
+    def test_sequential_requests_reuse_one_connection(self):
+        connection = self.__create_connection()
+        number_requests = 10
+        for _ in range(number_requests - 1):
+            connection.get_broker_node_resource('0', 'versions')
+        stats = connection.get_connection_stats()
+        self.assertEqual(1, stats['opened'])
+        self.assertEqual(number_requests - 1, stats['reused'])
+
+    def test_parallel_requests_are_limited_to_pool_size(self):
+        os.environ['BROKER.POOL_SIZE'] = '2'
+        BrokerStubHandler.delays = {'/broker/node/0/versions': 0.1}
+        connection = self.__create_connection()
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda _: connection.get_broker_node_resource('0', 'versions'), range(12)))
+        self.assertEqual(12, BrokerStubHandler.requests['/broker/node/0/versions'])
+        self.assertEqual(2, connection.get_connection_stats()['opened'])
+
+    def test_slow_endpoint_is_not_limited_by_fast_endpoints(self):
+        os.environ['BROKER.MAX_TIMEOUT_SECONDS'] = '2'
+        BrokerStubHandler.responses['/broker/node/0/stats'] = self.__STATS
+        BrokerStubHandler.delays = {'/broker/node/0/stats': 0.3}
+        connection = self.__create_connection_with_min_timeout(0.05)
+        for _ in range(20):
+            connection.get_broker_node_resource('0', 'versions')
+        self.assertIsNotNone(connection.get_broker_node_stats('0'))
+        self.assertEqual(1, BrokerStubHandler.requests['/broker/node/0/stats'])
+
+    def test_timeout_is_doubled_on_retry(self):
+        os.environ['BROKER.MAX_TIMEOUT_SECONDS'] = '2'
+        BrokerStubHandler.responses['/broker/node/0/stats'] = self.__STATS
+        connection = self.__create_connection_with_min_timeout(0.05)
+        for _ in range(20):
+            connection.get_broker_node_stats('0')
+        BrokerStubHandler.requests = Counter()
+        BrokerStubHandler.delays = {'/broker/node/0/stats': 0.3}
+        self.assertIsNotNone(connection.get_broker_node_stats('0'))
+        self.assertLess(1, BrokerStubHandler.requests['/broker/node/0/stats'])
+
+    def test_stats_are_requested_once_for_streamed_errors_and_info(self):
+        BrokerStubHandler.responses = {'/broker/node/0': self.__NODE, '/broker/node/0/stats': self.__STATS}
+        connection = self.__create_connection()
+        connection.enable_run_cache()
+        errors = list(connection.iter_broker_node_errors('0'))
+        stats = connection.get_broker_node_stats('0')
+        self.assertEqual(['Error 1'], [error.content for error in errors])
+        self.assertEqual('4', stats.imported)
+        self.assertEqual(1, BrokerStubHandler.requests['/broker/node/0/stats'])
+        self.assertEqual(errors, connection.get_broker_node_errors('0'))
+        self.assertEqual(2, BrokerStubHandler.requests['/broker/node/0/stats'])
+        connection.clear_run_cache()
+
+    def test_error_outside_of_last_errors(self):
+        stats = b'<import-statistics><error timestamp="2023-01-01T00:00:00+01:00">Error 1</error><last-errors/></import-statistics>'
+        items = list(BrokerNodeConnection._iterparse_broker_node_stats(io.BytesIO(stats)))
+        self.assertEqual(['Error 1'], [item.content for item in items])
+
+    def test_stats_are_requested_once_for_info_and_errors(self):
+        BrokerStubHandler.responses = {'/broker/node/0': self.__NODE, '/broker/node/0/stats': self.__STATS}
+        dir_working = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = dir_working
+        try:
+            connection = self.__create_connection()
+            for retriever in (NodeInfoRetriever, NodeErrorRetriever):
+                SingletonABCMeta._instances.pop(retriever, None)
+            connection.enable_run_cache()
+            NodeInfoRetriever().download_broker_data_to_file('0')
+            NodeErrorRetriever().download_broker_data_to_file('0')
+            connection.clear_run_cache()
+            self.assertEqual(1, BrokerStubHandler.requests['/broker/node/0/stats'])
+            self.assertEqual(2, len(os.listdir(os.path.join(dir_working, '0'))))
+        finally:
+            shutil.rmtree(dir_working)
+
+
+class TestBrokerNodeConnectionReplay(unittest.TestCase):
+    """
+    Cases of the integration test of BrokerNodeConnection, replayed from the cassette in test/resources/cassettes/broker
+    """
+    __DEFAULT_NODE_ID: str = '0'
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.update({
+            'BROKER.URL': 'http://broker-server:8080',
+            'BROKER.API_KEY': 'xxxAdmin1234',
+            'BROKER.POOL_SIZE': '1',
+            'BROKER.MAX_RETRIES': '0',
+            'BROKER.BACKOFF_SECONDS': '0',
+            'BROKER.MAX_TIMEOUT_SECONDS': '10',
+            'BROKER.CIRCUIT_BREAKER_THRESHOLD': '100',
+            'BROKER.RUN_DEADLINE_SECONDS': '600',
+            'BROKER.CASSETTE_MODE': 'replay',
+            'BROKER.CASSETTE_DIR': os.path.join(this_path.parents[1], 'resources', 'cassettes', 'broker')
+        })
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        cls.__BROKER_NODE_CONNECTION = BrokerNodeConnection()
+
+    @classmethod
+    def tearDownClass(cls):
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        os.environ['BROKER.CASSETTE_MODE'] = ''
+
+    def test_get_broker_nodes_list(self):
+        list_nodes = self.__BROKER_NODE_CONNECTION.get_broker_nodes()
+        self.assertEqual(3, len(list_nodes))
+        for node in list_nodes:
+            node2 = self.__BROKER_NODE_CONNECTION.get_broker_node(node.id)
+            self.assertEqual(node2.domain_name, node.domain_name)
+
+    def test_get_broker_node_stats(self):
+        stats = self.__BROKER_NODE_CONNECTION.get_broker_node_stats(self.__DEFAULT_NODE_ID)
+        self.assertEqual('2020-01-01T00:00:00+01:00', stats.dwh_start)
+        self.assertEqual('2020-01-02T12:00:00+01:00', stats.last_write)
+        self.assertEqual('2020-01-02T12:00:00+01:00', stats.last_reject)
+        self.assertEqual('400', stats.imported)
+        self.assertEqual('300', stats.updated)
+        self.assertEqual('200', stats.invalid)
+        self.assertEqual('100', stats.failed)
+
+    def test_get_broker_node_stats_missing_dates(self):
+        stats = self.__BROKER_NODE_CONNECTION.get_broker_node_stats('1')
+        self.assertEqual('2020-01-01T00:00:00+01:00', stats.dwh_start)
+        self.assertIsNone(stats.last_write)
+        self.assertIsNone(stats.last_reject)
+        self.assertEqual('400', stats.imported)
+
+    def test_get_broker_nonexisting_node_stats(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            _ = self.__BROKER_NODE_CONNECTION.get_broker_node_stats('nonexisting_id')
+
+    def test_get_broker_node_errors(self):
+        list_errors = self.__BROKER_NODE_CONNECTION.get_broker_node_errors(self.__DEFAULT_NODE_ID)
+        self.assertEqual(1, len(list_errors))
+        self.assertEqual('2020-01-01T00:00:00+01:00', list_errors[0].timestamp)
+        self.assertEqual('5', list_errors[0].repeats)
+        self.assertEqual('TestError', list_errors[0].content)
+
+    def test_get_broker_node_errors_missing_repeats(self):
+        list_errors = self.__BROKER_NODE_CONNECTION.get_broker_node_errors('2')
+        self.assertEqual(1, len(list_errors))
+        self.assertIsNone(list_errors[0].repeats)
+        self.assertEqual('TestError', list_errors[0].content)
+
+    def test_iter_broker_node_errors(self):
+        list_errors = list(self.__BROKER_NODE_CONNECTION.iter_broker_node_errors(self.__DEFAULT_NODE_ID))
+        self.assertEqual(self.__BROKER_NODE_CONNECTION.get_broker_node_errors(self.__DEFAULT_NODE_ID), list_errors)
+
+    def test_get_broker_node_empty_errors(self):
+        list_errors = self.__BROKER_NODE_CONNECTION.get_broker_node_errors('1')
+        self.assertEqual(0, len(list_errors))
+
+    def test_get_broker_node_versions(self):
+        resource = self.__BROKER_NODE_CONNECTION.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'versions')
+        self.assertEqual('Ubuntu/11.0.13', resource.get('java'))
+        self.assertEqual('Ubuntu 20.04.1 LTS', resource.get('os'))
+        self.assertIsNone(resource.get('wildfly'))
+
+    def test_get_broker_node_rscript(self):
+        resource = self.__BROKER_NODE_CONNECTION.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'rscript')
+        self.assertEqual('3.6.3-2', resource.get('r-base-core'))
+        self.assertEqual('1.3.0-1', resource.get('r-cran-tidyverse'))
+        self.assertEqual('0.20-40-1', resource.get('r-cran-lattice'))
+        self.assertIsNone(resource.get('r-core'))
+
+    def test_get_broker_node_python(self):
+        resource = self.__BROKER_NODE_CONNECTION.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'python')
+        self.assertEqual('3.8.2-0ubuntu2', resource.get('python3'))
+        self.assertEqual('1:1.17.4-5ubuntu3', resource.get('python3-numpy'))
+        self.assertIsNone(resource.get('python3-pandas'))
+
+    def test_get_broker_node_import_scripts(self):
+        resource = self.__BROKER_NODE_CONNECTION.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'import-scripts')
+        self.assertEqual('1.5', resource.get('p21'))
+        self.assertIsNone(resource.get('p20'))
+
+    def test_get_broker_node_empty_resource(self):
+        with self.assertRaises(et.ParseError):
+            _ = self.__BROKER_NODE_CONNECTION.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'empty')
+
+    def test_get_broker_node_nonexisting_resource(self):
+        resource = self.__BROKER_NODE_CONNECTION.get_broker_node_resource(self.__DEFAULT_NODE_ID, 'nonexisting')
+        self.assertFalse(resource)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerRequestMetrics
+
+
+class TestBrokerRequestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.__metrics = BrokerRequestMetrics()
+
+    def test_empty_report(self):
+        report = self.__metrics.create_report()
+        self.assertEqual(0, report['requests'])
+        self.assertEqual({}, report['endpoints'])
+        self.assertEqual([], report['slowest_nodes'])
+
+    def test_aggregation_per_endpoint(self):
+        self.__metrics.add_request('stats', '1', 200, 0.1, 0.2, 1000)
+        self.__metrics.add_request('stats', '2', 200, 0.3, 0.6, 3000)
+        self.__metrics.add_request('versions', '1', 404, 0.05, 0.05, 0)
+        report = self.__metrics.create_report()
+        self.assertEqual(3, report['requests'])
+        self.assertEqual(4000, report['bytes'])
+        stats = report['endpoints']['stats']
+        self.assertEqual(2, stats['requests'])
+        self.assertEqual({'200': 2}, stats['status'])
+        self.assertEqual({'sum': 4000, 'max': 3000}, stats['bytes'])
+        self.assertEqual(0.6, stats['total']['max'])
+        self.assertEqual(0.4, stats['ttfb']['sum'])
+        self.assertEqual({'404': 1}, report['endpoints']['versions']['status'])
+
+    def test_histogram_buckets(self):
+        for seconds in [0.005, 0.01, 0.3, 20]:
+            self.__metrics.add_request('stats', '1', 200, seconds, seconds, 0)
+        histogram = self.__metrics.create_report()['endpoints']['stats']['histogram_total']
+        self.assertEqual(2, histogram['<=0.01'])
+        self.assertEqual(1, histogram['<=0.5'])
+        self.assertEqual(1, histogram['>10'])
+        self.assertEqual(4, sum(histogram.values()))
+
+    def test_parse_times(self):
+        self.__metrics.add_request('stats', '1', 200, 0.1, 0.2, 1000)
+        self.__metrics.add_request('versions', '1', 200, 0.1, 0.2, 100)
+        self.__metrics.add_parse_time('stats', 0.25)
+        report = self.__metrics.create_report()
+        self.assertEqual(0.25, report['endpoints']['stats']['parse']['max'])
+        self.assertIsNone(report['endpoints']['versions']['parse'])
+
+    def test_request_without_response(self):
+        self.__metrics.add_request('stats', '1', None, 10, 10, 0)
+        self.assertEqual({'error': 1}, self.__metrics.create_report()['endpoints']['stats']['status'])
+
+    def test_slowest_nodes(self):
+        for node_id, seconds in [('1', 0.5), ('2', 2.0), ('1', 0.5), ('3', 0.1)]:
+            self.__metrics.add_request('stats', node_id, 200, seconds, seconds, 10)
+        self.__metrics.add_request('nodes', None, 200, 5, 5, 10)
+        slowest = self.__metrics.create_report()['slowest_nodes']
+        self.assertEqual(['2', '1', '3'], [node['node_id'] for node in slowest])
+        self.assertEqual(2, slowest[1]['requests'])
+        self.assertEqual(1.0, slowest[1]['seconds'])
+
+    def test_clear(self):
+        self.__metrics.add_request('stats', '1', 200, 0.1, 0.2, 1000)
+        self.__metrics.add_parse_time('stats', 0.1)
+        self.__metrics.clear()
+        self.assertEqual(0, self.__metrics.create_report()['requests'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import CSVSchema, ErrorCSVHandler, InfoCSVHandler
+
+
+class TestCSVSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.__schema = CSVSchema(integer_columns=['count'], float_columns=['rate'], date_columns=['date'])
+
+    def test_numeric_columns(self):
+        df = pd.DataFrame({'count': ['1', '-', None], 'rate': ['30.00', '-', '0.5']})
+        typed = self.__schema.convert_to_typed_df(df)
+        self.assertEqual('Int64', str(typed['count'].dtype))
+        self.assertEqual('Float64', str(typed['rate'].dtype))
+        self.assertEqual(1, typed['count'].iloc[0])
+        self.assertTrue(pd.isna(typed['count'].iloc[1]))
+        self.assertTrue(pd.isna(typed['count'].iloc[2]))
+        self.assertEqual(30.0, typed['rate'].iloc[0])
+
+    def test_date_columns_are_utc(self):
+        df = pd.DataFrame({'date': ['2022-01-01 12:00:00+01:00', '2022-01-01T00:00:00Z', '-']})
+        typed = self.__schema.convert_to_typed_df(df)
+        self.assertEqual('UTC', str(typed['date'].dt.tz))
+        self.assertEqual(pd.Timestamp('2022-01-01 11:00:00', tz='UTC'), typed['date'].iloc[0])
+        self.assertEqual(pd.Timestamp('2022-01-01 00:00:00', tz='UTC'), typed['date'].iloc[1])
+        self.assertTrue(pd.isna(typed['date'].iloc[2]))
+
+    def test_date_not_in_iso_format(self):
+        df = pd.DataFrame({'date': ['01.02.2022 10:00', '2022-01-01T00:00:00Z']})
+        typed = self.__schema.convert_to_typed_df(df)
+        self.assertTrue(pd.isna(typed['date'].iloc[0]))
+        self.assertEqual(pd.Timestamp('2022-01-01 00:00:00', tz='UTC'), typed['date'].iloc[1])
+
+    def test_untyped_and_missing_columns(self):
+        df = pd.DataFrame({'content': ['-'], 'count': ['2']})
+        typed = self.__schema.convert_to_typed_df(df)
+        self.assertEqual('-', typed['content'].iloc[0])
+        self.assertNotIn('rate', typed)
+
+    def test_source_is_not_changed(self):
+        df = pd.DataFrame({'count': ['-']})
+        self.__schema.convert_to_typed_df(df)
+        self.assertEqual('-', df['count'].iloc[0])
+
+    def test_invalid_number(self):
+        with self.assertRaises(ValueError):
+            self.__schema.convert_to_typed_df(pd.DataFrame({'count': ['abc']}))
+
+    def test_info_schema(self):
+        handler = InfoCSVHandler()
+        row = ['2022-01-01 12:00:00+01:00', '2022-01-01T00:00:00Z', '2022-01-01 00:00:00+01:00', '-', '-',
+               '4', '3', '2', '1', '30.00', '-', '-', '-', '-', '-']
+        typed = handler.convert_to_typed_df(pd.DataFrame([row], columns=handler.get_csv_columns()))
+        self.assertEqual(4, typed['imported'].iloc[0])
+        self.assertEqual(30.0, typed['error_rate'].iloc[0])
+        self.assertTrue(pd.isna(typed['daily_imported'].iloc[0]))
+        self.assertTrue(pd.isna(typed['last_write'].iloc[0]))
+
+    def test_error_schema(self):
+        handler = ErrorCSVHandler()
+        df = pd.DataFrame([['2022-01-01 12:00:00+0100', '5', 'Error 1', 'abc', 'def=5']], columns=handler.get_csv_columns())
+        typed = handler.convert_to_typed_df(df)
+        self.assertEqual(5, typed['repeats'].iloc[0])
+        self.assertEqual(pd.Timestamp('2022-01-01 11:00:00', tz='UTC'), typed['timestamp'].iloc[0])
+        self.assertEqual('Error 1', typed['content'].iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
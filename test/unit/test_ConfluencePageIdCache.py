@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from atlassian.errors import ApiNotFoundError
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import ConfluenceConnection, SingletonMeta
+
+
+class ConfluenceServerStub(BaseHTTPRequestHandler):
+    """
+    Answers the content endpoints of the Confluence REST API from a dict of pages
+    and records the requested paths. Child pages are returned in chunks of at most 'max_limit'
+    """
+    pages = {}
+    requests = []
+    max_limit = 200
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requests.append(url.path)
+        match_children = re.search(r'/content/(\d+)/child/page$', url.path)
+        match_page = re.search(r'/content/(\d+)$', url.path)
+        if match_children:
+            query = parse_qs(url.query)
+            start = int(query.get('start', ['0'])[0])
+            limit = min(int(query.get('limit', [str(self.max_limit)])[0]), self.max_limit)
+            children = [page for page in self.pages.values() if page['parent'] == match_children.group(1)][start:start + limit]
+            self.__send_json({'results': [{'id': page['id'], 'title': page['title']} for page in children]}, match_children.group(1))
+        elif match_page:
+            page = self.pages.get(match_page.group(1))
+            self.__send_json({'id': page['id'], 'body': {'storage': {'value': page['content']}}} if page else None)
+        elif url.path.endswith('/content'):
+            title = parse_qs(url.query)['title'][0]
+            results = [{'id': page['id'], 'title': title} for page in self.pages.values() if page['title'] == title]
+            self.__send_json({'results': results})
+        else:
+            self.__send_json(None)
+
+    def __send_json(self, body, page_id: str = None):
+        if body is None or (page_id is not None and page_id not in self.pages):
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestConfluencePageIdCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.__server = ThreadingHTTPServer(('127.0.0.1', 0), ConfluenceServerStub)
+        threading.Thread(target=cls.__server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.__server.shutdown()
+        cls.__server.server_close()
+
+    def setUp(self):
+        self.__dir_tmp = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = self.__dir_tmp
+        os.environ['CONFLUENCE.URL'] = f'http://127.0.0.1:{self.__server.server_port}'
+        os.environ['CONFLUENCE.SPACE'] = 'SPACE'
+        ConfluenceServerStub.pages = {
+            '1': {'id': '1', 'title': 'Parent', 'parent': None, 'content': ''},
+            '2': {'id': '2', 'title': 'Node A', 'parent': '1', 'content': '<p>A</p>'},
+            '3': {'id': '3', 'title': 'Node B', 'parent': '1', 'content': '<p>B</p>'},
+        }
+        ConfluenceServerStub.requests = []
+        ConfluenceServerStub.max_limit = 200
+        self.__connection = self.__create_connection()
+
+    def tearDown(self):
+        SingletonMeta._instances.pop(ConfluenceConnection, None)
+        shutil.rmtree(self.__dir_tmp)
+
+    @staticmethod
+    def __create_connection() -> ConfluenceConnection:
+        SingletonMeta._instances.pop(ConfluenceConnection, None)
+        return ConfluenceConnection()
+
+    @staticmethod
+    def __count_title_lookups() -> int:
+        return len([path for path in ConfluenceServerStub.requests if path.endswith('/content')])
+
+    def test_children_are_loaded_in_bulk(self):
+        self.__connection.load_page_ids_of_children('Parent')
+        lookups = self.__count_title_lookups()
+        self.assertTrue(self.__connection.does_page_exists('Node A'))
+        self.assertEqual('<p>B</p>', self.__connection.get_page_content('Node B'))
+        self.assertEqual(lookups, self.__count_title_lookups())
+
+    def test_page_id_is_looked_up_once(self):
+        self.assertEqual('2', self.__connection.get_page_id('Node A'))
+        self.assertEqual('<p>A</p>', self.__connection.get_page_content('Node A'))
+        self.assertEqual(1, self.__count_title_lookups())
+
+    def test_missing_page_is_not_cached(self):
+        self.assertFalse(self.__connection.does_page_exists('Node C'))
+        ConfluenceServerStub.pages['4'] = {'id': '4', 'title': 'Node C', 'parent': '1', 'content': '<p>C</p>'}
+        self.assertTrue(self.__connection.does_page_exists('Node C'))
+
+    def test_page_ids_are_saved_for_next_run(self):
+        self.__connection.load_page_ids_of_children('Parent')
+        connection = self.__create_connection()
+        ConfluenceServerStub.requests = []
+        self.assertEqual('<p>A</p>', connection.get_page_content('Node A'))
+        self.assertEqual(0, self.__count_title_lookups())
+
+    def test_page_ids_are_saved_per_space(self):
+        self.__connection.load_page_ids_of_children('Parent')
+        os.environ['CONFLUENCE.SPACE'] = 'OTHER'
+        ConfluenceServerStub.pages = {}
+        self.assertFalse(self.__create_connection().does_page_exists('Node A'))
+
+    def test_deleted_page_is_looked_up_again(self):
+        self.__connection.load_page_ids_of_children('Parent')
+        del ConfluenceServerStub.pages['2']
+        ConfluenceServerStub.pages['5'] = {'id': '5', 'title': 'Node A', 'parent': '1', 'content': '<p>A2</p>'}
+        self.assertEqual('<p>A2</p>', self.__connection.get_page_content('Node A'))
+        self.assertEqual('5', self.__connection.get_page_id('Node A'))
+
+    def test_reload_drops_deleted_pages(self):
+        self.__connection.load_page_ids_of_children('Parent')
+        del ConfluenceServerStub.pages['3']
+        self.__connection.load_page_ids_of_children('Parent')
+        self.assertFalse(self.__connection.does_page_exists('Node B'))
+
+    def test_children_are_loaded_beyond_server_limit(self):
+        ConfluenceServerStub.max_limit = 2
+        for page_id in range(4, 9):
+            ConfluenceServerStub.pages[str(page_id)] = {'id': str(page_id), 'title': f'Node {page_id}', 'parent': '1', 'content': ''}
+        self.__connection.load_page_ids_of_children('Parent')
+        lookups = self.__count_title_lookups()
+        for title in ['Node A', 'Node B'] + [f'Node {page_id}' for page_id in range(4, 9)]:
+            self.assertTrue(self.__connection.does_page_exists(title))
+        self.assertEqual(lookups, self.__count_title_lookups())
+
+    def test_missing_page_raises_error(self):
+        with self.assertRaisesRegex(ApiNotFoundError, 'Node C'):
+            self.__connection.get_page_content('Node C')
+
+    def test_deleted_page_without_replacement_raises_error(self):
+        self.__connection.load_page_ids_of_children('Parent')
+        del ConfluenceServerStub.pages['2']
+        with self.assertRaisesRegex(ApiNotFoundError, 'Node A'):
+            self.__connection.get_page_content('Node A')
+        self.assertFalse(self.__connection.does_page_exists('Node A'))
+
+    def test_page_content_by_id(self):
+        self.assertEqual('<p>B</p>', self.__connection.get_page_content_by_id('3'))
+        self.assertEqual(0, self.__count_title_lookups())
+
+
+if __name__ == '__main__':
+    unittest.main()
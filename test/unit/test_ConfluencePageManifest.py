@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from csv_to_confluence import ConfluencePageManifest
+
+
+class TestConfluencePageManifest(unittest.TestCase):
+    """
+    The manifest is a singleton, so each test uses its own page names
+    """
+    __DEFAULT_PAGE: str = '<h1 class="title">Status</h1>\n<table>\n    <tr><td class="status">ONLINE</td></tr>\n</table>'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.__dir_tmp = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = cls.__dir_tmp
+        cls.__manifest = ConfluencePageManifest()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.__dir_tmp)
+
+    def test_unknown_page_is_changed(self):
+        self.assertFalse(self.__manifest.is_page_unchanged('unknown', self.__DEFAULT_PAGE))
+
+    def test_uploaded_page_is_unchanged(self):
+        self.__manifest.mark_page_uploaded('uploaded', self.__DEFAULT_PAGE)
+        skipped = self.__manifest.get_number_of_skipped_pages()
+        self.assertTrue(self.__manifest.is_page_unchanged('uploaded', self.__DEFAULT_PAGE))
+        self.assertEqual(skipped + 1, self.__manifest.get_number_of_skipped_pages())
+
+    def test_changed_content(self):
+        self.__manifest.mark_page_uploaded('changed', self.__DEFAULT_PAGE)
+        self.assertFalse(self.__manifest.is_page_unchanged('changed', self.__DEFAULT_PAGE.replace('ONLINE', 'OFFLINE')))
+
+    def test_whitespace_between_elements_is_ignored(self):
+        self.__manifest.mark_page_uploaded('whitespace', self.__DEFAULT_PAGE)
+        page = self.__DEFAULT_PAGE.replace('\n    ', '').replace('\n', '  ')
+        self.assertTrue(self.__manifest.is_page_unchanged('whitespace', page))
+
+    def test_removed_page_is_changed(self):
+        self.__manifest.mark_page_uploaded('removed', self.__DEFAULT_PAGE)
+        self.__manifest.remove_page('removed')
+        self.assertFalse(self.__manifest.is_page_unchanged('removed', self.__DEFAULT_PAGE))
+
+    def test_manifest_is_saved(self):
+        updated = self.__manifest.get_number_of_updated_pages()
+        self.__manifest.mark_page_uploaded('saved', self.__DEFAULT_PAGE)
+        self.assertEqual(updated + 1, self.__manifest.get_number_of_updated_pages())
+        with open(os.path.join(self.__dir_tmp, 'confluence_page_manifest.json'), 'r') as file:
+            hashes = json.load(file)
+        self.assertIn('saved', hashes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import DataFrameCache, InfoCSVHandler
+
+
+class TestDataFrameCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__dir_tmp = tempfile.mkdtemp()
+        os.environ['STORAGE.DATAFRAME_CACHE_MB'] = '64'
+        self.__cache = DataFrameCache()
+        self.__cache.clear()
+
+    def tearDown(self):
+        self.__cache.clear()
+        os.environ.pop('STORAGE.DATAFRAME_CACHE_MB', None)
+        shutil.rmtree(self.__dir_tmp)
+
+    @staticmethod
+    def __create_df(number_rows: int) -> pd.DataFrame:
+        return pd.DataFrame({'date': [f'2023-01-{i:02d}' for i in range(number_rows)]})
+
+    def __write_csv(self, name: str, number_rows: int) -> str:
+        csv_path = os.path.join(self.__dir_tmp, name)
+        handler = InfoCSVHandler()
+        df = self.__create_df(number_rows).reindex(columns=handler.get_csv_columns(), fill_value='-')
+        handler.write_data_to_file(df, csv_path)
+        return csv_path
+
+    def test_get_with_other_signature(self):
+        df = self.__create_df(3)
+        self.__cache.put('a.csv', (1, 1), df)
+        self.assertIs(df, self.__cache.get('a.csv', (1, 1)))
+        self.assertIsNone(self.__cache.get('a.csv', (2, 1)))
+        self.assertIsNone(self.__cache.get('b.csv', (1, 1)))
+
+    def test_put_replaces_older_version(self):
+        self.__cache.put('a.csv', (1, 1), self.__create_df(3))
+        size = self.__cache.get_size_in_bytes()
+        self.__cache.put('a.csv', (2, 1), self.__create_df(3))
+        self.assertEqual(size, self.__cache.get_size_in_bytes())
+        self.assertIsNone(self.__cache.get('a.csv', (1, 1)))
+
+    def test_eviction_of_least_recently_used(self):
+        df = self.__create_df(1000)
+        size = int(df.memory_usage(deep=True).sum())
+        os.environ['STORAGE.DATAFRAME_CACHE_MB'] = str(2.5 * size / 1024 / 1024)
+        self.__cache.put('a.csv', (1,), df)
+        self.__cache.put('b.csv', (1,), df.copy())
+        self.__cache.get('a.csv', (1,))
+        self.__cache.put('c.csv', (1,), df.copy())
+        self.assertIsNotNone(self.__cache.get('a.csv', (1,)))
+        self.assertIsNone(self.__cache.get('b.csv', (1,)))
+        self.assertIsNotNone(self.__cache.get('c.csv', (1,)))
+        self.assertEqual(2 * size, self.__cache.get_size_in_bytes())
+
+    def test_df_larger_than_cache(self):
+        os.environ['STORAGE.DATAFRAME_CACHE_MB'] = '0'
+        self.__cache.put('a.csv', (1,), self.__create_df(3))
+        self.assertIsNone(self.__cache.get('a.csv', (1,)))
+        self.assertEqual(0, self.__cache.get_size_in_bytes())
+
+    def test_handler_parses_file_once(self):
+        csv_path = self.__write_csv('a.csv', 3)
+        InfoCSVHandler().read_csv_as_df(csv_path)
+        stat = os.stat(csv_path)
+        with open(csv_path, 'r+') as file:
+            content = file.read()
+            file.seek(0)
+            file.write(content.replace('2023-01-00', '2023-01-99'))
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        df = InfoCSVHandler().read_csv_as_df(csv_path)
+        self.assertEqual('2023-01-00', df.loc[0, 'date'])
+
+    def test_handler_parses_changed_file_again(self):
+        csv_path = self.__write_csv('a.csv', 3)
+        handler = InfoCSVHandler()
+        self.assertEqual(3, len(handler.read_csv_as_df(csv_path)))
+        handler.append_row_to_file({column: '-' for column in handler.get_csv_columns()} | {'date': '2023-02-01'}, csv_path)
+        self.assertEqual(4, len(handler.read_csv_as_df(csv_path)))
+        self.assertEqual(['2023-02-01'], handler.read_last_rows_as_df(csv_path, 1)['date'].tolist())
+
+    def test_handler_returns_copies(self):
+        csv_path = self.__write_csv('a.csv', 3)
+        handler = InfoCSVHandler()
+        df = handler.read_csv_as_df(csv_path)
+        df.loc[0, 'date'] = 'changed'
+        self.assertEqual('2023-01-00', handler.read_csv_as_df(csv_path).loc[0, 'date'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import ErrorFingerprinter
+
+
+class TestErrorFingerprinter(unittest.TestCase):
+
+    def setUp(self):
+        self.__fingerprinter = ErrorFingerprinter()
+
+    def test_mask_numbers(self):
+        masked = self.__fingerprinter.mask_content('Timeout after 3.5 seconds in line 42')
+        self.assertEqual('Timeout after <num> seconds in line <num>', masked)
+
+    def test_mask_uuid(self):
+        masked = self.__fingerprinter.mask_content('Encounter 3f2504e0-4f89-11d3-9a0c-0305e82c3301 failed')
+        self.assertEqual('Encounter <uuid> failed', masked)
+
+    def test_mask_paths(self):
+        self.assertEqual('File <path> not found', self.__fingerprinter.mask_content('File /var/lib/aktin/import/1.csv not found'))
+        self.assertEqual('File <path> not found', self.__fingerprinter.mask_content('File C:\\aktin\\import\\1.csv not found'))
+
+    def test_mask_hex_values(self):
+        self.assertEqual('Hash <hex> at <hex>', self.__fingerprinter.mask_content('Hash 9f86d081884c at 0x1F'))
+
+    def test_keep_words_without_digits(self):
+        self.assertEqual('Invalid deadbeef', self.__fingerprinter.mask_content('Invalid   deadbeef'))
+
+    def test_same_fingerprint_for_near_duplicates(self):
+        fingerprint1 = self.__fingerprinter.create_fingerprint('Invalid value in line 12')
+        fingerprint2 = self.__fingerprinter.create_fingerprint('Invalid value in line 13')
+        self.assertEqual(fingerprint1, fingerprint2)
+
+    def test_different_fingerprint_for_different_errors(self):
+        fingerprint1 = self.__fingerprinter.create_fingerprint('Invalid value in line 12')
+        fingerprint2 = self.__fingerprinter.create_fingerprint('Missing value in line 12')
+        self.assertNotEqual(fingerprint1, fingerprint2)
+
+    def test_different_variant_hash_for_near_duplicates(self):
+        variant1 = self.__fingerprinter.create_variant_hash('Invalid value in line 12')
+        variant2 = self.__fingerprinter.create_variant_hash('Invalid value in line 13')
+        self.assertNotEqual(variant1, variant2)
+
+    def test_join_and_parse_variants(self):
+        variants = {'abc': '2', 'def': '3'}
+        joined = self.__fingerprinter.join_variants(variants)
+        self.assertEqual('abc=2|def=3', joined)
+        self.assertEqual(variants, self.__fingerprinter.parse_variants(joined))
+
+    def test_parse_empty_variants(self):
+        self.assertEqual({}, self.__fingerprinter.parse_variants(''))
+        self.assertEqual({}, self.__fingerprinter.parse_variants(float('nan')))
+
+    def test_join_keeps_latest_variants(self):
+        variants = {f'v{i}': '2' for i in range(15)}
+        joined = self.__fingerprinter.join_variants(variants)
+        parsed = self.__fingerprinter.parse_variants(joined)
+        self.assertEqual([f'v{i}' for i in range(5, 15)] + ['other'], list(parsed))
+        self.assertEqual('10', parsed['other'])
+        self.assertTrue(self.__fingerprinter.has_dropped_variants(parsed))
+
+    def test_join_adds_dropped_variants_to_other(self):
+        variants = {'other': '10'}
+        variants.update({f'v{i}': '' for i in range(12)})
+        parsed = self.__fingerprinter.parse_variants(self.__fingerprinter.join_variants(variants))
+        self.assertEqual('12', parsed['other'])
+        self.assertEqual(11, len(parsed))
+
+    def test_joined_variants_are_bounded(self):
+        variants = {}
+        for i in range(1000):
+            variants = self.__fingerprinter.parse_variants(self.__fingerprinter.join_variants(variants))
+            variants[self.__fingerprinter.create_variant_hash(f'Invalid value in line {i}')] = '1'
+        joined = self.__fingerprinter.join_variants(variants)
+        self.assertEqual(11, len(joined.split('|')))
+        self.assertEqual('990', self.__fingerprinter.parse_variants(joined)['other'])
+
+
+if __name__ == '__main__':
+    unittest.main()
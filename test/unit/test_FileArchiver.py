@@ -0,0 +1,108 @@
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import FileArchiver, InfoCSVHandler, TextWriter, TimestampHandler
+
+
+class TestFileArchiver(unittest.TestCase):
+    __DEFAULT_NODE_ID: str = '0'
+
+    def setUp(self):
+        self.__dir_tmp = tempfile.mkdtemp()
+        self.__handler = InfoCSVHandler()
+        self.__current_year = int(TimestampHandler().get_current_year())
+        os.environ['STORAGE.ARCHIVE_CODEC'] = 'gzip'
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir_tmp)
+        os.environ.pop('STORAGE.ARCHIVE_CODEC', None)
+
+    def __write_csv(self, year: int, days: list) -> str:
+        columns = self.__handler.get_csv_columns()
+        rows = [{column: '-' for column in columns} | {'date': f'{year}-01-{day:02d}', 'imported': None} for day in days]
+        csv_name = self.__handler.generate_node_csv_name(self.__DEFAULT_NODE_ID, str(year))
+        csv_path = os.path.join(self.__dir_tmp, csv_name)
+        self.__handler.write_data_to_file(pd.DataFrame(rows, columns=columns), csv_path)
+        return csv_path
+
+    def __write_log(self, lines: list) -> str:
+        path = os.path.join(self.__dir_tmp, f'{self.__DEFAULT_NODE_ID}_log_versions.log')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(''.join(lines))
+        return path
+
+    def test_archive_csv_of_closed_year(self):
+        path_closed = self.__write_csv(self.__current_year - 1, [1, 2])
+        path_current = self.__write_csv(self.__current_year, [1])
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        self.assertFalse(os.path.exists(path_closed))
+        self.assertTrue(os.path.exists(path_closed + '.gz'))
+        self.assertTrue(os.path.exists(path_current))
+
+    def test_read_archived_csv_transparently(self):
+        path = self.__write_csv(self.__current_year - 1, [1, 2, 3])
+        df_plain = self.__handler.read_csv_as_df(path)
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        self.assertTrue(self.__handler.does_csv_file_exist(path))
+        self.assertTrue(df_plain.equals(self.__handler.read_csv_as_df(path)))
+        self.assertEqual([f'{self.__current_year - 1}-01-03'], list(self.__handler.read_last_rows_as_df(path, 1)['date']))
+        rows = list(self.__handler.iter_rows_reversed(path))
+        self.assertEqual(f'{self.__current_year - 1}-01-03', rows[0]['date'])
+        self.assertIsNone(rows[0]['imported'])
+
+    def test_archive_with_xz(self):
+        os.environ['STORAGE.ARCHIVE_CODEC'] = 'xz'
+        path = self.__write_csv(self.__current_year - 1, [1])
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        with lzma.open(path + '.xz', 'rt', encoding='utf-8') as file:
+            self.assertTrue(file.read().startswith('date;'))
+        self.assertEqual(1, len(self.__handler.read_csv_as_df(path)))
+
+    def test_move_log_lines_of_closed_years(self):
+        last_year, current_year = self.__current_year - 1, self.__current_year
+        path = self.__write_log([f'{last_year}-12-31 10:00:00 : [java] 11 --> 17\n',
+                                 f'{current_year}-01-01 10:00:00 : [os] NEW --> Ubuntu\n'])
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        with open(path, 'r', encoding='utf-8') as file:
+            self.assertEqual(f'{current_year}-01-01 10:00:00 : [os] NEW --> Ubuntu\n', file.read())
+        path_archive = os.path.join(self.__dir_tmp, f'{self.__DEFAULT_NODE_ID}_log_versions_{last_year}.log.gz')
+        with gzip.open(path_archive, 'rt', encoding='utf-8') as file:
+            self.assertEqual(f'{last_year}-12-31 10:00:00 : [java] 11 --> 17\n', file.read())
+
+    def test_append_log_lines_to_existing_archive(self):
+        last_year = self.__current_year - 1
+        path = self.__write_log([f'{last_year}-01-01 10:00:00 : first\n'])
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        self.assertFalse(os.path.exists(path))
+        self.__write_log([f'{last_year}-12-31 10:00:00 : second\n'])
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        path_archive = os.path.join(self.__dir_tmp, f'{self.__DEFAULT_NODE_ID}_log_versions_{last_year}.log')
+        content = TextWriter().read_data_from_file(path_archive)
+        self.assertEqual(f'{last_year}-01-01 10:00:00 : first\n{last_year}-12-31 10:00:00 : second\n', content)
+
+    def test_keep_log_of_current_year(self):
+        lines = [f'{self.__current_year}-01-01 10:00:00 : [os] NEW --> Ubuntu\n']
+        path = self.__write_log(lines)
+        FileArchiver().archive_closed_years(self.__dir_tmp)
+        self.assertEqual([os.path.basename(path)], os.listdir(self.__dir_tmp))
+
+    def test_content_type(self):
+        self.assertEqual('application/gzip', FileArchiver.get_content_type('a.csv.gz', 'text/csv'))
+        self.assertEqual('application/x-xz', FileArchiver.get_content_type('a.log.xz', 'text/csv'))
+        self.assertEqual('text/csv', FileArchiver.get_content_type('a.csv', 'text/csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
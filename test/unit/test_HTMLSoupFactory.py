@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+import bs4
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import HTMLSoupFactory
+
+
+def is_lxml_installed() -> bool:
+    try:
+        bs4.BeautifulSoup('', 'lxml')
+        return True
+    except bs4.FeatureNotFound:
+        return False
+
+
+class TestHTMLSoupFactory(unittest.TestCase):
+    __FRAGMENT: str = '<h1 class="title">Status</h1><ac:structured-macro ac:name="status"><ac:parameter ac:name="title">ONLINE</ac:parameter></ac:structured-macro>'
+    __FRAGMENT_CDATA: str = '<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[if a < b && c > d:\n    pass]]></ac:plain-text-body></ac:structured-macro>'
+
+    def setUp(self):
+        self.__factory = HTMLSoupFactory()
+
+    def tearDown(self):
+        os.environ.pop('CONFLUENCE.HTML_PARSER', None)
+
+    def test_default_parser(self):
+        os.environ.pop('CONFLUENCE.HTML_PARSER', None)
+        self.assertEqual('html.parser', self.__factory.get_parser())
+        self.assertEqual(self.__FRAGMENT, str(self.__factory.parse(self.__FRAGMENT)))
+
+    def test_unknown_parser(self):
+        os.environ['CONFLUENCE.HTML_PARSER'] = 'html6'
+        with self.assertRaises(ValueError):
+            self.__factory.get_parser()
+
+    @unittest.skipIf(is_lxml_installed(), 'lxml is installed')
+    def test_fallback_for_missing_parser(self):
+        os.environ['CONFLUENCE.HTML_PARSER'] = 'lxml'
+        self.assertEqual('html.parser', self.__factory.get_parser())
+
+    @unittest.skipUnless(is_lxml_installed(), 'lxml is not installed')
+    def test_lxml_fragment_is_unwrapped(self):
+        os.environ['CONFLUENCE.HTML_PARSER'] = 'lxml'
+        soup = self.__factory.parse(self.__FRAGMENT)
+        self.assertEqual(self.__FRAGMENT, str(soup))
+        status = soup.find('ac:parameter', attrs={'ac:name': 'title'})
+        self.assertEqual('ONLINE', status.string)
+
+    @unittest.skipUnless(is_lxml_installed(), 'lxml is not installed')
+    def test_lxml_document_is_kept(self):
+        document = '<html><body><p>text</p></body></html>'
+        self.assertEqual(document, str(self.__factory.parse(document, 'lxml')))
+
+    def test_cdata_is_kept(self):
+        self.assertEqual(self.__FRAGMENT_CDATA, str(self.__factory.parse(self.__FRAGMENT_CDATA)))
+
+    @unittest.skipUnless(is_lxml_installed(), 'lxml is not installed')
+    def test_lxml_cdata_is_kept(self):
+        os.environ['CONFLUENCE.HTML_PARSER'] = 'lxml'
+        soup = self.__factory.parse(self.__FRAGMENT_CDATA)
+        self.assertEqual(self.__FRAGMENT_CDATA, str(soup))
+        self.assertIsInstance(soup.find('ac:plain-text-body').contents[0], bs4.CData)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import InfoCSVHandler
+
+
+class TestInfoCSVHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.__handler = InfoCSVHandler()
+        self.__dir_tmp = tempfile.mkdtemp()
+        self.__path_rewritten = self.__handler.init_csv_file(os.path.join(self.__dir_tmp, 'rewritten.csv'))
+        self.__path_appended = self.__handler.init_csv_file(os.path.join(self.__dir_tmp, 'appended.csv'))
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir_tmp)
+
+    def __create_row(self, date: str, value) -> dict:
+        row = {column: value for column in self.__handler.get_csv_columns()}
+        row['date'] = date
+        return row
+
+    def __rewrite_file_with_row(self, row: dict, replace_last_row: bool):
+        df = self.__handler.read_csv_as_df(self.__path_rewritten)
+        if replace_last_row:
+            df = df.head(-1)
+        df = pd.concat([df, pd.DataFrame(row, index=[0])])
+        self.__handler.write_data_to_file(df, self.__path_rewritten)
+
+    def __read_file(self, path: str) -> bytes:
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def test_append_row_equals_rewrite(self):
+        for day, value in enumerate(['-', 400, '30.00', None, 'a;b', 'ü"x']):
+            row = self.__create_row(f'2020-01-0{day + 1}', value)
+            self.__rewrite_file_with_row(row, False)
+            self.__handler.append_row_to_file(row, self.__path_appended)
+        self.assertEqual(self.__read_file(self.__path_rewritten), self.__read_file(self.__path_appended))
+
+    def test_replace_last_row_equals_rewrite(self):
+        for day, value in enumerate(['-', 400, '30.00']):
+            row = self.__create_row(f'2020-01-0{day + 1}', value)
+            self.__rewrite_file_with_row(row, False)
+            self.__handler.append_row_to_file(row, self.__path_appended)
+        row = self.__create_row('2020-01-03', 'replaced')
+        self.__rewrite_file_with_row(row, True)
+        self.__handler.replace_last_row_in_file(row, self.__path_appended)
+        self.assertEqual(self.__read_file(self.__path_rewritten), self.__read_file(self.__path_appended))
+
+    def test_append_row_in_place(self):
+        inode = os.stat(self.__path_appended).st_ino
+        self.__handler.append_row_to_file(self.__create_row('2020-01-01', '-'), self.__path_appended)
+        self.assertEqual(inode, os.stat(self.__path_appended).st_ino)
+        self.assertEqual(1, len(self.__handler.read_csv_as_df(self.__path_appended)))
+
+    def test_replace_last_row_keeps_header(self):
+        row = self.__create_row('2020-01-01', '-')
+        self.__handler.replace_last_row_in_file(row, self.__path_appended)
+        df = self.__handler.read_csv_as_df(self.__path_appended)
+        self.assertEqual(self.__handler.get_csv_columns(), list(df.columns))
+        self.assertEqual(['2020-01-01'], list(df['date']))
+
+    def test_read_last_rows(self):
+        for day in range(1, 10):
+            self.__handler.append_row_to_file(self.__create_row(f'2020-01-0{day}', day), self.__path_appended)
+        df = self.__handler.read_last_rows_as_df(self.__path_appended, 2)
+        self.assertEqual(['2020-01-08', '2020-01-09'], list(df['date']))
+        self.assertEqual('9', df.iloc[-1].imported)
+
+    def test_read_more_rows_than_existing(self):
+        self.__handler.append_row_to_file(self.__create_row('2020-01-01', 1), self.__path_appended)
+        df = self.__handler.read_last_rows_as_df(self.__path_appended, 5)
+        self.assertEqual(['2020-01-01'], list(df['date']))
+
+    def test_read_last_rows_as_records(self):
+        for day in range(1, 10):
+            self.__handler.append_row_to_file(self.__create_row(f'2020-01-0{day}', day), self.__path_appended)
+        records = self.__handler.read_last_rows_as_records(self.__path_appended, 3)
+        self.assertEqual(['2020-01-07', '2020-01-08', '2020-01-09'], [record['date'] for record in records])
+        self.assertEqual('9', records[-1]['imported'])
+
+    def test_iter_rows_reversed(self):
+        for day, value in enumerate(['-', None, 'a;b']):
+            self.__handler.append_row_to_file(self.__create_row(f'2020-01-0{day + 1}', value), self.__path_appended)
+        rows = list(self.__handler.iter_rows_reversed(self.__path_appended))
+        self.assertEqual(['2020-01-03', '2020-01-02', '2020-01-01'], [row['date'] for row in rows])
+        self.assertEqual(['a;b', None, '-'], [row['last_write'] for row in rows])
+
+    def test_read_last_rows_of_empty_file(self):
+        df = self.__handler.read_last_rows_as_df(self.__path_appended, 2)
+        self.assertTrue(df.empty)
+        self.assertEqual(self.__handler.get_csv_columns(), list(df.columns))
+
+
+if __name__ == '__main__':
+    unittest.main()
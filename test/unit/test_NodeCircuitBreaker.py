@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import NodeCircuitBreaker
+
+
+class TestNodeCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.__breaker = NodeCircuitBreaker(3)
+
+    def test_closed_without_failures(self):
+        self.assertFalse(self.__breaker.is_open('1'))
+
+    def test_closed_below_threshold(self):
+        self.__breaker.record_failure('1')
+        self.__breaker.record_failure('1')
+        self.assertFalse(self.__breaker.is_open('1'))
+
+    def test_open_at_threshold(self):
+        for _ in range(3):
+            self.__breaker.record_failure('1')
+        self.assertTrue(self.__breaker.is_open('1'))
+
+    def test_success_resets_failures(self):
+        self.__breaker.record_failure('1')
+        self.__breaker.record_failure('1')
+        self.__breaker.record_success('1')
+        self.__breaker.record_failure('1')
+        self.assertFalse(self.__breaker.is_open('1'))
+
+    def test_nodes_are_independent(self):
+        for _ in range(3):
+            self.__breaker.record_failure('1')
+        self.assertTrue(self.__breaker.is_open('1'))
+        self.assertFalse(self.__breaker.is_open('2'))
+
+    def test_requests_without_node_are_ignored(self):
+        for _ in range(3):
+            self.__breaker.record_failure(None)
+        self.assertFalse(self.__breaker.is_open(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerNodeConnection, ErrorCSVHandler, ErrorFingerprinter, SingletonABCMeta, SingletonMeta
+from node_to_csv import NodeErrorRetriever
+
+
+class FakeBrokerNodeConnection:
+    """
+    Returns the errors set in 'errors' for any node
+    """
+
+    def __init__(self):
+        self.errors = []
+
+    def iter_broker_node_errors(self, node_id: str) -> Iterator[BrokerNodeConnection.BrokerNodeError]:
+        return iter(self.errors)
+
+
+class TestNodeErrorRetriever(unittest.TestCase):
+    __DEFAULT_NODE_ID: str = '0'
+
+    def setUp(self):
+        self.__dir_working = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = self.__dir_working
+        self.__connection = FakeBrokerNodeConnection()
+        SingletonMeta._instances[BrokerNodeConnection] = self.__connection
+        SingletonABCMeta._instances.pop(NodeErrorRetriever, None)
+        self.__retriever = NodeErrorRetriever()
+        self.__csv_handler = ErrorCSVHandler()
+        name_csv = self.__csv_handler.generate_node_csv_name(self.__DEFAULT_NODE_ID)
+        self.__csv_path = os.path.join(self.__dir_working, self.__DEFAULT_NODE_ID, name_csv)
+
+    def tearDown(self):
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        SingletonABCMeta._instances.pop(NodeErrorRetriever, None)
+        shutil.rmtree(self.__dir_working)
+
+    @staticmethod
+    def __create_error(day: int, repeats: str, line: int) -> BrokerNodeConnection.BrokerNodeError:
+        timestamp = f'{datetime.utcnow().year}-01-{day:02d}T00:00:00+00:00'
+        return BrokerNodeConnection.BrokerNodeError(repeats, timestamp, f'Invalid value in line {line}')
+
+    def __download_and_get_rows(self) -> list:
+        self.__retriever.download_broker_data_to_file(self.__DEFAULT_NODE_ID)
+        return self.__csv_handler.read_csv_as_df(self.__csv_path).to_dict('records')
+
+    def test_variants_are_capped(self):
+        self.__connection.errors = [self.__create_error(1, '2', line) for line in range(15)]
+        rows = self.__download_and_get_rows()
+        self.assertEqual(1, len(rows))
+        self.assertEqual('30', str(rows[0]['repeats']))
+        variants = ErrorFingerprinter().parse_variants(rows[0]['variants'])
+        self.assertEqual(11, len(variants))
+        self.assertEqual('10', variants['other'])
+
+    def test_dropped_variants_are_not_counted_again(self):
+        self.__connection.errors = [self.__create_error(1, '2', line) for line in range(15)]
+        self.__download_and_get_rows()
+        modified = os.path.getmtime(self.__csv_path)
+        rows = self.__download_and_get_rows()
+        self.assertEqual(modified, os.path.getmtime(self.__csv_path))
+        self.assertEqual('30', str(rows[0]['repeats']))
+
+    def test_newer_error_of_dropped_variant_is_counted(self):
+        self.__connection.errors = [self.__create_error(1, '2', line) for line in range(15)]
+        self.__download_and_get_rows()
+        self.__connection.errors = [self.__create_error(2, '3', 0)]
+        rows = self.__download_and_get_rows()
+        self.assertEqual('33', str(rows[0]['repeats']))
+        variant = ErrorFingerprinter().create_variant_hash('Invalid value in line 0')
+        self.assertEqual(variant, list(ErrorFingerprinter().parse_variants(rows[0]['variants']))[-2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import InfoCSVHandler, NodeHistory, TimestampHandler
+
+
+class CountingInfoCSVHandler(InfoCSVHandler):
+    """
+    Counts the reads of each CSV file
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def read_csv_as_df(self, csv_path: str) -> pd.DataFrame:
+        self.reads.append(os.path.basename(csv_path))
+        return super().read_csv_as_df(csv_path)
+
+    def read_last_rows_as_df(self, csv_path: str, number_rows: int) -> pd.DataFrame:
+        self.reads.append(os.path.basename(csv_path))
+        return super().read_last_rows_as_df(csv_path, number_rows)
+
+
+class TestNodeHistory(unittest.TestCase):
+    __DEFAULT_NODE_ID: str = '0'
+
+    def setUp(self):
+        self.__dir_tmp = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = self.__dir_tmp
+        os.makedirs(os.path.join(self.__dir_tmp, self.__DEFAULT_NODE_ID))
+        self.__handler = CountingInfoCSVHandler()
+        self.__handler.reads = []
+        self.__current_year = int(TimestampHandler().get_current_year())
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir_tmp)
+
+    def __write_year(self, year: int, days: list):
+        columns = self.__handler.get_csv_columns()
+        rows = [{column: '-' for column in columns} | {'date': f'{year}-01-{day:02d}'} for day in days]
+        csv_name = self.__handler.generate_node_csv_name(self.__DEFAULT_NODE_ID, str(year))
+        csv_path = os.path.join(self.__dir_tmp, self.__DEFAULT_NODE_ID, csv_name)
+        self.__handler.write_data_to_file(pd.DataFrame(rows, columns=columns), csv_path)
+
+    def __get_csv_name(self, year: int) -> str:
+        return self.__handler.generate_node_csv_name(self.__DEFAULT_NODE_ID, str(year))
+
+    def test_last_rows_of_current_year_only(self):
+        self.__write_year(self.__current_year - 1, [1, 2, 3])
+        self.__write_year(self.__current_year, [1, 2, 3])
+        history = NodeHistory(self.__handler)
+        df = history.get_last_rows(self.__DEFAULT_NODE_ID, 2)
+        self.assertEqual([f'{self.__current_year}-01-02', f'{self.__current_year}-01-03'], list(df['date']))
+        self.assertEqual([self.__get_csv_name(self.__current_year)], self.__handler.reads)
+
+    def test_last_rows_across_years(self):
+        self.__write_year(self.__current_year - 2, [1, 2])
+        self.__write_year(self.__current_year - 1, [1, 2])
+        self.__write_year(self.__current_year, [1])
+        history = NodeHistory(self.__handler)
+        df = history.get_last_rows(self.__DEFAULT_NODE_ID, 4)
+        expected = [f'{self.__current_year - 2}-01-02', f'{self.__current_year - 1}-01-01', f'{self.__current_year - 1}-01-02',
+                    f'{self.__current_year}-01-01']
+        self.assertEqual(expected, list(df['date']))
+
+    def test_last_rows_with_empty_current_year(self):
+        self.__write_year(self.__current_year - 1, [1, 2])
+        self.__write_year(self.__current_year, [])
+        history = NodeHistory(self.__handler)
+        df = history.get_last_rows(self.__DEFAULT_NODE_ID, 1)
+        self.assertEqual([f'{self.__current_year - 1}-01-02'], list(df['date']))
+
+    def test_last_rows_stop_at_missing_year(self):
+        self.__write_year(self.__current_year - 2, [1])
+        self.__write_year(self.__current_year, [1])
+        history = NodeHistory(self.__handler)
+        df = history.get_last_rows(self.__DEFAULT_NODE_ID, 5)
+        self.assertEqual([f'{self.__current_year}-01-01'], list(df['date']))
+
+    def test_last_rows_without_files(self):
+        history = NodeHistory(self.__handler)
+        df = history.get_last_rows(self.__DEFAULT_NODE_ID, 2)
+        self.assertTrue(df.empty)
+        self.assertEqual(self.__handler.get_csv_columns(), list(df.columns))
+
+    def test_missing_year(self):
+        history = NodeHistory(self.__handler)
+        self.assertIsNone(history.get_year(self.__DEFAULT_NODE_ID, '2000'))
+
+    def test_closed_years_are_cached(self):
+        self.__write_year(self.__current_year - 1, [1, 2])
+        history = NodeHistory(self.__handler)
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 1))
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 1))
+        history.get_last_rows(self.__DEFAULT_NODE_ID, 1, str(self.__current_year - 1))
+        self.assertEqual([self.__get_csv_name(self.__current_year - 1)], self.__handler.reads)
+
+    def test_current_year_is_not_cached(self):
+        self.__write_year(self.__current_year, [1])
+        history = NodeHistory(self.__handler)
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year))
+        self.__write_year(self.__current_year, [1, 2])
+        df = history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year))
+        self.assertEqual(2, len(df))
+
+    def test_least_recently_used_year_is_evicted(self):
+        for year in [self.__current_year - 3, self.__current_year - 2, self.__current_year - 1]:
+            self.__write_year(year, [1])
+        history = NodeHistory(self.__handler, max_cached_years=2)
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 3))
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 2))
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 3))
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 1))
+        self.__handler.reads = []
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 3))
+        history.get_year(self.__DEFAULT_NODE_ID, str(self.__current_year - 2))
+        self.assertEqual([self.__get_csv_name(self.__current_year - 2)], self.__handler.reads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytz
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerNodeConnection, InfoCSVHandler, SingletonABCMeta, SingletonMeta
+from node_to_csv import NodeInfoRetriever
+
+
+class TestNodeInfoRetriever(unittest.TestCase):
+    """
+    Cases of the integration test of NodeInfoRetriever, replayed from the cassettes in test/resources/cassettes.
+    Each cassette holds the state of the broker after one of the import statistics was put on it
+    """
+    __DEFAULT_NODE_ID: str = '0'
+    __DIR_CASSETTES: str = os.path.join(this_path.parents[1], 'resources', 'cassettes')
+    __DEFAULT_ENV: dict = {
+        'BROKER.URL': 'http://broker-server:8080',
+        'BROKER.API_KEY': 'xxxAdmin1234',
+        'BROKER.POOL_SIZE': '1',
+        'BROKER.MAX_RETRIES': '0',
+        'BROKER.BACKOFF_SECONDS': '0',
+        'BROKER.MAX_TIMEOUT_SECONDS': '10',
+        'BROKER.CIRCUIT_BREAKER_THRESHOLD': '100',
+        'BROKER.RUN_DEADLINE_SECONDS': '600',
+        'BROKER.CASSETTE_MODE': 'replay'
+    }
+
+    def setUp(self):
+        self.__dir_working = tempfile.mkdtemp()
+        os.environ.update(self.__DEFAULT_ENV)
+        os.environ['DIR.WORKING'] = self.__dir_working
+        self.__csv_handler = InfoCSVHandler()
+        name_csv = self.__csv_handler.generate_node_csv_name(self.__DEFAULT_NODE_ID)
+        self.__default_csv_path = os.path.join(self.__dir_working, self.__DEFAULT_NODE_ID, name_csv)
+        self.__download_with_cassette('stats1', self.__DEFAULT_NODE_ID)
+
+    def tearDown(self):
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        SingletonABCMeta._instances.pop(NodeInfoRetriever, None)
+        os.environ['BROKER.CASSETTE_MODE'] = ''
+        shutil.rmtree(self.__dir_working)
+
+    def __download_with_cassette(self, cassette: str, node_id: str):
+        os.environ['BROKER.CASSETTE_DIR'] = os.path.join(self.__DIR_CASSETTES, cassette)
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        SingletonABCMeta._instances.pop(NodeInfoRetriever, None)
+        NodeInfoRetriever().download_broker_data_to_file(node_id)
+
+    def __download_with_cassette_and_get_csv_as_df(self, cassette: str) -> pd.DataFrame:
+        self.__download_with_cassette(cassette, self.__DEFAULT_NODE_ID)
+        return self.__csv_handler.read_csv_as_df(self.__default_csv_path)
+
+    def test_init_working_csv(self):
+        self.__download_with_cassette('stats1', self.__DEFAULT_NODE_ID)
+        self.assertEqual(1, len(self.__list_csv_in_working_directory()))
+        self.__download_with_cassette('stats1', '1')
+        self.assertEqual(2, len(self.__list_csv_in_working_directory()))
+
+    def __list_csv_in_working_directory(self) -> list:
+        list_csv = []
+        for root, dirs, files in os.walk(self.__dir_working):
+            list_csv.extend(name for name in files if name.endswith('.csv'))
+        return list_csv
+
+    def test_csv_columns(self):
+        df = self.__csv_handler.read_csv_as_df(self.__default_csv_path)
+        expected_columns = ['date', 'last_contact', 'last_start', 'last_write', 'last_reject', 'imported',
+                            'updated', 'invalid', 'failed', 'error_rate', 'daily_imported',
+                            'daily_updated', 'daily_invalid', 'daily_failed', 'daily_error_rate']
+        self.assertCountEqual(expected_columns, list(df.columns))
+
+    def test_fetch_default_stats_to_csv(self):
+        df = self.__csv_handler.read_csv_as_df(self.__default_csv_path)
+        self.assertEqual(1, df.shape[0])
+        self.__check_date_stats_in_csv_row(df.iloc[0], '2020-01-01 01:00:00+0100', '-', '-')
+        self.__check_global_import_stats_in_csv_row(df.iloc[0], '0', '0', '0', '0', '-')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[0], '-', '-', '-', '-', '-')
+
+    def test_update_default_stats_in_csv(self):
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2')
+        self.assertEqual(1, df.shape[0])
+        self.__check_date_stats_in_csv_row(df.iloc[0], '2020-01-01 01:00:00+0100', '2020-03-03 01:00:00+0100', '2020-03-03 01:00:00+0100')
+        self.__check_global_import_stats_in_csv_row(df.iloc[0], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[0], '-', '-', '-', '-', '-')
+
+    def test_fetch_next_stats_in_csv(self):
+        self.__change_date_of_current_csv_to_past_days(1)
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2')
+        self.assertEqual(2, df.shape[0])
+        self.__check_date_stats_in_csv_row(df.iloc[1], '2020-01-01 01:00:00+0100', '2020-03-03 01:00:00+0100', '2020-03-03 01:00:00+0100')
+        self.__check_global_import_stats_in_csv_row(df.iloc[1], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[1], '2000', '400', '250', '350', '20.00')
+
+    def test_fetch_next_stats_in_csv_timegap(self):
+        self.__change_date_of_current_csv_to_past_days(5)
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2')
+        self.assertEqual(2, df.shape[0])
+        self.__check_global_import_stats_in_csv_row(df.iloc[1], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[1], '-', '-', '-', '-', '-')
+
+    def test_fetch_next_stats_in_csv_with_dwh_restart(self):
+        self.__change_date_of_current_csv_to_past_days(1)
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2_dwh_restart')
+        self.assertEqual(2, df.shape[0])
+        self.__check_date_stats_in_csv_row(df.iloc[1], '2020-01-01 13:00:00+0100', '2020-03-03 01:00:00+0100', '2020-03-03 01:00:00+0100')
+        self.__check_global_import_stats_in_csv_row(df.iloc[1], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[1], '-', '-', '-', '-', '-')
+
+    def test_fetch_new_stats_in_csv_after_year_change(self):
+        self.__change_date_of_current_csv_to_past_days(1)
+        self.__rename_csv_to_last_years_csv(self.__default_csv_path)
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2')
+        self.assertEqual(1, df.shape[0])
+        self.__check_global_import_stats_in_csv_row(df.iloc[0], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[0], '2000', '400', '250', '350', '20.00')
+
+    def test_fetch_new_stats_in_csv_after_year_change_timegap(self):
+        self.__change_date_of_current_csv_to_past_days(5)
+        self.__rename_csv_to_last_years_csv(self.__default_csv_path)
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2')
+        self.assertEqual(1, df.shape[0])
+        self.__check_global_import_stats_in_csv_row(df.iloc[0], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[0], '-', '-', '-', '-', '-')
+
+    def test_fetch_next_stats_in_csv_after_date_not_in_iso_format(self):
+        df = self.__csv_handler.read_csv_as_df(self.__default_csv_path)
+        df.loc[0, 'date'] = '01.02.2022 10:00'
+        df.loc[0, 'last_start'] = '01.02.2022 10:00'
+        self.__csv_handler.write_data_to_file(df, self.__default_csv_path)
+        df = self.__download_with_cassette_and_get_csv_as_df('stats2')
+        self.assertEqual(2, df.shape[0])
+        self.__check_global_import_stats_in_csv_row(df.iloc[1], '2000', '400', '250', '350', '20.00')
+        self.__check_daily_import_stats_in_csv_row(df.iloc[1], '-', '-', '-', '-', '-')
+
+    def __check_date_stats_in_csv_row(self, row: pd.Series, start: str, last_write: str, last_reject: str):
+        self.assertEqual(start, row['last_start'])
+        self.assertEqual(last_write, row['last_write'])
+        self.assertEqual(last_reject, row['last_reject'])
+
+    def __check_global_import_stats_in_csv_row(self, row: pd.Series, imported: str, updated: str, invalid: str, failed: str, error_rate: str):
+        self.assertEqual(imported, row['imported'])
+        self.assertEqual(updated, row['updated'])
+        self.assertEqual(invalid, row['invalid'])
+        self.assertEqual(failed, row['failed'])
+        self.assertEqual(error_rate, row['error_rate'])
+
+    def __check_daily_import_stats_in_csv_row(self, row: pd.Series, imported: str, updated: str, invalid: str, failed: str, error_rate: str):
+        self.assertEqual(imported, row['daily_imported'])
+        self.assertEqual(updated, row['daily_updated'])
+        self.assertEqual(invalid, row['daily_invalid'])
+        self.assertEqual(failed, row['daily_failed'])
+        self.assertEqual(error_rate, row['daily_error_rate'])
+
+    def __change_date_of_current_csv_to_past_days(self, days: int):
+        df = self.__csv_handler.read_csv_as_df(self.__default_csv_path)
+        df.loc[0, 'date'] = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(days=days)
+        self.__csv_handler.write_data_to_file(df, self.__default_csv_path)
+
+    @staticmethod
+    def __rename_csv_to_last_years_csv(path_csv: str):
+        last_year = str(datetime.now().year - 1)
+        path_csv_new = path_csv[:-8] + last_year + path_csv[-4:]
+        os.rename(path_csv, path_csv_new)
+
+
+if __name__ == '__main__':
+    unittest.main()
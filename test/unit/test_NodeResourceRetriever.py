@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerNodeConnection, SingletonABCMeta, SingletonMeta
+from node_to_csv import NodeResourceRetriever
+
+
+class FakeBrokerNodeConnection:
+    """
+    Returns the resources set in 'resources' for any node. With 'modified' unset, all resources are unmodified
+    """
+
+    def __init__(self):
+        self.resources = {}
+        self.modified = True
+
+    def get_broker_node_resource_if_modified(self, node_id: str, resource: str, validators: dict) -> BrokerNodeConnection.BrokerNodeResource:
+        if not self.modified:
+            return BrokerNodeConnection.BrokerNodeResource(None, validators)
+        return BrokerNodeConnection.BrokerNodeResource(dict(self.resources.get(resource, {})), {})
+
+
+class TestNodeResourceRetriever(unittest.TestCase):
+    __DEFAULT_NODE_ID: str = '0'
+
+    def setUp(self):
+        self.__dir_working = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = self.__dir_working
+        self.__connection = FakeBrokerNodeConnection()
+        SingletonMeta._instances[BrokerNodeConnection] = self.__connection
+        SingletonABCMeta._instances.pop(NodeResourceRetriever, None)
+        self.__retriever = NodeResourceRetriever()
+        self.__log_path = os.path.join(self.__dir_working, self.__DEFAULT_NODE_ID, f'{self.__DEFAULT_NODE_ID}_log_versions.log')
+
+    def tearDown(self):
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        SingletonABCMeta._instances.pop(NodeResourceRetriever, None)
+        shutil.rmtree(self.__dir_working)
+
+    def __download_versions(self, versions: dict):
+        self.__connection.resources = {'versions': versions}
+        self.__retriever.download_broker_data_to_file(self.__DEFAULT_NODE_ID)
+
+    def __read_log_lines(self) -> list:
+        with open(self.__log_path, 'r', encoding='utf-8') as file:
+            return [line.split(' : ', 1)[1] for line in file.read().splitlines()]
+
+    def test_changes_are_logged(self):
+        self.__download_versions({'java': '11', 'os': 'Ubuntu 20.04'})
+        self.__download_versions({'java': '17', 'postgres': '14'})
+        self.assertCountEqual(['[java] 11 --> 17', '[postgres] NEW --> 14', '[os] Ubuntu 20.04 --> DELETED'], self.__read_log_lines())
+
+    def test_log_is_appended_in_place(self):
+        self.__download_versions({'java': '11'})
+        self.__download_versions({'java': '17'})
+        inode = os.stat(self.__log_path).st_ino
+        self.__download_versions({'java': '21'})
+        self.assertEqual(inode, os.stat(self.__log_path).st_ino)
+        self.assertEqual(['[java] 11 --> 17', '[java] 17 --> 21'], self.__read_log_lines())
+
+    def test_skipped_resources_are_reset(self):
+        self.__download_versions({'java': '11'})
+        self.__connection.modified = False
+        self.__retriever.download_broker_data_to_file(self.__DEFAULT_NODE_ID)
+        self.assertEqual(4, self.__retriever.get_number_of_skipped_resources())
+        self.__retriever.reset_number_of_skipped_resources()
+        self.assertEqual(0, self.__retriever.get_number_of_skipped_resources())
+
+
+if __name__ == '__main__':
+    unittest.main()
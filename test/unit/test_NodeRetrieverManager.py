@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import BrokerNodeConnection, BrokerRequestMetrics, SingletonABCMeta, SingletonMeta
+from node_to_csv import NodeErrorRetriever, NodeInfoRetriever, NodeResourceRetriever, NodeRetrieverManager
+
+
+class FakeBrokerNodeConnection:
+    """
+    Provides the node list and the run cache interface of BrokerNodeConnection without any requests
+    """
+
+    def __init__(self, node_ids: list):
+        self.node_ids = node_ids
+        self.__metrics = BrokerRequestMetrics()
+
+    def get_broker_nodes(self) -> list:
+        return [BrokerNodeConnection.BrokerNode(node_id, f'CN={node_id}', None) for node_id in self.node_ids]
+
+    def enable_run_cache(self):
+        pass
+
+    def clear_run_cache(self):
+        pass
+
+    def evict_node_from_run_cache(self, node_id: str):
+        pass
+
+    def get_request_metrics(self) -> BrokerRequestMetrics:
+        return self.__metrics
+
+    @staticmethod
+    def get_connection_stats() -> dict:
+        return {'opened': 0, 'reused': 0}
+
+
+class FakeRetriever:
+    """
+    Writes a file named after the retriever into the directory of the node. Raises the
+    exception set in 'failures' for the given node instead. Records the threads it ran in
+    """
+
+    def __init__(self, name: str, working_dir: str):
+        self.__name = name
+        self.__working_dir = working_dir
+        self.failures = {}
+        self.threads = set()
+        self.count_skipped = 0
+
+    def download_broker_data_to_file(self, node_id: str):
+        self.threads.add(threading.get_ident())
+        if node_id in self.failures:
+            raise self.failures[node_id]
+        dir_node = os.path.join(self.__working_dir, node_id)
+        os.makedirs(dir_node, exist_ok=True)
+        with open(os.path.join(dir_node, self.__name), 'w') as file:
+            file.write(node_id)
+
+    def get_number_of_skipped_resources(self) -> int:
+        return self.count_skipped
+
+    def reset_number_of_skipped_resources(self):
+        self.count_skipped = 0
+
+
+class TestNodeRetrieverManager(unittest.TestCase):
+    __NODE_IDS: list = [str(node_id) for node_id in range(8)]
+
+    def setUp(self):
+        self.__dir_working = tempfile.mkdtemp()
+        os.environ['DIR.WORKING'] = self.__dir_working
+        os.environ['BROKER.WORKERS'] = '4'
+        SingletonMeta._instances[BrokerNodeConnection] = FakeBrokerNodeConnection(self.__NODE_IDS)
+        self.__retrievers = {}
+        for name, retriever in (('info', NodeInfoRetriever), ('errors', NodeErrorRetriever), ('resources', NodeResourceRetriever)):
+            self.__retrievers[name] = FakeRetriever(name, self.__dir_working)
+            SingletonABCMeta._instances[retriever] = self.__retrievers[name]
+        self.__manager = NodeRetrieverManager()
+
+    def tearDown(self):
+        SingletonMeta._instances.pop(BrokerNodeConnection, None)
+        for retriever in (NodeInfoRetriever, NodeErrorRetriever, NodeResourceRetriever):
+            SingletonABCMeta._instances.pop(retriever, None)
+        shutil.rmtree(self.__dir_working)
+
+    def __load_failed_nodes_of_report(self) -> list:
+        with open(os.path.join(self.__dir_working, 'broker_run_report.json'), 'r') as file:
+            return json.load(file)['failed_nodes']
+
+    def __get_nodes_with_all_files(self) -> list:
+        nodes = []
+        for node_id in self.__NODE_IDS:
+            dir_node = os.path.join(self.__dir_working, node_id)
+            if os.path.isdir(dir_node) and sorted(os.listdir(dir_node)) == ['errors', 'info', 'resources']:
+                nodes.append(node_id)
+        return nodes
+
+    def test_all_nodes_in_parallel(self):
+        self.__manager.fetch_broker_node_information()
+        self.assertEqual(self.__NODE_IDS, self.__get_nodes_with_all_files())
+        self.assertEqual([], self.__load_failed_nodes_of_report())
+        self.assertGreater(len(self.__retrievers['info'].threads), 1)
+
+    def test_exception_is_isolated_to_node(self):
+        self.__retrievers['errors'].failures = {'3': ValueError('broken stats')}
+        self.__manager.fetch_broker_node_information()
+        expected = [node_id for node_id in self.__NODE_IDS if node_id != '3']
+        self.assertEqual(expected, self.__get_nodes_with_all_files())
+        self.assertEqual(['3'], self.__load_failed_nodes_of_report())
+
+    def test_system_exit_is_isolated_to_node(self):
+        self.__retrievers['info'].failures = {'5': SystemExit('date of today was found in multiple rows!!')}
+        self.__manager.fetch_broker_node_information()
+        expected = [node_id for node_id in self.__NODE_IDS if node_id != '5']
+        self.assertEqual(expected, self.__get_nodes_with_all_files())
+        self.assertEqual(['5'], self.__load_failed_nodes_of_report())
+
+    def test_failures_are_not_kept_for_next_run(self):
+        self.__retrievers['info'].failures = {'1': ValueError('broken stats')}
+        self.__manager.fetch_broker_node_information()
+        self.assertEqual(['1'], self.__load_failed_nodes_of_report())
+        self.__retrievers['info'].failures = {}
+        self.__manager.fetch_broker_node_information()
+        self.assertEqual([], self.__load_failed_nodes_of_report())
+        self.assertEqual(self.__NODE_IDS, self.__get_nodes_with_all_files())
+
+    def test_skipped_resources_are_counted_per_run(self):
+        self.__retrievers['resources'].count_skipped = 5
+        self.__manager.fetch_broker_node_information()
+        self.assertEqual(0, self.__retrievers['resources'].get_number_of_skipped_resources())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from shutil import rmtree
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import TimestampHandler
+from node_to_csv import RunJournal
+
+
+class TestRunJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__path = os.path.join(self.__dir, 'broker_run_journal.json')
+
+    def tearDown(self):
+        rmtree(self.__dir)
+
+    def __write_journal(self, date: str, completed: dict):
+        with open(self.__path, 'w', encoding='utf-8') as file:
+            json.dump({'date': date, 'completed': completed}, file)
+
+    @staticmethod
+    def __get_current_ymd() -> str:
+        timestamp = TimestampHandler()
+        return timestamp.get_utc_ymd_from_date_string(timestamp.get_current_date())
+
+    def test_empty_without_file(self):
+        journal = RunJournal(self.__path)
+        self.assertFalse(journal.is_completed('1', 'info'))
+        self.assertEqual(0, journal.get_number_of_completed())
+
+    def test_mark_completed_is_persisted(self):
+        RunJournal(self.__path).mark_completed('1', 'info')
+        journal = RunJournal(self.__path)
+        self.assertTrue(journal.is_completed('1', 'info'))
+        self.assertFalse(journal.is_completed('1', 'errors'))
+        self.assertFalse(journal.is_completed('2', 'info'))
+
+    def test_resume_journal_of_current_date(self):
+        self.__write_journal(self.__get_current_ymd(), {'1': ['info', 'errors']})
+        journal = RunJournal(self.__path)
+        self.assertTrue(journal.is_completed('1', 'errors'))
+        self.assertEqual(2, journal.get_number_of_completed())
+
+    def test_discard_journal_of_other_date(self):
+        self.__write_journal('2020-01-01', {'1': ['info']})
+        journal = RunJournal(self.__path)
+        self.assertFalse(journal.is_completed('1', 'info'))
+
+    def test_close_removes_journal(self):
+        journal = RunJournal(self.__path)
+        journal.mark_completed('1', 'info')
+        journal.close()
+        self.assertFalse(os.path.exists(self.__path))
+        self.assertFalse(journal.is_completed('1', 'info'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from common import CSVFileStorage, ErrorCSVHandler, InfoCSVHandler, SQLiteStorage
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    __DEFAULT_NODE_ID: str = '0'
+
+    def setUp(self):
+        self.__dir_tmp = tempfile.mkdtemp()
+        self.__dir_files = os.path.join(self.__dir_tmp, 'files')
+        self.__dir_export = os.path.join(self.__dir_tmp, 'export')
+        os.makedirs(self.__dir_files)
+        self.__path_db = os.path.join(self.__dir_tmp, 'broker-monitor.sqlite')
+        self.__columns = InfoCSVHandler().get_csv_columns()
+        self.__files = CSVFileStorage(self.__columns, ';', 'utf-8')
+        self.__db = self.__create_sqlite_storage()
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir_tmp)
+
+    def __create_sqlite_storage(self) -> SQLiteStorage:
+        return SQLiteStorage(self.__columns, ';', 'utf-8', self.__path_db, 'stats')
+
+    def __get_path(self, directory: str, year: str = '2020') -> str:
+        return os.path.join(directory, f'{self.__DEFAULT_NODE_ID}_stats_{year}.csv')
+
+    def __create_row(self, date: str, value) -> dict:
+        row = {column: value for column in self.__columns}
+        row['date'] = date
+        return row
+
+    def __init_both_storages(self):
+        empty = pd.DataFrame(columns=self.__columns)
+        self.__files.write_df(empty, self.__get_path(self.__dir_files))
+        self.__db.write_df(empty, self.__get_path(self.__dir_export))
+
+    @staticmethod
+    def __read_file(path: str) -> bytes:
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def test_export_equals_csv_file(self):
+        self.__init_both_storages()
+        for day, value in enumerate(['-', 400, '30.00', None, 'a;b', 'ü"x']):
+            row = self.__create_row(f'2020-01-0{day + 1}', value)
+            for storage, directory in [(self.__files, self.__dir_files), (self.__db, self.__dir_export)]:
+                storage.append_row(row, self.__get_path(directory))
+        for storage, directory in [(self.__files, self.__dir_files), (self.__db, self.__dir_export)]:
+            storage.replace_last_row(self.__create_row('2020-01-06', 'replaced'), self.__get_path(directory))
+        self.__db.export_csv_files(self.__DEFAULT_NODE_ID, self.__dir_export)
+        self.assertEqual(self.__read_file(self.__get_path(self.__dir_files)), self.__read_file(self.__get_path(self.__dir_export)))
+
+    def test_read_equals_csv_file(self):
+        self.__init_both_storages()
+        for day, value in enumerate(['-', None, '12']):
+            row = self.__create_row(f'2020-01-0{day + 1}', value)
+            for storage, directory in [(self.__files, self.__dir_files), (self.__db, self.__dir_export)]:
+                storage.append_row(row, self.__get_path(directory))
+        path_files, path_db = self.__get_path(self.__dir_files), self.__get_path(self.__dir_export)
+        pd.testing.assert_frame_equal(self.__files.read_df(path_files), self.__db.read_df(path_db))
+        pd.testing.assert_frame_equal(self.__files.read_last_rows_as_df(path_files, 2), self.__db.read_last_rows_as_df(path_db, 2))
+        self.assertEqual(list(self.__files.iter_rows_reversed(path_files)), list(self.__db.iter_rows_reversed(path_db)))
+
+    def test_tables_are_separated_by_node_and_year(self):
+        path_2020 = self.__get_path(self.__dir_export, '2020')
+        path_2021 = self.__get_path(self.__dir_export, '2021')
+        path_other_node = os.path.join(self.__dir_export, '1_stats_2020.csv')
+        for path in [path_2020, path_2021, path_other_node]:
+            self.__db.write_df(pd.DataFrame(columns=self.__columns), path)
+            self.__db.append_row(self.__create_row(path, '1'), path)
+        self.assertEqual([path_2021], list(self.__db.read_df(path_2021)['date']))
+        self.assertEqual([path_other_node], list(self.__db.read_df(path_other_node)['date']))
+
+    def test_exists(self):
+        path = self.__get_path(self.__dir_export)
+        self.assertFalse(self.__db.exists(path))
+        self.__db.write_df(pd.DataFrame(columns=self.__columns), path)
+        self.assertTrue(self.__db.exists(path))
+        self.assertTrue(self.__create_sqlite_storage().exists(path))
+
+    def test_import_existing_csv_file(self):
+        path = self.__get_path(self.__dir_files)
+        self.__files.write_df(pd.DataFrame(columns=self.__columns), path)
+        self.__files.append_row(self.__create_row('2020-01-01', '5'), path)
+        self.assertTrue(self.__db.exists(path))
+        self.__db.append_row(self.__create_row('2020-01-02', '6'), path)
+        self.assertEqual(['2020-01-01', '2020-01-02'], list(self.__db.read_df(path)['date']))
+
+    def test_read_missing_table(self):
+        with self.assertRaises(FileNotFoundError):
+            self.__db.read_df(self.__get_path(self.__dir_export))
+
+    def test_wrong_category(self):
+        with self.assertRaises(ValueError):
+            self.__db.exists(os.path.join(self.__dir_export, '0_errors_2020.csv'))
+
+    def test_unused_indexes_of_older_database_are_dropped(self):
+        with sqlite3.connect(self.__path_db) as connection:
+            connection.execute('CREATE INDEX idx_stats_date ON stats (node_id, "date")')
+        self.__create_sqlite_storage()
+        with sqlite3.connect(self.__path_db) as connection:
+            indexes = [row[1] for row in connection.execute('PRAGMA index_list(stats)').fetchall()]
+        self.assertEqual(['idx_stats_position'], indexes)
+
+    def test_tables_are_imported_from_multiple_threads(self):
+        paths = [os.path.join(self.__dir_files, f'{node_id}_stats_2020.csv') for node_id in range(8)]
+        for path in paths:
+            self.__files.write_df(pd.DataFrame([self.__create_row(path, '1')]), path)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            frames = list(executor.map(self.__db.read_df, paths * 4))
+        self.assertEqual(paths * 4, [df['date'][0] for df in frames])
+
+    def test_add_missing_columns_to_existing_table(self):
+        SQLiteStorage(['timestamp', 'repeats', 'content'], ';', 'utf-8', self.__path_db, 'errors')
+        columns = ErrorCSVHandler().get_csv_columns()
+        storage = SQLiteStorage(columns, ';', 'utf-8', self.__path_db, 'errors')
+        path = os.path.join(self.__dir_export, '0_errors_2020.csv')
+        storage.write_df(pd.DataFrame([{'timestamp': '2020-01-01', 'repeats': '1', 'content': 'Error', 'fingerprint': 'abc'}]), path)
+        self.assertEqual(columns, list(storage.read_df(path).columns))
+        self.assertEqual(['abc'], list(storage.read_df(path)['fingerprint']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,7 @@ this_path = Path(os.path.realpath(__file__))
 path_src = os.path.join(this_path.parents[2], 'src')
 sys.path.insert(0, path_src)
 
-from common import ErrorCSVHandler, ConfigReader
+from common import ErrorCSVHandler, ErrorFingerprinter, ConfigReader
 from csv_to_confluence import TemplatePageLoader, TemplatePageCSVErrorWriter
 
 
@@ -50,6 +50,13 @@ class TestTemplatePageCSVErrorWriter(unittest.TestCase):
         page = self.__CSV_ERROR_WRITER.add_content_to_template_page(self.__TEMPLATE, self.__DEFAULT_NODE_ID)
         self.__check_error_table_row_count(page, 20)
 
+    def test_write_template_shows_top_fingerprints_by_repeats(self):
+        self.__create_error_csv2()
+        page = self.__CSV_ERROR_WRITER.add_content_to_template_page(self.__TEMPLATE, self.__DEFAULT_NODE_ID)
+        table_errors = bs4.BeautifulSoup(page, 'html.parser').find(class_='table_errors_body')
+        list_repeats = [row.find_all('td')[1].get_text() for row in table_errors.find_all('tr')[1:]]
+        self.assertEqual([str(i) for i in range(25, 5, -1)], list_repeats)
+
     def test_write_template_from_row_with_null_values(self):
         self.__create_error_csv3()
         with self.assertRaises(AttributeError):
@@ -76,7 +83,7 @@ class TestTemplatePageCSVErrorWriter(unittest.TestCase):
 
     def __create_error_csv1(self):
         df = pd.DataFrame(columns=self.__CSV_HANDLER.get_csv_columns())
-        df.loc[len(df)] = ['2022-01-01 12:00:00+01:00', '1', 'Error']
+        df.loc[len(df)] = self.__create_error_row('2022-01-01 12:00:00+01:00', '1', 'Error')
         self.__CSV_HANDLER.write_data_to_file(df, self.__DEFAULT_CSV_PATH)
 
     def __create_error_csv2(self):
@@ -95,12 +102,12 @@ class TestTemplatePageCSVErrorWriter(unittest.TestCase):
             day = str(i).rjust(2, '0')
             timestamp = '2022-01-{} 12:00:00+01:00'.format(day)
             content = 'TestError{}'.format(i)
-            df.loc[len(df)] = [timestamp, str(i), content]
+            df.loc[len(df)] = self.__create_error_row(timestamp, str(i), content)
         self.__CSV_HANDLER.write_data_to_file(df, self.__DEFAULT_CSV_PATH)
 
     def __create_error_csv3(self):
         df = pd.DataFrame(columns=self.__CSV_HANDLER.get_csv_columns())
-        df.loc[len(df)] = ['2022-01-01 12:00:00+01:00', None, 'Error']
+        df.loc[len(df)] = self.__create_error_row('2022-01-01 12:00:00+01:00', None, 'Error')
         self.__CSV_HANDLER.write_data_to_file(df, self.__DEFAULT_CSV_PATH)
 
     def __create_empty_error_csv(self):
@@ -112,6 +119,12 @@ class TestTemplatePageCSVErrorWriter(unittest.TestCase):
         df.loc[len(df)] = ['2022-01-01 12:00:00+01:00', 'Error']
         self.__CSV_HANDLER.write_data_to_file(df, self.__DEFAULT_CSV_PATH)
 
+    @staticmethod
+    def __create_error_row(timestamp: str, repeats: str, content: str) -> list:
+        fingerprinter = ErrorFingerprinter()
+        variants = fingerprinter.join_variants({fingerprinter.create_variant_hash(content): repeats})
+        return [timestamp, repeats, content, fingerprinter.create_fingerprint(content), variants]
+
     def __check_error_table_row_count(self, page_template: str, expected_rows: int):
         page = bs4.BeautifulSoup(page_template, 'html.parser')
         table_errors = page.find(class_='table_errors_body')
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+import bs4
+
+this_path = Path(os.path.realpath(__file__))
+path_src = os.path.join(this_path.parents[2], 'src')
+sys.path.insert(0, path_src)
+
+from csv_to_confluence import TemplatePageElementCreator, TemplatePageSlotIndex
+
+
+class TestTemplatePageSlotIndex(unittest.TestCase):
+
+    def setUp(self):
+        path_template = os.path.join(path_src, 'resources', 'template_page.html')
+        with open(path_template, 'r', encoding='utf-8') as file:
+            self.__soup = bs4.BeautifulSoup(file.read(), 'html.parser')
+        self.__slots = TemplatePageSlotIndex(self.__soup)
+
+    def test_get_equals_find_for_all_classes(self):
+        names = {name for tag in self.__soup.find_all(class_=True) for name in tag.get('class')}
+        for name in names:
+            self.assertIs(self.__soup.find(class_=name), self.__slots.get(name))
+
+    def test_get_unknown_class(self):
+        self.assertIsNone(self.__slots.get('unknown'))
+
+    def test_get_replaced_slot(self):
+        td = TemplatePageElementCreator().create_html_element('td', {'class': 'status'})
+        self.__slots.get('status').replace_with(td)
+        self.assertIs(td, self.__slots.get('status'))
+
+    def test_get_slot_inserted_after_indexing(self):
+        td = TemplatePageElementCreator().create_html_element('td', {'class': 'new_slot'})
+        self.__slots.get('table_errors_body').replace_with(td)
+        self.assertIs(td, self.__slots.get('new_slot'))
+
+    def test_get_slot_removed_from_page(self):
+        self.__slots.get('os').decompose()
+        self.assertIsNone(self.__slots.get('os'))
+
+    def test_filled_slot_is_kept(self):
+        slot = self.__slots.get('os')
+        slot.string.replace_with('Ubuntu')
+        self.assertIs(slot, self.__slots.get('os'))
+        self.assertEqual('Ubuntu', self.__slots.get('os').string)
+
+
+if __name__ == '__main__':
+    unittest.main()
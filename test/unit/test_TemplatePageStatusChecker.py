@@ -429,6 +429,18 @@ class TestTemplatePageStatusChecker(unittest.TestCase):
             .build()
         self.__load_content_and_check_title_and_color_of_status_element(node_id, 'ONLINE', 'Green')
 
+    def test_shared_soup_equals_parsing_for_each_writer(self):
+        node_id = '10'
+        self.__builder.for_node(node_id).with_row([self.__create_timestamp(shift_days=-2), self.__create_timestamp(), self.__create_timestamp(), self.__create_timestamp(), '-'
+                                                      , '1', '2', '3', '4', '5', '6', '7', '8', '9', '10']).build()
+        page = TemplatePageLoader().get_template_page()
+        expected = TemplatePageCSVInfoWriter().add_content_to_template_page(page, node_id)
+        expected = TemplatePageStatusChecker().add_content_to_template_page(expected, node_id)
+        soup = bs4.BeautifulSoup(page, 'html.parser')
+        TemplatePageCSVInfoWriter().add_content_to_template_soup(soup, node_id)
+        TemplatePageStatusChecker().add_content_to_template_soup(soup, node_id)
+        self.assertEqual(expected, str(soup))
+
     @staticmethod
     def __create_timestamp(shift_days=0, shift_hours=0):
         now = datetime.now(pytz.utc)
@@ -3,6 +3,8 @@ import sys
 import unittest
 from pathlib import Path
 
+import pandas as pd
+
 this_path = Path(os.path.realpath(__file__))
 path_src = os.path.join(this_path.parents[2], 'src')
 sys.path.insert(0, path_src)
@@ -55,6 +57,11 @@ class TestSingletonMeta(unittest.TestCase):
     def test_get_timedelta_in_absolute_hours_different_tz(self):
         self.assertEqual(0, self.__handler.get_timedelta_in_absolute_hours('2023-12-31T20:00:00-04:00', '2024-01-01T04:00:00+04:00'))
 
+    def test_get_absolute_hours_between_missing_datetimes(self):
+        date = pd.Timestamp('2023-06-22 15:58:05', tz='UTC')
+        self.assertFalse(self.__handler.get_absolute_hours_between_datetimes(pd.NaT, date) > 24)
+        self.assertFalse(self.__handler.get_absolute_hours_between_datetimes(date, pd.NaT) <= 24)
+
     def test_convert_to_berlin_time1(self):
         self.assertEqual('2023-06-22 02:00:00+02:00', self.__handler.convert_ts_to_berlin_time('2023-06-22 00:00:00'))
 